@@ -1,71 +1,102 @@
 from fastapi import FastAPI, Request, HTTPException
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, Response, StreamingResponse
 import json
 import os
 import logging
 import asyncio
-import glob
+from contextlib import asynccontextmanager
 from datetime import datetime
-from typing import Any, Dict, Optional, List, Set
-from agent_registry import load_agents, get_agent, BaseA2AAgent
-
-# Configure logging with more detail
-logging.basicConfig(
-    level=logging.DEBUG,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-)
+from typing import Any, AsyncIterator, Dict, Optional, List, Set
+from agent_registry import (RESULT_ARTIFACT, load_agents, get_agent_options, get_agent_pool, known_agent_ids,
+                            warm_up_agents, import_agent, start_agent_pools, shutdown_agent_pools,
+                            agent_pool_metrics, BaseA2AAgent)
+from agent_executor import AgentExecutor
+from task_manager import COMPLETED, TaskManager, TaskRecord
+from push_notifications import PushNotifier, accept_push_config
+from request_keys import mask_secrets, request_fingerprint
+from single_flight import SingleFlight
+from result_cache import DEFAULT_TTL as DEFAULT_RESULT_TTL, ResultCache
+from request_logging import LogPayload, configure_logging, log_rpc
+from serialization import SERIALIZER
+from card_index import EMPTY_INDEX, EncodedDocument, load_card_index
+from task_scheduler import DEFAULT_PRIORITY, DEFAULT_TENANT, PRIORITIES, SchedulerBusy, TaskScheduler
+
+# Log records are written from a background thread; A2A_LOG_LEVEL sets the level
+configure_logging()
 logger = logging.getLogger(__name__)
 
+class A2AJSONResponse(JSONResponse):
+    """JSONResponse rendered with the configured serializer (orjson when installed)."""
+
+    def render(self, content: Any) -> bytes:
+        return SERIALIZER.dumps(content)
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    Starts the card watcher and the agents, and on shutdown stops them along
+    with the agent executor and push notifier.
+    """
+    global CARD_WATCHER, AGENT_STARTUP
+    if CARD_RELOAD_INTERVAL > 0:
+        CARD_WATCHER = asyncio.create_task(watch_agent_cards(), name="agent-card-watcher")
+    # In the background so the server starts answering right away; an
+    # analysis arriving meanwhile waits for its agent's startup to finish
+    AGENT_STARTUP = asyncio.create_task(start_agents(), name="agent-startup")
+    yield
+    for task in (CARD_WATCHER, AGENT_STARTUP):
+        if task is not None:
+            task.cancel()
+    await shutdown_agent_pools()
+    AGENT_EXECUTOR.shutdown(wait=False)
+    await PUSH_NOTIFIER.close()
+
 # Create FastAPI app with the correct path prefix
-app = FastAPI()
+app = FastAPI(default_response_class=A2AJSONResponse, lifespan=lifespan)
+
+# Import agent modules on first use, via the agent manifest, unless A2A_LAZY_AGENTS is off
+LAZY_AGENTS = os.environ.get("A2A_LAZY_AGENTS", "true").lower() not in ("0", "false", "no")
+# agent_ids imported right after startup instead of on their first request
+WARM_AGENTS = [agent_id.strip() for agent_id in os.environ.get("A2A_WARM_AGENTS", "").split(",") if agent_id.strip()]
 
 # Load all agent implementations
 try:
-    load_agents()
+    load_agents(lazy=LAZY_AGENTS)
     logger.info("Successfully loaded A2A agents")
 except Exception as e:
     logger.error(f"Error loading A2A agents: {str(e)}")
 
 # Load the Agent Cards
 AGENT_CARDS_DIR = "agent_cards"
-AGENT_CARDS = {}
-AGENT_TO_CARD_MAP = {}
+# Seconds between checks of AGENT_CARDS_DIR for changed cards (0 disables reloading)
+CARD_RELOAD_INTERVAL = float(os.environ.get("A2A_CARD_RELOAD_INTERVAL", "2"))
+# Current snapshot of the agent cards; replaced as a whole on reload
+CARD_INDEX = EMPTY_INDEX
 
-def load_agent_cards():
+def load_agent_cards() -> bool:
     """
-    Load all agent cards from the agent_cards directory.
+    Load the agent cards from the agent_cards directory, reparsing only the
+    files that changed since the last load, and swap in the new index.
+    Returns True when the cards changed.
     """
+    global CARD_INDEX
     try:
         # Ensure the directory exists
         if not os.path.exists(AGENT_CARDS_DIR):
             os.makedirs(AGENT_CARDS_DIR, exist_ok=True)
             logger.warning(f"Created agent_cards directory: {AGENT_CARDS_DIR}")
-            return
-            
-        # Find all JSON files in the agent_cards directory
-        card_files = glob.glob(os.path.join(AGENT_CARDS_DIR, "*.json"))
-        if not card_files:
+
+        index = load_card_index(AGENT_CARDS_DIR, CARD_INDEX)
+        if index is CARD_INDEX:
+            return False
+        CARD_INDEX = index
+        if not index.cards:
             logger.warning(f"No agent card files found in {AGENT_CARDS_DIR}")
-            return
-            
-        for card_file in card_files:
-            try:
-                with open(card_file, "r") as f:
-                    card_data = json.load(f)
-                    card_name = os.path.basename(card_file)
-                    AGENT_CARDS[card_name] = card_data
-                    
-                    # Map each agent_id to its card
-                    for agent_id in card_data.get("agent_ids", []):
-                        AGENT_TO_CARD_MAP[agent_id] = card_name
-                        
-                    logger.info(f"Loaded agent card: {card_name}")
-            except Exception as e:
-                logger.error(f"Error loading agent card {card_file}: {str(e)}")
-                
-        logger.info(f"Successfully loaded {len(AGENT_CARDS)} agent cards")
+        logger.info(f"Successfully loaded {len(index.cards)} agent cards")
+        return True
     except Exception as e:
         logger.error(f"Error loading agent cards: {str(e)}")
+        return False
 
 # Load agent cards at startup
 load_agent_cards()
@@ -77,14 +108,13 @@ def validate_agents_and_cards():
     """
     # Get all agent_ids from cards
     card_agent_ids = set()
-    for card_name, card_data in AGENT_CARDS.items():
+    for card_name, card_data in CARD_INDEX.cards.items():
         for agent_id in card_data.get("agent_ids", []):
             if not agent_id.endswith("_coming_soon"):
                 card_agent_ids.add(agent_id)
     
     # Get all agent_ids from registry
-    from agent_registry import _agent_registry
-    registry_agent_ids = set(_agent_registry.keys())
+    registry_agent_ids = known_agent_ids()
     
     # Find mismatches
     missing_implementations = card_agent_ids - registry_agent_ids
@@ -100,84 +130,177 @@ def validate_agents_and_cards():
 # Run validation
 validate_agents_and_cards()
 
+# Seconds discovery clients may reuse a card before revalidating it
+CARD_MAX_AGE = int(os.environ.get("A2A_CARD_MAX_AGE", "60"))
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    # If-None-Match uses weak comparison and may list several tags or "*"
+    if not if_none_match:
+        return False
+    for tag in if_none_match.split(","):
+        tag = tag.strip()
+        if tag == "*" or tag.removeprefix("W/") == etag:
+            return True
+    return False
+
+def cached_json_response(request: Request, document: EncodedDocument) -> Response:
+    """
+    Serves a pre-encoded document, or 304 Not Modified when the client
+    already holds the current version.
+    """
+    headers = {"ETag": document.etag, "Cache-Control": f"public, max-age={CARD_MAX_AGE}"}
+    if etag_matches(request.headers.get("if-none-match"), document.etag):
+        return Response(status_code=304, headers=headers)
+    return Response(content=document.body, media_type="application/json", headers=headers)
+
+# Background task execution and bounded retention of finished tasks
+TASK_MANAGER = TaskManager(
+    max_finished=int(os.environ.get("A2A_TASK_RETENTION", "1000")),
+    finished_ttl=float(os.environ.get("A2A_TASK_RETENTION_SECONDS", "3600"))
+)
+
+# Dedicated thread pools for agents registered with blocking=True
+AGENT_EXECUTOR = AgentExecutor()
+
+# Outbound delivery of finished tasks to client webhooks
+PUSH_NOTIFIER = PushNotifier()
+
+def notification_payload(record: TaskRecord, task_id: str) -> Dict[str, Any]:
+    """
+    Push notification body for a finished task: its id, status and artifacts,
+    with the analysis result as the RESULT_ARTIFACT. The request messages and
+    parameters, which may carry credentials, are never sent to the webhook.
+    """
+    artifacts = list(record.artifacts)
+    if record.state == COMPLETED and not any(a["name"] == RESULT_ARTIFACT for a in artifacts):
+        artifacts.append({"name": RESULT_ARTIFACT, "parts": [{"json": record.result}], "index": len(artifacts)})
+    return {"task_id": task_id, "status": record.status(), "artifacts": artifacts}
+
+def push_finished_task(record: TaskRecord, task_ids: Optional[List[str]] = None) -> None:
+    """Notify the webhook of each task_id the finished execution is known by, or only of task_ids."""
+    for task_id, push_config in list(record.push_notifications.items()):
+        if task_ids is None or task_id in task_ids:
+            PUSH_NOTIFIER.notify(push_config, notification_payload(record, task_id))
+
+TASK_MANAGER.on_finished.append(push_finished_task)
+
+# Identical analyses in flight at the same time run once
+SINGLE_FLIGHT = SingleFlight()
+
+# Finished results served again to identical requests within the agent's TTL
+RESULT_CACHE = ResultCache()
+
+def result_cache_ttl(agent_id: str, skill_id: str) -> float:
+    """
+    Seconds an agent's results may be served from the result cache: the
+    agent card's resultCacheTtl, else the result_ttl given to register_agent,
+    else A2A_RESULT_CACHE_TTL.
+    """
+    card = CARD_INDEX.card_for_agent(agent_id)
+    if card.get("resultCacheTtl") is not None:
+        return float(card["resultCacheTtl"])
+    ttl = get_agent_options(agent_id, skill_id)["result_ttl"]
+    return float(ttl) if ttl is not None else DEFAULT_RESULT_TTL
+
+# Global and per-agent limits on running tasks, with a bounded wait queue
+# ordered by priority and shared fairly between tenants
+SCHEDULER = TaskScheduler()
+# Request context keys that identify the tenant a task is scheduled for, first match wins
+TENANT_KEYS = [key.strip() for key in os.environ.get("A2A_TENANT_KEYS", "deployment_id,workflow_id").split(",") if key.strip()]
+
+def tenant_of(request_context: Optional[Dict[str, Any]]) -> str:
+    """The tenant a task's queue share is charged to, from its request context."""
+    if isinstance(request_context, dict):
+        for key in TENANT_KEYS:
+            if request_context.get(key):
+                return str(request_context[key])
+    return DEFAULT_TENANT
+
+def concurrency_limit(agent_id: str, skill_id: str) -> Optional[int]:
+    """
+    Tasks of an agent allowed to run at once: the agent card's maxConcurrency,
+    else the max_concurrency given to register_agent. None means only the
+    global limit applies.
+    """
+    card = CARD_INDEX.card_for_agent(agent_id)
+    if card.get("maxConcurrency") is not None:
+        return int(card["maxConcurrency"])
+    return get_agent_options(agent_id, skill_id)["max_concurrency"]
+
+def is_reusable_result(result: Any) -> bool:
+    # Agents report failures as results with status "error", and scans that only
+    # partly completed with per-region or per-check errors; never reuse those
+    return (isinstance(result, dict) and result.get("status") != "error"
+            and not result.get("region_errors") and not result.get("check_errors"))
+
+async def watch_agent_cards() -> None:
+    """
+    Polls AGENT_CARDS_DIR and swaps in reloaded cards, so card changes are
+    served without restarting the server. Requests keep using the previous
+    index until the new one is complete.
+    """
+    while True:
+        await asyncio.sleep(CARD_RELOAD_INTERVAL)
+        if await asyncio.to_thread(load_agent_cards):
+            validate_agents_and_cards()
+
+async def start_agents() -> None:
+    """
+    Imports the A2A_WARM_AGENTS off the event loop, then starts the singletons
+    and pools of every agent imported so far.
+    """
+    if WARM_AGENTS:
+        await asyncio.to_thread(warm_up_agents, WARM_AGENTS)
+    await start_agent_pools()
+
+CARD_WATCHER: Optional[asyncio.Task] = None
+AGENT_STARTUP: Optional[asyncio.Task] = None
+
 # --- A2A Server Endpoints ---
 
 @app.get("/.well-known/agent.json")
-async def get_agent_card():
+async def get_agent_card(request: Request):
     """
     Exposes the default Agent Card at the /.well-known/agent.json path.
     This aggregates all agent cards into one for backward compatibility.
     """
-    logger.info("Default Agent Card requested")
-    if not AGENT_CARDS:
+    aggregated = CARD_INDEX.aggregated
+    if aggregated is None:
         logger.error("No agent cards loaded, returning 500 error")
         raise HTTPException(status_code=500, detail="No agent cards loaded.")
-        
-    # Create an aggregated agent card
-    aggregated_card = {
-        "name": "Valide5 A2A Agent Hub",
-        "description": "Provides multiple security analysis capabilities via A2A protocol",
-        "url": "YOUR_SERVER_BASE_URL",
-        "version": "1.0.0",
-        "capabilities": {
-            "streaming": False,
-            "pushNotifications": False,
-            "stateTransitionHistory": False
-        },
-        "authentication": None,
-        "defaultInputModes": ["text", "json"],
-        "defaultOutputModes": ["json"],
-        "skills": []
-    }
-    
-    # Keep track of skills by a compound key of card name + skill ID
-    # This prevents skills with the same ID from different agents from being merged
-    seen_skills = {}
-    
-    # Combine skills from all agent cards
-    for card_name, card_data in AGENT_CARDS.items():
-        for skill in card_data.get("skills", []):
-            skill_id = skill.get("id")
-            # Create a unique identifier for each skill by combining card name and skill ID
-            unique_skill_key = f"{card_name}:{skill_id}"
-            
-            # If this is a new skill, add it to the aggregated card
-            if unique_skill_key not in seen_skills:
-                # Create a copy of the skill to avoid modifying the original
-                skill_copy = skill.copy()
-                
-                # Prepend the card name to the skill name for clarity in the aggregated view
-                card_prefix = card_data.get("name", "").split(" Agent")[0]
-                if card_prefix and not skill_copy.get("name", "").startswith(card_prefix):
-                    skill_copy["name"] = f"{card_prefix} - {skill_copy.get('name', skill_id)}"
-                
-                aggregated_card["skills"].append(skill_copy)
-                seen_skills[unique_skill_key] = True
-                logger.debug(f"Added skill '{skill_copy.get('name')}' from card '{card_name}'")
-    
-    # Log the total count of skills added to the aggregated card
-    logger.info(f"Created aggregated agent card with {len(aggregated_card['skills'])} skills")
-    return JSONResponse(content=aggregated_card)
+    return cached_json_response(request, aggregated)
 
 @app.get("/.well-known/agent-cards/{card_name}")
-async def get_specific_agent_card(card_name: str):
+async def get_specific_agent_card(card_name: str, request: Request):
     """
     Exposes a specific Agent Card by name.
     """
-    if card_name not in AGENT_CARDS:
+    document = CARD_INDEX.documents.get(card_name)
+    if document is None:
         raise HTTPException(status_code=404, detail=f"Agent card {card_name} not found")
-    
-    return JSONResponse(content=AGENT_CARDS[card_name])
+    return cached_json_response(request, document)
 
 @app.get("/.well-known/agent-cards")
-async def list_agent_cards():
+async def list_agent_cards(request: Request):
     """
     Lists all available agent cards.
     """
-    return JSONResponse(content={
-        "agent_cards": list(AGENT_CARDS.keys()),
-        "agent_mappings": AGENT_TO_CARD_MAP
-    })
+    return cached_json_response(request, CARD_INDEX.listing)
+
+@app.get("/a2a/metrics")
+async def get_metrics():
+    """
+    Exposes task, executor and push notification counters for monitoring.
+    """
+    return {
+        "tasks": TASK_MANAGER.stats(),
+        "agent_executor": AGENT_EXECUTOR.stats,
+        "push_notifications": PUSH_NOTIFIER.metrics(),
+        "single_flight": SINGLE_FLIGHT.stats,
+        "result_cache": RESULT_CACHE.metrics(),
+        "agent_pools": agent_pool_metrics(),
+        "scheduler": SCHEDULER.metrics()
+    }
 
 @app.post("/a2a/analyzer/{agent_id}")
 async def handle_agent_specific_request(agent_id: str, request: Request):
@@ -189,7 +312,7 @@ async def handle_agent_specific_request(agent_id: str, request: Request):
     
     # Check if agent_id is registered but marked as "coming soon"
     if agent_id.endswith("_coming_soon"):
-        return JSONResponse(
+        return A2AJSONResponse(
             status_code=503,
             content={
                 "jsonrpc": "2.0",
@@ -202,8 +325,9 @@ async def handle_agent_specific_request(agent_id: str, request: Request):
         )
     
     try:
-        payload = await request.json()
-        logger.info(f"Received A2A request payload: {json.dumps(payload, indent=2)}")
+        payload = SERIALIZER.loads(await request.body())
+        if isinstance(payload, dict):
+            log_rpc(logger, "request", agent_id, payload.get("method"), payload.get("id"), payload)
 
         # Validate JSON-RPC 2.0 structure
         if payload.get("jsonrpc") != "2.0":
@@ -223,27 +347,24 @@ async def handle_agent_specific_request(agent_id: str, request: Request):
         # Handle A2A methods
         if method == "tasks/send":
             logger.info("Processing tasks/send method")
-            
-            # Use the agent_id from the path to override the agent_id in the payload
-            task = params.get("task", {})
-            messages = task.get("messages", [])
-            if messages and len(messages) > 0:
-                user_message = messages[0]
-                if user_message.get("role") == "user" and user_message.get("parts"):
-                    for part in user_message.get("parts", []):
-                        if part.get("json"):
-                            json_part = part.get("json", {})
-                            # Log if there's a mismatch between path and payload agent_id
-                            payload_agent_id = json_part.get("agent_id")
-                            if payload_agent_id and payload_agent_id != agent_id:
-                                logger.warning(f"Agent ID mismatch: path={agent_id}, payload={payload_agent_id}")
-                            # Always use the agent_id from the path
-                            json_part["agent_id"] = agent_id
-            
+            use_path_agent_id(params, agent_id)
             response_payload = await handle_send_task(params, request_id)
-        # Add handlers for other A2A methods if needed (e.g., tasks/get, tasks/cancel)
-        # elif method == "tasks/get":
-        #     response_payload = await handle_get_task(params, request_id)
+        elif method == "tasks/sendSubscribe":
+            logger.info("Processing tasks/sendSubscribe method")
+            use_path_agent_id(params, agent_id)
+            return await handle_send_subscribe(params, request_id)
+        elif method == "tasks/get":
+            logger.info("Processing tasks/get method")
+            response_payload = await handle_get_task(params, request_id, agent_id)
+        elif method == "tasks/cancel":
+            logger.info("Processing tasks/cancel method")
+            response_payload = await handle_cancel_task(params, request_id, agent_id)
+        elif method == "tasks/pushNotification/set":
+            logger.info("Processing tasks/pushNotification/set method")
+            response_payload = await handle_set_push_notification(params, request_id, agent_id)
+        elif method == "tasks/pushNotification/get":
+            logger.info("Processing tasks/pushNotification/get method")
+            response_payload = await handle_get_push_notification(params, request_id, agent_id)
         else:
             # Method not found
             logger.error(f"Method not found: {method}")
@@ -256,12 +377,23 @@ async def handle_agent_specific_request(agent_id: str, request: Request):
                 "id": request_id
             }
 
-        logger.info(f"Sending response: {json.dumps(response_payload, indent=2)}")
-        return JSONResponse(content=response_payload)
+        log_rpc(logger, "response", agent_id, method, request_id, response_payload)
+        return A2AJSONResponse(content=response_payload)
 
+    except SchedulerBusy as e:
+        logger.warning(f"Rejecting request for agent_id {agent_id}: {e}")
+        return A2AJSONResponse(
+            status_code=503,
+            headers={"Retry-After": "1"},
+            content={
+                "jsonrpc": "2.0",
+                "error": {"code": -32003, "message": str(e)},
+                "id": payload.get("id")
+            }
+        )
     except json.JSONDecodeError:
         logger.error("JSON parse error")
-        return JSONResponse(
+        return A2AJSONResponse(
             status_code=400,
             content={
                 "jsonrpc": "2.0",
@@ -271,7 +403,7 @@ async def handle_agent_specific_request(agent_id: str, request: Request):
         )
     except ValueError as e:
         logger.error(f"Invalid request: {e}")
-        return JSONResponse(
+        return A2AJSONResponse(
             status_code=400,
             content={
                 "jsonrpc": "2.0",
@@ -281,7 +413,7 @@ async def handle_agent_specific_request(agent_id: str, request: Request):
         )
     except Exception as e:
         logger.error(f"An error occurred while processing A2A request: {e}", exc_info=True)
-        return JSONResponse(
+        return A2AJSONResponse(
             status_code=500,
             content={
                 "jsonrpc": "2.0",
@@ -292,14 +424,101 @@ async def handle_agent_specific_request(agent_id: str, request: Request):
 
 # --- A2A Method Handlers ---
 
+def use_path_agent_id(params: Optional[Dict[str, Any]], agent_id: str) -> None:
+    """
+    Use the agent_id from the path to override the agent_id in the task payload.
+    """
+    task = (params or {}).get("task", {})
+    messages = task.get("messages", [])
+    if messages and len(messages) > 0:
+        user_message = messages[0]
+        if user_message.get("role") == "user" and user_message.get("parts"):
+            for part in user_message.get("parts", []):
+                if part.get("json"):
+                    json_part = part.get("json", {})
+                    # Log if there's a mismatch between path and payload agent_id
+                    payload_agent_id = json_part.get("agent_id")
+                    if payload_agent_id and payload_agent_id != agent_id:
+                        logger.warning(f"Agent ID mismatch: path={agent_id}, payload={payload_agent_id}")
+                    # Always use the agent_id from the path
+                    json_part["agent_id"] = agent_id
+
 async def handle_send_task(params: Optional[Dict[str, Any]], request_id: Any) -> Dict[str, Any]:
     """
     Handles the 'tasks/send' A2A method.
+    The task runs in a background worker. By default the response waits for it
+    to finish; with params.blocking set to false it returns immediately in the
+    'working' state, or 'submitted' while queued for a run slot, and the
+    result is fetched later with tasks/get. A full queue is answered with a
+    -32003 busy error.
     """
-    logger.info("Processing tasks/send parameters")
+    record = await start_task(params, streaming=False)
+    if params.get("blocking", True):
+        await TASK_MANAGER.wait(record)
+    else:
+        # Let the worker start so the reply reports the task as working, or
+        # as submitted while it waits in the scheduler's queue
+        await asyncio.sleep(0)
+
+    logger.info(f"Task {record.task_id} is {record.state}")
+    return {
+        "jsonrpc": "2.0",
+        "result": {
+            "task": record.to_task(params["task"]["task_id"])
+        },
+        "id": request_id
+    }
+
+async def handle_send_subscribe(params: Optional[Dict[str, Any]], request_id: Any) -> StreamingResponse:
+    """
+    Handles the 'tasks/sendSubscribe' A2A method.
+    Streams TaskStatusUpdateEvent and TaskArtifactUpdateEvent messages as
+    Server-Sent Events while the task runs; agents that implement
+    analyze_stream deliver partial results as artifacts before they finish.
+    The stream ends with the final status event. Disconnecting does not
+    cancel the task, which stays available through tasks/get.
+    """
+    record = await start_task(params, streaming=True)
+    task_id = params["task"]["task_id"]
+    # Replay what an existing task already produced, then follow it; both
+    # happen before the worker next runs so no event is missed or repeated
+    replay = [{"task_id": record.task_id, "artifact": artifact} for artifact in record.artifacts]
+    if record.is_final:
+        replay.append({"task_id": record.task_id, "status": record.status(), "final": True})
+    events = record.subscribe() if not record.is_final else None
+
+    def format_event(event: Dict[str, Any]) -> str:
+        # Events are reported under the caller's task_id, which may be an alias
+        message = {"jsonrpc": "2.0", "result": dict(event, task_id=task_id), "id": request_id}
+        return f"data: {SERIALIZER.dumps(message).decode()}\n\n"
+
+    async def event_stream() -> AsyncIterator[str]:
+        for event in replay:
+            yield format_event(event)
+        if events is None:
+            return
+        try:
+            while True:
+                event = await events.get()
+                yield format_event(event)
+                if event.get("final"):
+                    break
+        finally:
+            record.unsubscribe(events)
+
+    return StreamingResponse(event_stream(), media_type="text/event-stream",
+                             headers={"Cache-Control": "no-cache"})
+
+async def start_task(params: Optional[Dict[str, Any]], streaming: bool) -> TaskRecord:
+    """
+    Validates the task in tasks/send or tasks/sendSubscribe params and submits
+    it to the task manager. Streaming tasks record the agent's partial results
+    as task artifacts.
+    """
+    logger.info("Processing task parameters")
     if not params or "task" not in params:
-        logger.error("Missing 'task' in params for tasks/send")
-        raise ValueError("Missing 'task' in params for tasks/send")
+        logger.error("Missing 'task' in params")
+        raise ValueError("Missing 'task' in params")
 
     task = params.get("task")
     task_id = task.get("task_id")
@@ -307,7 +526,7 @@ async def handle_send_task(params: Optional[Dict[str, Any]], request_id: Any) ->
     task_context = task.get("context") # Optional task-level context
 
     logger.info(f"Task ID: {task_id}")
-    logger.debug(f"Task context: {task_context}")
+    logger.debug("Task context: %s", LogPayload(task_context))
 
     if not task_id or not isinstance(messages, list) or not messages:
          logger.error("Invalid or missing fields in task object")
@@ -336,58 +555,250 @@ async def handle_send_task(params: Optional[Dict[str, Any]], request_id: Any) ->
     request_context = task_details.get("context", {}) # Context from the client request payload
     
     logger.info(f"Received task_id: {task_id}, agent_id: {agent_id}, skill_id: {skill_id}")
-    logger.info(f"Parameters: {parameters}")
-    logger.debug(f"Context: {request_context}")
+    logger.debug("Parameters: %s", LogPayload(parameters))
+    logger.debug("Context: %s", LogPayload(request_context))
+
+    # Lazily listed agents are imported off the event loop before their options are read
+    await import_agent(agent_id, skill_id)
+
+    # Agent, skill, normalized public parameters and credential fingerprint
+    fingerprint = request_fingerprint(agent_id, skill_id, parameters)
+
+    # params.bypassCache forces a fresh analysis, which then refreshes the cache
+    bypass_cache = bool(params.get("bypassCache", False))
+    cache_ttl = result_cache_ttl(agent_id, skill_id)
+
+    async def run(record: TaskRecord) -> Dict[str, Any]:
+        if cache_ttl > 0:
+            if bypass_cache:
+                RESULT_CACHE.stats["bypasses"] += 1
+            else:
+                cached = RESULT_CACHE.get(fingerprint)
+                if cached is not None:
+                    logger.info(f"Serving task {task_id} from the result cache")
+                    if streaming:
+                        record.add_artifact(RESULT_ARTIFACT, cached)
+                    return cached
+
+        if not streaming:
+            # Concurrent identical analyses share one execution
+            result = await SINGLE_FLIGHT.run(
+                fingerprint,
+                lambda: execute_agent(agent_id, skill_id, parameters, request_context, task_context),
+                reusable=is_reusable_result,
+                reuse_recent=not bypass_cache
+            )
+        else:
+            result = {}
+            async for artifact in execute_agent_stream(agent_id, skill_id, parameters, request_context, task_context):
+                record.add_artifact(artifact["name"], artifact["json"])
+                if artifact["name"] == RESULT_ARTIFACT:
+                    result = artifact["json"]
+
+        if cache_ttl > 0 and is_reusable_result(result):
+            RESULT_CACHE.put(fingerprint, result, cache_ttl)
+        return result
+
+    # params.priority orders queued tasks; tenants share slots within a priority
+    priority = params.get("priority", DEFAULT_PRIORITY)
+    if priority not in PRIORITIES:
+        raise ValueError(f"Invalid priority '{priority}', expected one of {', '.join(PRIORITIES)}")
+    tenant = tenant_of(request_context)
+
+    # Optional PushNotificationConfig, validated before the task starts
+    push_config = params.get("pushNotification")
+    if push_config is not None:
+        push_config = await accept_push_config(push_config)
+
+    def admit():
+        # A cached result is served without a run slot, and an identical
+        # analysis, which single-flight executes once, shares the slot of the
+        # first one rather than taking another
+        if cache_ttl > 0 and not bypass_cache and RESULT_CACHE.contains(fingerprint):
+            return None
+        return SCHEDULER.reserve(agent_id, concurrency_limit(agent_id, skill_id), tenant=tenant,
+                                 priority=priority, share_key=None if streaming else fingerprint)
+
+    # Repeats of a task_id - or, with params.idempotent, of the same request
+    # under a new task_id - attach to the existing execution. The record keeps
+    # the request with its secret parameters masked, as tasks/get returns it
+    record = TASK_MANAGER.submit(task_id, agent_id, mask_secrets(messages), mask_secrets(task_context), run,
+                                 fingerprint=fingerprint,
+                                 dedupe_by_fingerprint=bool(params.get("idempotent", False)),
+                                 admit=admit)
+    if push_config is not None:
+        # Kept per task_id, so a request attached to another's execution
+        # does not replace that requester's webhook
+        record.push_notifications[task_id] = push_config
+        if record.is_final:
+            push_finished_task(record, [task_id])
+    return record
+
+async def handle_get_task(params: Optional[Dict[str, Any]], request_id: Any, agent_id: str) -> Dict[str, Any]:
+    """
+    Handles the 'tasks/get' A2A method.
+    """
+    task_id = (params or {}).get("task_id") or (params or {}).get("id")
+    if not task_id:
+        logger.error("Missing 'task_id' in params for tasks/get")
+        raise ValueError("Missing 'task_id' in params for tasks/get")
+
+    record = TASK_MANAGER.get(task_id)
+    if record is None or record.agent_id != agent_id:
+        return jsonrpc_error(-32001, f"Task not found: {task_id}", request_id)
+    return {
+        "jsonrpc": "2.0",
+        "result": {
+            "task": record.to_task(task_id)
+        },
+        "id": request_id
+    }
 
-    # Get agent implementation from registry
-    agent_class = get_agent(agent_id, skill_id)
-    
-    if agent_class:
-        # Use registered agent implementation
-        logger.info(f"Using registered agent implementation for agent_id '{agent_id}', skill_id '{skill_id}'")
-        agent = agent_class()
-        analysis_results = await agent.analyze(agent_id, skill_id, parameters, request_context, task_context)
-    else:
-        # Fallback to default analysis
-        logger.warning(f"No registered agent found for agent_id '{agent_id}', skill_id '{skill_id}'. Using fallback.")
-        analysis_results = await perform_default_analysis(agent_id, skill_id, parameters, request_context, task_context)
-
-    # Construct the A2A response payload
-    # A successful tasks/send response typically returns the updated Task object
-    response_task = {
-        "task_id": task_id,
-        "status": {
-            "state": "completed" # Or "failed", "working", "input-required"
-            # Add error details if state is "failed"
-            # "error": { ... }
+async def handle_cancel_task(params: Optional[Dict[str, Any]], request_id: Any, agent_id: str) -> Dict[str, Any]:
+    """
+    Handles the 'tasks/cancel' A2A method.
+    """
+    task_id = (params or {}).get("task_id") or (params or {}).get("id")
+    if not task_id:
+        logger.error("Missing 'task_id' in params for tasks/cancel")
+        raise ValueError("Missing 'task_id' in params for tasks/cancel")
+
+    record = TASK_MANAGER.get(task_id)
+    if record is None or record.agent_id != agent_id:
+        return jsonrpc_error(-32001, f"Task not found: {task_id}", request_id)
+    if record.is_final:
+        return jsonrpc_error(-32002, f"Task {task_id} is already {record.state} and cannot be canceled", request_id)
+
+    await TASK_MANAGER.cancel(task_id)
+    logger.info(f"Task {task_id} is {record.state}")
+    return {
+        "jsonrpc": "2.0",
+        "result": {
+            "task": record.to_task(task_id)
         },
-        "messages": messages + [ # Include original messages + agent's reply
-            {
-                "role": "agent",
-                "parts": [
-                    {
-                        "text": "Analysis completed.",
-                        "json": analysis_results # Include the analysis results as a JSON part
-                    }
-                ]
-            }
-        ],
-        "context": task_context # Include original task-level context
-        # Add artifacts if the analysis generated files or other artifacts
-        # "artifacts": [ ... ]
+        "id": request_id
     }
 
-    logger.info("Successfully created response task")
-    logger.debug(f"Response task: {response_task}")
+async def handle_set_push_notification(params: Optional[Dict[str, Any]], request_id: Any,
+                                       agent_id: str) -> Dict[str, Any]:
+    """
+    Handles the 'tasks/pushNotification/set' A2A method.
+    The finished task's id, status and artifacts are POSTed to the configured
+    URL, with the token as a bearer token; a task that has already finished
+    is pushed right away. Non-public webhook targets are rejected.
+    """
+    task_id = (params or {}).get("task_id") or (params or {}).get("id")
+    if not task_id:
+        logger.error("Missing 'task_id' in params for tasks/pushNotification/set")
+        raise ValueError("Missing 'task_id' in params for tasks/pushNotification/set")
+    push_config = await accept_push_config(params.get("pushNotificationConfig"))
+
+    record = TASK_MANAGER.get(task_id)
+    if record is None or record.agent_id != agent_id:
+        return jsonrpc_error(-32001, f"Task not found: {task_id}", request_id)
+    record.push_notifications[task_id] = push_config
+    if record.is_final:
+        push_finished_task(record, [task_id])
+    return {
+        "jsonrpc": "2.0",
+        "result": {
+            "task_id": task_id,
+            "pushNotificationConfig": push_config
+        },
+        "id": request_id
+    }
 
+async def handle_get_push_notification(params: Optional[Dict[str, Any]], request_id: Any,
+                                       agent_id: str) -> Dict[str, Any]:
+    """
+    Handles the 'tasks/pushNotification/get' A2A method.
+    """
+    task_id = (params or {}).get("task_id") or (params or {}).get("id")
+    if not task_id:
+        logger.error("Missing 'task_id' in params for tasks/pushNotification/get")
+        raise ValueError("Missing 'task_id' in params for tasks/pushNotification/get")
+
+    record = TASK_MANAGER.get(task_id)
+    if record is None or record.agent_id != agent_id:
+        return jsonrpc_error(-32001, f"Task not found: {task_id}", request_id)
     return {
         "jsonrpc": "2.0",
         "result": {
-            "task": response_task
+            "task_id": task_id,
+            "pushNotificationConfig": record.push_notifications.get(task_id)
+        },
+        "id": request_id
+    }
+
+def jsonrpc_error(code: int, message: str, request_id: Any) -> Dict[str, Any]:
+    """
+    Builds a JSON-RPC 2.0 error response payload.
+    """
+    return {
+        "jsonrpc": "2.0",
+        "error": {
+            "code": code,
+            "message": message
         },
         "id": request_id
     }
 
+async def execute_agent(agent_id: str, skill_id: str, parameters: Dict[str, Any],
+                        request_context: Dict[str, Any], task_context: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Runs the registered agent implementation for (agent_id, skill_id), or the
+    default analysis fallback, and returns its analysis results.
+    """
+    # Get the agent implementation's instance pool from the registry
+    pool = get_agent_pool(agent_id, skill_id)
+    
+    if pool:
+        # Use registered agent implementation
+        logger.info(f"Using registered agent implementation for agent_id '{agent_id}', skill_id '{skill_id}'")
+        options = get_agent_options(agent_id, skill_id)
+        async with pool.lease() as agent:
+            if options["blocking"]:
+                # Keep synchronous SDK calls off the event loop
+                return await AGENT_EXECUTOR.run(
+                    agent_id, skill_id,
+                    lambda: agent.analyze(agent_id, skill_id, parameters, request_context, task_context),
+                    options["max_workers"]
+                )
+            return await agent.analyze(agent_id, skill_id, parameters, request_context, task_context)
+
+    # Fallback to default analysis
+    logger.warning(f"No registered agent found for agent_id '{agent_id}', skill_id '{skill_id}'. Using fallback.")
+    return await perform_default_analysis(agent_id, skill_id, parameters, request_context, task_context)
+
+async def execute_agent_stream(agent_id: str, skill_id: str, parameters: Dict[str, Any],
+                               request_context: Dict[str, Any],
+                               task_context: Optional[Dict[str, Any]]) -> AsyncIterator[Dict[str, Any]]:
+    """
+    Streaming counterpart of execute_agent: yields the agent's artifacts as
+    they are produced, ending with the RESULT_ARTIFACT.
+    """
+    pool = get_agent_pool(agent_id, skill_id)
+
+    if not pool:
+        logger.warning(f"No registered agent found for agent_id '{agent_id}', skill_id '{skill_id}'. Using fallback.")
+        yield {"name": RESULT_ARTIFACT,
+               "json": await perform_default_analysis(agent_id, skill_id, parameters, request_context, task_context)}
+        return
+
+    logger.info(f"Streaming registered agent implementation for agent_id '{agent_id}', skill_id '{skill_id}'")
+    options = get_agent_options(agent_id, skill_id)
+    async with pool.lease() as agent:
+        if options["blocking"]:
+            artifacts = AGENT_EXECUTOR.stream(
+                agent_id, skill_id,
+                lambda: agent.analyze_stream(agent_id, skill_id, parameters, request_context, task_context),
+                options["max_workers"]
+            )
+        else:
+            artifacts = agent.analyze_stream(agent_id, skill_id, parameters, request_context, task_context)
+        async for artifact in artifacts:
+            yield artifact
+
 # --- Default Analysis Fallback ---
 async def perform_default_analysis(agent_id: str, skill_id: str, parameters: Dict[str, Any], 
                                  request_context: Dict[str, Any], task_context: Optional[Dict[str, Any]]) -> Dict[str, Any]:
@@ -407,7 +818,8 @@ async def perform_default_analysis(agent_id: str, skill_id: str, parameters: Dic
         "timestamp": datetime.utcnow().isoformat(),
         "agent_id": agent_id,
         "skill_id": skill_id,
-        "parameters_received": parameters
+        # Masked: this result is kept for tasks/get, cached and pushed to webhooks
+        "parameters_received": mask_secrets(parameters)
     }
     
     logger.info("Default analysis complete")
@@ -0,0 +1,104 @@
+import asyncio
+import os
+import threading
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Pool size for blocking agents that do not declare max_workers
+DEFAULT_BLOCKING_WORKERS = int(os.environ.get("A2A_BLOCKING_WORKERS", "4"))
+
+
+class AgentExecutor:
+    """
+    Runs blocking agents off the server's event loop.
+
+    Every (agent_id, skill_id) registered with blocking=True gets its own
+    thread pool of at most max_workers threads, so a slow scan can neither
+    stall the event loop nor take threads away from other agents. The agent's
+    analyze coroutine runs to completion on a private event loop in the worker
+    thread; cancelling the awaiting task does not interrupt it.
+    """
+
+    def __init__(self, default_workers: int = DEFAULT_BLOCKING_WORKERS):
+        self.default_workers = default_workers
+        self.stats: Dict[str, int] = {"submitted": 0, "running": 0, "completed": 0, "failed": 0}
+        self._pools: Dict[Tuple[str, str], ThreadPoolExecutor] = {}
+        self._lock = threading.Lock()
+
+    def pool(self, agent_id: str, skill_id: str, max_workers: Optional[int] = None) -> ThreadPoolExecutor:
+        """Return the thread pool for the agent, creating it on first use."""
+        key = (agent_id, skill_id)
+        with self._lock:
+            executor = self._pools.get(key)
+            if executor is None:
+                workers = max_workers or self.default_workers
+                executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix=f"agent-{agent_id}")
+                self._pools[key] = executor
+                logger.info(f"Created {workers}-thread pool for blocking agent '{agent_id}', skill_id '{skill_id}'")
+            return executor
+
+    async def run(self, agent_id: str, skill_id: str, factory: Callable[[], Awaitable[Any]],
+                  max_workers: Optional[int] = None) -> Any:
+        """
+        Run factory() - typically a bound agent.analyze call - on the agent's
+        pool and return its result.
+        """
+        executor = self.pool(agent_id, skill_id, max_workers)
+        loop = asyncio.get_running_loop()
+        self._count("submitted", 1)
+        return await loop.run_in_executor(executor, self._run_coroutine, factory)
+
+    async def stream(self, agent_id: str, skill_id: str, factory: Callable[[], AsyncIterator[Any]],
+                     max_workers: Optional[int] = None) -> AsyncIterator[Any]:
+        """
+        Iterate factory() - typically a bound agent.analyze_stream call - on the
+        agent's pool, yielding each item on the caller's loop as soon as the
+        worker produces it. Errors raised by the agent are re-raised at the end.
+        """
+        executor = self.pool(agent_id, skill_id, max_workers)
+        loop = asyncio.get_running_loop()
+        items: asyncio.Queue = asyncio.Queue()
+
+        async def drain() -> None:
+            async for item in factory():
+                loop.call_soon_threadsafe(items.put_nowait, (False, item))
+
+        self._count("submitted", 1)
+        future = loop.run_in_executor(executor, self._run_coroutine, drain)
+        # Completion is delivered after every item the worker queued before it
+        future.add_done_callback(lambda _: items.put_nowait((True, None)))
+        while True:
+            finished, item = await items.get()
+            if finished:
+                break
+            yield item
+        await future
+
+    def shutdown(self, wait: bool = True) -> None:
+        """Shut down every pool; queued work that has not started is dropped."""
+        with self._lock:
+            pools = list(self._pools.values())
+            self._pools.clear()
+        for executor in pools:
+            executor.shutdown(wait=wait, cancel_futures=True)
+
+    def _run_coroutine(self, factory: Callable[[], Awaitable[Any]]) -> Any:
+        # Each worker thread drives the agent's coroutine on its own event loop
+        self._count("running", 1)
+        try:
+            result = asyncio.run(factory())
+        except BaseException:
+            self._count("failed", 1)
+            raise
+        else:
+            self._count("completed", 1)
+            return result
+        finally:
+            self._count("running", -1)
+
+    def _count(self, name: str, delta: int) -> None:
+        with self._lock:
+            self.stats[name] += delta
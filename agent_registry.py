@@ -1,24 +1,87 @@
-from typing import Dict, Type, Callable, Any, Optional
+from typing import AsyncIterator, Deque, Dict, Type, Callable, Any, List, Optional, Set, Tuple
+import asyncio
 import importlib
+import json
+import os
 import pkgutil
+import tempfile
 import logging
 from abc import ABC, abstractmethod
+from collections import deque
+from contextlib import asynccontextmanager
 
 logger = logging.getLogger(__name__)
 
+# Where load_agents(lazy=True) caches which module registers each agent
+AGENT_MANIFEST_PATH = os.environ.get("A2A_AGENT_MANIFEST", os.path.join(
+    os.environ.get("A2A_CACHE_DIR", os.path.join(tempfile.gettempdir(), "a2a-security-agents")),
+    "agent_manifest.json"
+))
+
+# Name of the streamed artifact that carries an agent's complete results
+RESULT_ARTIFACT = "result"
+
 # Base Agent class
 class BaseA2AAgent(ABC):
+    async def startup(self) -> None:
+        """
+        Prepare warm state (clients, reference data) before the instance
+        serves its first analysis. Runs on the server's event loop.
+        """
+
+    async def shutdown(self) -> None:
+        """Release what startup acquired; called once the instance is retired."""
+
     @abstractmethod
     async def analyze(self, agent_id: str, skill_id: str, parameters: Dict[str, Any], 
                      request_context: Dict[str, Any], task_context: Optional[Dict[str, Any]]) -> Dict[str, Any]:
         """Perform analysis and return results"""
         pass
 
+    async def analyze_stream(self, agent_id: str, skill_id: str, parameters: Dict[str, Any],
+                             request_context: Dict[str, Any],
+                             task_context: Optional[Dict[str, Any]]) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Perform analysis, yielding artifacts {"name": ..., "json": ...} as partial
+        results become available. The last artifact is named RESULT_ARTIFACT and
+        holds the same results analyze returns. By default that is the only one.
+        """
+        yield {"name": RESULT_ARTIFACT, "json": await self.analyze(agent_id, skill_id, parameters,
+                                                                  request_context, task_context)}
+
+async def collect_result(artifacts: AsyncIterator[Dict[str, Any]]) -> Dict[str, Any]:
+    """Drain an analyze_stream and return the results of its RESULT_ARTIFACT"""
+    result: Dict[str, Any] = {}
+    async for artifact in artifacts:
+        if artifact.get("name") == RESULT_ARTIFACT:
+            result = artifact["json"]
+    return result
+
 # Registry to store agent implementations
 _agent_registry: Dict[str, Dict[str, Type[BaseA2AAgent]]] = {}
 
-def register_agent(agent_id: str, skill_id: str = "analyze") -> Callable:
-    """Decorator to register an agent implementation"""
+# Execution options declared at registration, keyed by (agent_id, skill_id)
+_agent_options: Dict[Tuple[str, str], Dict[str, Any]] = {}
+
+# Modules of agents that are not imported yet: agent_id -> skill_id -> module
+_agent_manifest: Dict[str, Dict[str, str]] = {}
+
+def register_agent(agent_id: str, skill_id: str = "analyze", blocking: bool = False,
+                   max_workers: Optional[int] = None, result_ttl: Optional[float] = None,
+                   singleton: bool = False, pool_size: Optional[int] = None,
+                   max_concurrency: Optional[int] = None) -> Callable:
+    """
+    Decorator to register an agent implementation.
+    Agents whose analyze makes synchronous calls (boto3, requests) should set
+    blocking=True so the server runs them on a dedicated thread pool of
+    max_workers threads instead of on the event loop. result_ttl is how many
+    seconds the server may serve a cached result for an identical request.
+    By default every analysis gets a new instance. singleton=True shares one
+    instance between all concurrent analyses; pool_size=N keeps up to N
+    instances, each used by one analysis at a time. max_concurrency caps how
+    many of the agent's tasks run at once; further tasks wait in the server's
+    task queue.
+    """
     def decorator(cls):
         if not issubclass(cls, BaseA2AAgent):
             raise TypeError(f"Class {cls.__name__} must inherit from BaseA2AAgent")
@@ -27,32 +90,322 @@ def register_agent(agent_id: str, skill_id: str = "analyze") -> Callable:
             _agent_registry[agent_id] = {}
             
         _agent_registry[agent_id][skill_id] = cls
+        _agent_options[(agent_id, skill_id)] = {"blocking": blocking, "max_workers": max_workers,
+                                                "result_ttl": result_ttl, "singleton": singleton,
+                                                "pool_size": pool_size, "max_concurrency": max_concurrency}
         logger.info(f"Registered A2A agent '{cls.__name__}' for agent_id '{agent_id}', skill_id '{skill_id}'")
         return cls
     return decorator
 
+def _import_from_manifest(agent_id: str, skill_id: str) -> None:
+    """Import the module of an agent listed in the manifest but not registered yet"""
+    if skill_id in _agent_registry.get(agent_id, {}):
+        return
+    module = _agent_manifest.get(agent_id, {}).get(skill_id)
+    if module is None:
+        return
+    try:
+        importlib.import_module(module)
+        logger.info(f"Imported agent module {module} for agent_id '{agent_id}' on first use")
+    except ImportError as e:
+        logger.error(f"Failed to import agent {module}: {str(e)}")
+    if skill_id not in _agent_registry.get(agent_id, {}):
+        logger.error(f"Agent manifest lists agent_id '{agent_id}', skill_id '{skill_id}' in {module}, "
+                     f"which does not register it")
+        _agent_manifest.get(agent_id, {}).pop(skill_id, None)
+
+# Imports in progress on worker threads, keyed by module
+_import_locks: Dict[str, asyncio.Lock] = {}
+
+async def import_agent(agent_id: str, skill_id: str = "analyze") -> None:
+    """
+    Import the module of an agent listed in the manifest on a worker thread,
+    so loading boto3 and the agent on first use does not block the event
+    loop. Concurrent calls for one module wait for a single import.
+    """
+    if skill_id in _agent_registry.get(agent_id, {}):
+        return
+    module = _agent_manifest.get(agent_id, {}).get(skill_id)
+    if module is None:
+        return
+    async with _import_locks.setdefault(module, asyncio.Lock()):
+        await asyncio.to_thread(_import_from_manifest, agent_id, skill_id)
+    _import_locks.pop(module, None)
+
 def get_agent(agent_id: str, skill_id: str = "analyze") -> Optional[Type[BaseA2AAgent]]:
-    """Get agent implementation by agent_id and skill_id"""
+    """
+    Get agent implementation by agent_id and skill_id, importing it on first
+    use; async callers should await import_agent first.
+    """
+    _import_from_manifest(agent_id, skill_id)
     if agent_id in _agent_registry and skill_id in _agent_registry[agent_id]:
         return _agent_registry[agent_id][skill_id]
     return None
 
-def load_agents() -> None:
-    """Dynamically load all agent implementations"""
+def get_agent_options(agent_id: str, skill_id: str = "analyze") -> Dict[str, Any]:
+    """Get the execution options an agent implementation was registered with"""
+    _import_from_manifest(agent_id, skill_id)
+    return _agent_options.get((agent_id, skill_id), {"blocking": False, "max_workers": None, "result_ttl": None,
+                                                     "singleton": False, "pool_size": None, "max_concurrency": None})
+
+class AgentPool:
+    """
+    Instances of one registered agent, handed out per analysis.
+
+    With size None every lease gets a new instance that is started before and
+    shut down after the analysis. A shared pool starts one instance on first
+    use and leases it to every caller at once. Otherwise up to size instances
+    are started on demand, each leased to one caller at a time; further
+    callers wait in FIFO order until an instance is returned.
+    """
+
+    def __init__(self, agent_class: Type[BaseA2AAgent], size: Optional[int] = None, shared: bool = False):
+        self.agent_class = agent_class
+        self.size = 1 if shared else size
+        self.shared = shared
+        self.in_use = 0
+        self.stats = {"leases": 0, "waits": 0, "created": 0, "startup_failures": 0, "peak_in_use": 0}
+        self._instances: List[BaseA2AAgent] = []
+        self._idle: List[BaseA2AAgent] = []
+        self._starting = 0
+        self._waiters: Deque[asyncio.Future] = deque()
+
+    @asynccontextmanager
+    async def lease(self) -> AsyncIterator[BaseA2AAgent]:
+        """Borrow an instance for the duration of the block."""
+        agent = await self._acquire()
+        try:
+            yield agent
+        finally:
+            await self._release(agent)
+
+    async def start(self) -> None:
+        """Start the pool's first instance now rather than on first use."""
+        if self.size is not None and not self._instances and not self._starting:
+            async with self.lease():
+                pass
+
+    async def close(self) -> None:
+        """Shut down every instance the pool started."""
+        instances, self._instances, self._idle = self._instances, [], []
+        for agent in instances:
+            await self._shutdown(agent)
+
+    def metrics(self) -> Dict[str, Any]:
+        """Pool size and utilization for monitoring."""
+        return dict(
+            self.stats,
+            mode="singleton" if self.shared else "pool" if self.size is not None else "per_request",
+            size=self.size,
+            instances=len(self._instances),
+            in_use=self.in_use,
+            waiting=len(self._waiters),
+            utilization=round(self.in_use / self.size, 3) if self.size else None
+        )
+
+    async def _acquire(self) -> BaseA2AAgent:
+        while True:
+            if self._idle:
+                agent = self._idle[-1] if self.shared else self._idle.pop()
+                break
+            if self.size is None or len(self._instances) + self._starting < self.size:
+                agent = await self._create()
+                break
+            waiter = asyncio.get_running_loop().create_future()
+            self._waiters.append(waiter)
+            self.stats["waits"] += 1
+            try:
+                await waiter
+            except asyncio.CancelledError:
+                if waiter.done():
+                    # Hand the wakeup on to the next caller
+                    self._wake()
+                else:
+                    self._waiters.remove(waiter)
+                raise
+        self.in_use += 1
+        self.stats["leases"] += 1
+        self.stats["peak_in_use"] = max(self.stats["peak_in_use"], self.in_use)
+        return agent
+
+    async def _create(self) -> BaseA2AAgent:
+        self._starting += 1
+        try:
+            agent = self.agent_class()
+            await agent.startup()
+        except BaseException:
+            self._starting -= 1
+            self.stats["startup_failures"] += 1
+            # A waiter may try starting the instance that failed
+            self._wake()
+            raise
+        self._starting -= 1
+        self.stats["created"] += 1
+        if self.size is not None:
+            self._instances.append(agent)
+            if self.shared:
+                self._idle.append(agent)
+                self._wake(all_waiters=True)
+        return agent
+
+    async def _release(self, agent: BaseA2AAgent) -> None:
+        self.in_use -= 1
+        if self.size is None:
+            await self._shutdown(agent)
+        elif not self.shared and agent in self._instances:
+            self._idle.append(agent)
+            self._wake()
+
+    async def _shutdown(self, agent: BaseA2AAgent) -> None:
+        try:
+            await agent.shutdown()
+        except Exception as e:
+            logger.error(f"Error shutting down agent {type(agent).__name__}: {str(e)}")
+
+    def _wake(self, all_waiters: bool = False) -> None:
+        while self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+                if not all_waiters:
+                    return
+
+# Instance pools of agents that have served an analysis, keyed by (agent_id, skill_id)
+_agent_pools: Dict[Tuple[str, str], AgentPool] = {}
+
+def get_agent_pool(agent_id: str, skill_id: str = "analyze") -> Optional[AgentPool]:
+    """Get the instance pool of a registered agent, importing it on first use"""
+    pool = _agent_pools.get((agent_id, skill_id))
+    if pool is None:
+        agent_class = get_agent(agent_id, skill_id)
+        if agent_class is None:
+            return None
+        options = get_agent_options(agent_id, skill_id)
+        pool = AgentPool(agent_class, size=options["pool_size"], shared=options["singleton"])
+        _agent_pools[(agent_id, skill_id)] = pool
+    return pool
+
+async def start_agent_pools() -> None:
+    """Start the singletons and pools of every agent imported so far"""
+    for agent_id, skills in list(_agent_registry.items()):
+        for skill_id in list(skills):
+            try:
+                await get_agent_pool(agent_id, skill_id).start()
+            except Exception as e:
+                logger.error(f"Failed to start agent_id '{agent_id}', skill_id '{skill_id}': {str(e)}")
+
+async def shutdown_agent_pools() -> None:
+    """Shut down every pooled agent instance and forget the pools"""
+    pools = list(_agent_pools.values())
+    _agent_pools.clear()
+    for pool in pools:
+        await pool.close()
+
+def agent_pool_metrics() -> Dict[str, Dict[str, Any]]:
+    """Utilization of every agent pool, keyed by 'agent_id/skill_id'"""
+    return {f"{agent_id}/{skill_id}": pool.metrics() for (agent_id, skill_id), pool in _agent_pools.items()}
+
+def known_agent_ids() -> Set[str]:
+    """agent_ids that are registered or can be imported from the manifest"""
+    return set(_agent_registry) | {agent_id for agent_id, skills in _agent_manifest.items() if skills}
+
+def warm_up_agents(agent_ids: List[str]) -> None:
+    """Import the modules of the given agents now instead of on first use"""
+    for agent_id in agent_ids:
+        for skill_id in list(_agent_manifest.get(agent_id, {})):
+            _import_from_manifest(agent_id, skill_id)
+
+def _module_signatures(agents_path: List[str]) -> Dict[str, List[int]]:
+    # (mtime_ns, size) of every module file; any change invalidates the manifest
+    signatures = {}
+    for directory in agents_path:
+        with os.scandir(directory) as entries:
+            for entry in entries:
+                if entry.name.endswith(".py") and entry.is_file():
+                    stat = entry.stat()
+                    signatures[entry.path] = [stat.st_mtime_ns, stat.st_size]
+    return signatures
+
+def build_manifest(agents_package: str = 'agents') -> Dict[str, Any]:
+    """
+    Import every agent module and record the module that registers each
+    (agent_id, skill_id), along with the module file signatures it is valid for.
+    """
+    agents_module = importlib.import_module(agents_package)
+    _import_agent_modules(agents_package, agents_module.__path__)
+    agents: Dict[str, Dict[str, str]] = {}
+    for agent_id, skills in _agent_registry.items():
+        for skill_id, cls in skills.items():
+            if cls.__module__.startswith(f"{agents_package}."):
+                agents.setdefault(agent_id, {})[skill_id] = cls.__module__
+    return {"modules": _module_signatures(list(agents_module.__path__)), "agents": agents}
+
+def write_manifest(manifest: Dict[str, Any], path: str = AGENT_MANIFEST_PATH) -> None:
+    """Write a manifest atomically, so concurrent workers never read a partial one"""
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+    os.replace(tmp_path, path)
+
+def read_manifest(agents_path: List[str], path: str = AGENT_MANIFEST_PATH) -> Optional[Dict[str, Any]]:
+    """Return the manifest at path if it matches the current agent modules, else None"""
+    try:
+        with open(path) as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if manifest.get("modules") != _module_signatures(agents_path):
+        logger.info(f"Agent manifest {path} is out of date")
+        return None
+    return manifest
+
+def _import_agent_modules(agents_package: str, agents_path: List[str]) -> None:
+    # Discover and import all modules in the agents package
+    for _, name, is_pkg in pkgutil.iter_modules(agents_path):
+        try:
+            importlib.import_module(f'{agents_package}.{name}')
+            logger.debug(f"Loaded agent module: {name}")
+        except ImportError as e:
+            logger.error(f"Failed to import agent {name}: {str(e)}")
+
+def load_agents(lazy: bool = False, manifest_path: str = AGENT_MANIFEST_PATH) -> None:
+    """
+    Dynamically load all agent implementations. With lazy=True agents are
+    read from the manifest at manifest_path and imported on first use; a
+    missing or outdated manifest is rebuilt by importing every agent once.
+    """
     agents_package = 'agents'
     try:
         # Import the agents package
         agents_module = importlib.import_module(agents_package)
-        agents_path = agents_module.__path__
-        
-        # Discover and import all modules in the agents package
-        for _, name, is_pkg in pkgutil.iter_modules(agents_path):
+        agents_path = list(agents_module.__path__)
+
+        if lazy:
+            manifest = read_manifest(agents_path, manifest_path)
+            if manifest is not None:
+                for agent_id, skills in manifest["agents"].items():
+                    _agent_manifest.setdefault(agent_id, {}).update(skills)
+                logger.info(f"Found {len(manifest['agents'])} A2A agents in {manifest_path}, importing on first use")
+                return
+            manifest = build_manifest(agents_package)
             try:
-                importlib.import_module(f'{agents_package}.{name}')
-                logger.debug(f"Loaded agent module: {name}")
-            except ImportError as e:
-                logger.error(f"Failed to import agent {name}: {str(e)}")
-                
+                write_manifest(manifest, manifest_path)
+                logger.info(f"Wrote agent manifest {manifest_path}")
+            except OSError as e:
+                logger.warning(f"Could not write agent manifest {manifest_path}: {str(e)}")
+        else:
+            _import_agent_modules(agents_package, agents_path)
+
         logger.info(f"Loaded {len(_agent_registry)} A2A agents")
     except ImportError as e:
-        logger.error(f"Failed to load agents package: {str(e)}") 
\ No newline at end of file
+        logger.error(f"Failed to load agents package: {str(e)}")
+
+if __name__ == "__main__":
+    # Build-time manifest generation: python agent_registry.py [path]
+    # Agents register with the imported agent_registry module, not __main__
+    import sys
+    import agent_registry
+    logging.basicConfig(level=logging.INFO)
+    agent_registry.write_manifest(agent_registry.build_manifest(),
+                                  sys.argv[1] if len(sys.argv) > 1 else agent_registry.AGENT_MANIFEST_PATH)
@@ -1,17 +1,160 @@
 import os
 import json
-import yaml
-import boto3
-import requests
+import asyncio
 from datetime import datetime
-from typing import Dict, Any, List, Optional
+from typing import AsyncIterator, Dict, Any, List, Optional, Tuple
+from urllib.parse import unquote
+from botocore.config import Config
 from botocore.exceptions import ClientError
+from concurrent.futures import ThreadPoolExecutor
 import logging
-from agent_registry import BaseA2AAgent, register_agent
+from agent_registry import RESULT_ARTIFACT, BaseA2AAgent, collect_result, register_agent
+from aws_context import AWSTaskContext
+from request_logging import LogPayload
+from reference_data import DEFAULT_CACHE_DIR, TRUSTED_ACCOUNTS_FILES, ReferenceDataCache
 
 logger = logging.getLogger(__name__)
 
-@register_agent('aws_account_analysis-a2a')
+def parse_known_accounts(vendors: Any) -> Dict[str, Dict[str, Any]]:
+    """
+    Build mapping account_id -> vendor metadata from the parsed accounts.yaml.
+    """
+    mapping: Dict[str, Dict[str, Any]] = {}
+    for v in vendors or []:
+        for acct in v.get('accounts', []):
+            mapping[str(acct)] = {
+                'name': v.get('name', 'Unknown'),
+                'type': v.get('type', 'third-party'),
+                'source': v.get('source', [])
+            }
+    return mapping
+
+class IAMSnapshot:
+    """
+    Indexed in-memory model of an account's IAM authorization details, built
+    from one paginated get_account_authorization_details sweep. Checks query
+    this model instead of calling IAM per role, user or policy.
+    """
+    # Entity types pulled in the sweep; AWS managed policies are skipped because
+    # the attached ones are resolvable by ARN and the full list is very large
+    DEFAULT_FILTER = ['Role', 'User', 'Group', 'LocalManagedPolicy']
+
+    def __init__(self):
+        self.roles: Dict[str, Dict[str, Any]] = {}      # RoleName -> role detail
+        self.users: Dict[str, Dict[str, Any]] = {}      # UserName -> user detail
+        self.groups: Dict[str, Dict[str, Any]] = {}     # GroupName -> group detail
+        self.policies: Dict[str, Dict[str, Any]] = {}   # policy ARN -> managed policy detail
+        self.attachments: Dict[str, List[Dict[str, str]]] = {}  # policy ARN -> attached entities
+
+    # Error codes meaning the caller lacks iam:GetAccountAuthorizationDetails
+    ACCESS_DENIED_CODES = ('AccessDenied', 'AccessDeniedException')
+
+    @classmethod
+    def collect(cls, iam, entity_filter: Optional[List[str]] = None) -> 'IAMSnapshot':
+        """
+        Pull roles, users, groups and managed policies in a single paginated sweep.
+        Callers without iam:GetAccountAuthorizationDetails get a roles-only
+        snapshot from collect_roles instead.
+        """
+        try:
+            return cls._collect_authorization_details(iam, entity_filter)
+        except ClientError as e:
+            if e.response.get('Error', {}).get('Code') not in cls.ACCESS_DENIED_CODES:
+                raise
+            logger.warning("iam:GetAccountAuthorizationDetails denied; "
+                           "falling back to list_roles and get_role_policy")
+            return cls.collect_roles(iam)
+
+    @classmethod
+    def collect_roles(cls, iam) -> 'IAMSnapshot':
+        """
+        Build a roles-only snapshot with list_roles and one list_role_policies
+        and get_role_policy call per inline policy, as before the sweep.
+        Users, groups and managed policies are left empty.
+        """
+        snapshot = cls()
+        for page in iam.get_paginator('list_roles').paginate():
+            for role in page.get('Roles', []):
+                name = role['RoleName']
+                role['AssumeRolePolicyDocument'] = cls._decode_policy(role.get('AssumeRolePolicyDocument'))
+                role['RolePolicyList'] = []
+                for policy_page in iam.get_paginator('list_role_policies').paginate(RoleName=name):
+                    for policy_name in policy_page.get('PolicyNames', []):
+                        doc = iam.get_role_policy(RoleName=name, PolicyName=policy_name).get('PolicyDocument')
+                        role['RolePolicyList'].append(
+                            {'PolicyName': policy_name, 'PolicyDocument': cls._decode_policy(doc)})
+                snapshot.roles[name] = role
+        logger.info(f"Collected IAM snapshot: {len(snapshot.roles)} roles (roles only)")
+        return snapshot
+
+    @classmethod
+    def _collect_authorization_details(cls, iam, entity_filter: Optional[List[str]]) -> 'IAMSnapshot':
+        snapshot = cls()
+        paginator = iam.get_paginator('get_account_authorization_details')
+        for page in paginator.paginate(Filter=entity_filter or cls.DEFAULT_FILTER):
+            for role in page.get('RoleDetailList', []):
+                role['AssumeRolePolicyDocument'] = cls._decode_policy(role.get('AssumeRolePolicyDocument'))
+                for inline in role.get('RolePolicyList', []):
+                    inline['PolicyDocument'] = cls._decode_policy(inline.get('PolicyDocument'))
+                snapshot.roles[role['RoleName']] = role
+            for user in page.get('UserDetailList', []):
+                for inline in user.get('UserPolicyList', []):
+                    inline['PolicyDocument'] = cls._decode_policy(inline.get('PolicyDocument'))
+                snapshot.users[user['UserName']] = user
+            for group in page.get('GroupDetailList', []):
+                for inline in group.get('GroupPolicyList', []):
+                    inline['PolicyDocument'] = cls._decode_policy(inline.get('PolicyDocument'))
+                snapshot.groups[group['GroupName']] = group
+            for policy in page.get('Policies', []):
+                for version in policy.get('PolicyVersionList', []):
+                    version['Document'] = cls._decode_policy(version.get('Document'))
+                snapshot.policies[policy['Arn']] = policy
+        snapshot._build_indexes()
+        logger.info(f"Collected IAM snapshot: {len(snapshot.roles)} roles, {len(snapshot.users)} users, "
+                    f"{len(snapshot.groups)} groups, {len(snapshot.policies)} managed policies")
+        return snapshot
+
+    @staticmethod
+    def _decode_policy(doc: Any) -> Dict[str, Any]:
+        """botocore normally decodes policy documents; handle raw URL-encoded JSON too."""
+        if isinstance(doc, str):
+            try:
+                return json.loads(unquote(doc))
+            except ValueError:
+                return {}
+        return doc or {}
+
+    def _build_indexes(self) -> None:
+        for kind, entities in (('role', self.roles), ('user', self.users), ('group', self.groups)):
+            for name, entity in entities.items():
+                for attached in entity.get('AttachedManagedPolicies', []):
+                    self.attachments.setdefault(attached['PolicyArn'], []).append({'type': kind, 'name': name})
+
+    def managed_policy_document(self, arn: str) -> Optional[Dict[str, Any]]:
+        """Return the default version document of a managed policy in the snapshot."""
+        policy = self.policies.get(arn)
+        if not policy:
+            return None
+        for version in policy.get('PolicyVersionList', []):
+            if version.get('IsDefaultVersion'):
+                return version.get('Document')
+        return None
+
+    def role_policies(self, role_name: str) -> Dict[str, Dict[str, Any]]:
+        """
+        Return the permission policies of a role: inline policies by name and
+        attached managed policies (present in the snapshot) by ARN.
+        """
+        role = self.roles.get(role_name, {})
+        docs = {p['PolicyName']: p['PolicyDocument'] for p in role.get('RolePolicyList', [])}
+        for attached in role.get('AttachedManagedPolicies', []):
+            doc = self.managed_policy_document(attached['PolicyArn'])
+            if doc is not None:
+                docs[attached['PolicyArn']] = doc
+        return docs
+
+@register_agent('aws_account_analysis-a2a', blocking=True, max_workers=4, result_ttl=300, singleton=True,
+                max_concurrency=4)
 class AWSAccountAnalysisAgent(BaseA2AAgent):
     """
     A2A Agent that inspects AWS IAM Role trust policies and S3 bucket policies
@@ -22,11 +165,35 @@ class AWSAccountAnalysisAgent(BaseA2AAgent):
     KNOWN_ACCOUNTS_URL = (
         "https://raw.githubusercontent.com/fwdcloudsec/known_aws_accounts/main/accounts.yaml"
     )
+    # Seconds before the cached known accounts list is revalidated upstream
+    KNOWN_ACCOUNTS_TTL = 6 * 3600
+    _known_accounts_cache: Optional[ReferenceDataCache] = None
+    # Default number of bucket policies fetched at once (parameter: max_bucket_concurrency)
+    S3_POLICY_CONCURRENCY = 16
+    # Attempts per S3 call, with botocore adaptive retry/backoff between them
+    S3_MAX_ATTEMPTS = 8
+
+    async def startup(self) -> None:
+        """Load the known accounts list before the first analysis needs it."""
+        try:
+            await asyncio.to_thread(self.fetch_reference_data)
+        except Exception as e:
+            logger.warning(f"Could not preload known AWS accounts, will retry on first analysis: {str(e)}")
 
     async def analyze(self, agent_id: str, skill_id: str, parameters: Dict[str, Any], 
                      request_context: Dict[str, Any], task_context: Optional[Dict[str, Any]]) -> Dict[str, Any]:
         """Execute external-access analysis and return structured findings."""
-        logger.info(f"Starting AWS Known External Access analysis with parameters: {parameters}")
+        return await collect_result(self.analyze_stream(agent_id, skill_id, parameters,
+                                                        request_context, task_context))
+
+    async def analyze_stream(self, agent_id: str, skill_id: str, parameters: Dict[str, Any],
+                             request_context: Dict[str, Any],
+                             task_context: Optional[Dict[str, Any]]) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Execute external-access analysis, yielding the 'iam' findings as soon
+        as the IAM checks finish and the complete findings after the S3 checks.
+        """
+        logger.info("Starting AWS Known External Access analysis with parameters: %s", LogPayload(parameters))
         
         try:
             # Get AWS credentials from parameters
@@ -36,49 +203,48 @@ class AWSAccountAnalysisAgent(BaseA2AAgent):
             # Check if credentials are in encrypted format (dict with 'is_encrypted' and 'value')
             if isinstance(aws_access_key, dict) and aws_access_key.get('is_encrypted'):
                 logger.warning("AWS Access Key is still encrypted. Credentials were not properly decrypted by the A2A client.")
-                return {
+                yield {'name': RESULT_ARTIFACT, 'json': {
                     "status": "error",
                     "error_message": "AWS credentials are encrypted. The A2A client failed to decrypt them. ",
                     "timestamp": datetime.utcnow().isoformat()
-                }
+                }}
+                return
             
             if isinstance(aws_secret_key, dict) and aws_secret_key.get('is_encrypted'):
                 logger.warning("AWS Secret Key is still encrypted. Credentials were not properly decrypted by the A2A client.")
-                return {
+                yield {'name': RESULT_ARTIFACT, 'json': {
                     "status": "error",
                     "error_message": "AWS credentials are encrypted. The A2A client failed to decrypt them.",
                     "timestamp": datetime.utcnow().isoformat()
-                }
+                }}
+                return
             
             # Require explicit credentials - no profile or default credentials
             if not aws_access_key or not aws_secret_key:
                 logger.error("Missing required AWS credentials")
-                return {
+                yield {'name': RESULT_ARTIFACT, 'json': {
                     "status": "error",
                     "error_message": "Missing required AWS credentials. This SaaS agent requires explicit AWS Access Key and AWS Secret Key to be provided.",
                     "timestamp": datetime.utcnow().isoformat()
-                }
+                }}
+                return
             
-            # Initialize session with provided credentials only
+            # Initialize the task's AWS context with provided credentials only;
+            # every check shares its clients and memoized account lookups
             logger.info("Using provided AWS credentials")
-            session = boto3.Session(
-                aws_access_key_id=aws_access_key,
-                aws_secret_access_key=aws_secret_key
-            )
-            
-            # Use session directly in all boto3 calls
-            sts = session.client('sts')
-            iam = session.client('iam')
+            aws = AWSTaskContext.from_credentials(aws_access_key, aws_secret_key)
             
             # 1. Gather reference and context
             known = self.fetch_reference_data()
             trusted_file = parameters.get('trusted_accounts_file', 'trusted_accounts.yaml')
-            trusted = self.fetch_trusted_accounts(trusted_file)
-            aliases = self.get_account_aliases(session)
+            trusted, trusted_cache_hit = self.fetch_trusted_accounts(trusted_file)
+            aliases = self.get_account_aliases(aws)
 
             # 2. Analyze IAM roles and S3 buckets
-            iam_results = self.check_iam_roles(session, known, trusted, aliases)
-            s3_results = self.check_s3_buckets(session, known, trusted, aliases)
+            iam_results = self.check_iam_roles(aws, known, trusted, aliases)
+            yield {'name': 'iam', 'json': iam_results}
+            bucket_concurrency = max(1, int(parameters.get('max_bucket_concurrency', self.S3_POLICY_CONCURRENCY)))
+            s3_results = self.check_s3_buckets(aws, known, trusted, aliases, bucket_concurrency)
 
             # 3. Properly merge results
             merged_results = {
@@ -95,7 +261,11 @@ class AWSAccountAnalysisAgent(BaseA2AAgent):
                 'trusted_entities': self._merge_dicts(iam_results.get('trusted_entities', {}), 
                                                     s3_results.get('trusted_entities', {})),
                 'vulnerable_roles': iam_results.get('vulnerable_roles', {}),
-                'cross_account_roles': iam_results.get('cross_account_roles', {})
+                'cross_account_roles': iam_results.get('cross_account_roles', {}),
+                # Freshness of the known accounts list the findings were matched against
+                'reference_data': self.known_accounts_cache().status(),
+                # Checks that only partially completed, by check name
+                'check_errors': {'s3': s3_results['errors']} if s3_results['errors'] else {}
             }
             
             # Add cross-account metrics
@@ -105,78 +275,69 @@ class AWSAccountAnalysisAgent(BaseA2AAgent):
                 'trusted_entities_count': len(merged_results['trusted_entities']),
                 'vulnerable_roles_count': len(merged_results['vulnerable_roles']),
                 'cross_account_roles_count': len(merged_results['cross_account_roles']),
-                'total_cross_account_roles': sum(len(roles) for roles in merged_results['cross_account_roles'].values())
+                'total_cross_account_roles': sum(len(roles) for roles in merged_results['cross_account_roles'].values()),
+                'checks_failed': len(merged_results['check_errors']),
+                # Whether this analysis found the trusted accounts file already parsed
+                'trusted_accounts_cache_hit': trusted_cache_hit,
+                'aws_clients_created': aws.clients_created,
+                'aws_clients_reused': aws.clients_reused
             }
             
             logger.info("AWS Known External Access analysis completed successfully")
-            return merged_results
+            yield {'name': RESULT_ARTIFACT, 'json': merged_results}
         except Exception as e:
             logger.error(f"Error performing AWS Known External Access analysis: {str(e)}")
-            return {
+            yield {'name': RESULT_ARTIFACT, 'json': {
                 "status": "error",
                 "error_message": str(e),
                 "timestamp": datetime.utcnow().isoformat()
-            }
+            }}
+
+    @classmethod
+    def known_accounts_cache(cls) -> ReferenceDataCache:
+        """Process-wide cache of the known AWS accounts list."""
+        if cls._known_accounts_cache is None:
+            cls._known_accounts_cache = ReferenceDataCache(
+                cls.KNOWN_ACCOUNTS_URL,
+                parse_known_accounts,
+                os.path.join(DEFAULT_CACHE_DIR, 'known_aws_accounts.json'),
+                ttl=cls.KNOWN_ACCOUNTS_TTL
+            )
+        return cls._known_accounts_cache
 
     def fetch_reference_data(self) -> Dict[str, Dict[str, Any]]:
         """
-        Fetch list of known AWS accounts from upstream GitHub repository.
+        Fetch list of known AWS accounts from upstream GitHub repository,
+        served from the process-wide cache.
         Returns mapping account_id -> vendor metadata.
         """
-        try:
-            resp = requests.get(self.KNOWN_ACCOUNTS_URL, timeout=10)
-            resp.raise_for_status()
-            vendors = yaml.safe_load(resp.text) or []
-            mapping: Dict[str, Dict[str, Any]] = {}
-            for v in vendors:
-                for acct in v.get('accounts', []):
-                    mapping[str(acct)] = {
-                        'name': v.get('name', 'Unknown'),
-                        'type': v.get('type', 'third-party'),
-                        'source': v.get('source', [])
-                    }
-            return mapping
-        except Exception as e:
-            logger.error(f"Error fetching reference data: {str(e)}")
-            return {}
+        return self.known_accounts_cache().get()
 
-    def fetch_trusted_accounts(self, path: str) -> Dict[str, Dict[str, Any]]:
+    def fetch_trusted_accounts(self, path: str) -> Tuple[Dict[str, Dict[str, Any]], bool]:
         """
-        Load locally defined trusted accounts from YAML file.
+        Load locally defined trusted accounts from YAML file, parsed once per
+        file version through the shared config cache.
         config_data may specify custom path.
+        Returns the mapping and whether it was served from the cache.
         """
-        if not os.path.exists(path):
-            logger.warning(f"Trusted accounts file not found: {path}")
-            return {}
         try:
-            data = yaml.safe_load(open(path)) or []
-            mapping: Dict[str, Dict[str, Any]] = {}
-            for ent in data:
-                for acct in ent.get('accounts', []):
-                    mapping[str(acct)] = {
-                        'name': ent.get('name', 'Internal'),
-                        'type': 'trusted',
-                        'description': ent.get('description', '')
-                    }
-            return mapping
+            return TRUSTED_ACCOUNTS_FILES.lookup(path)
         except Exception as e:
             logger.error(f"Error loading trusted accounts: {str(e)}")
-            return {}
+            return {}, False
 
-    def get_account_aliases(self, session) -> Dict[str, str]:
+    def get_account_aliases(self, aws: AWSTaskContext) -> Dict[str, str]:
         """
         Retrieve AWS account ID alias for the current caller.
         """
         aliases: Dict[str, str] = {}
         try:
-            sts = session.client('sts')
-            iam = session.client('iam')
-            acct = sts.get_caller_identity()['Account']
+            acct = aws.account_id()
             # default alias to account ID
             aliases[acct] = acct
-            resp = iam.list_account_aliases()
-            if resp.get('AccountAliases'):
-                aliases[acct] = resp['AccountAliases'][0]
+            account_aliases = aws.account_aliases()
+            if account_aliases:
+                aliases[acct] = account_aliases[0]
         except Exception as e:
             logger.error(f"Error getting account aliases: {str(e)}")
         return aliases
@@ -231,8 +392,12 @@ class AWSAccountAnalysisAgent(BaseA2AAgent):
                     return True
         return False
 
+    def iam_snapshot(self, aws: AWSTaskContext) -> IAMSnapshot:
+        """IAM authorization details for the task, collected once and shared by every IAM check."""
+        return aws.memoize('iam_snapshot', lambda: IAMSnapshot.collect(aws.client('iam')))
+
     def check_iam_roles(self,
-                        session,
+                        aws: AWSTaskContext,
                         known: Dict[str, Any],
                         trusted: Dict[str, Any],
                         aliases: Dict[str, str]
@@ -241,71 +406,74 @@ class AWSAccountAnalysisAgent(BaseA2AAgent):
         Check IAM roles for external access.
         """
         logger.info("Checking IAM roles for external access")
-        iam = session.client('iam')
-        sts = session.client('sts')
+        iam_snapshot = self.iam_snapshot(aws)
         # Get current account ID
-        current_account = sts.get_caller_identity()['Account']
+        current_account = aws.account_id()
         
-        paginator = iam.get_paginator('list_roles')
         res = {
             'known_vendors': {}, 'unknown_accounts': {},
             'trusted_entities': {}, 'vulnerable_roles': {},
             'cross_account_roles': {}  # New category for cross-account roles
         }
-        for page in paginator.paginate():
-            for role in page.get('Roles', []):
-                name = role['RoleName']
-                policy = role.get('AssumeRolePolicyDocument', {})
-                acct_ids = self.extract_account_ids(policy)
-                
-                # Mark any role that allows access from a different account
-                cross_account_access = [acct for acct in acct_ids if acct != current_account]
-                if cross_account_access:
-                    for acct in cross_account_access:
-                        acct_display = acct
-                        if acct in known:
-                            acct_display = f"{acct} ({known[acct]['name']})"
-                        elif acct in trusted:
-                            acct_display = f"{acct} ({trusted[acct]['name']})"
-                        else:
-                            acct_display = f"{acct} ({aliases.get(acct, 'Unknown')})"
-                            
-                        res['cross_account_roles'].setdefault(acct_display, []).append(name)
-                
-                # Continue with existing categorization
-                for acct in acct_ids:
-                    if acct in trusted:
-                        res['trusted_entities'].setdefault(trusted[acct]['name'], []).append(name)
-                    elif acct in known:
-                        vendor = known[acct]['name']
-                        res['known_vendors'].setdefault(vendor, []).append(name)
-                        if not self.has_external_id(policy):
-                            res['vulnerable_roles'].setdefault(vendor, []).append(name)
+        for role in iam_snapshot.roles.values():
+            name = role['RoleName']
+            policy = role.get('AssumeRolePolicyDocument', {})
+            acct_ids = self.extract_account_ids(policy)
+            
+            # Mark any role that allows access from a different account
+            cross_account_access = [acct for acct in acct_ids if acct != current_account]
+            if cross_account_access:
+                for acct in cross_account_access:
+                    acct_display = acct
+                    if acct in known:
+                        acct_display = f"{acct} ({known[acct]['name']})"
+                    elif acct in trusted:
+                        acct_display = f"{acct} ({trusted[acct]['name']})"
                     else:
-                        display = f"{acct} ({aliases.get(acct, acct)})"
-                        res['unknown_accounts'].setdefault(display, []).append(name)
-                        if not self.has_external_id(policy):
-                            res['vulnerable_roles'].setdefault(display, []).append(name)
+                        acct_display = f"{acct} ({aliases.get(acct, 'Unknown')})"
+                        
+                    res['cross_account_roles'].setdefault(acct_display, []).append(name)
+            
+            # Continue with existing categorization
+            for acct in acct_ids:
+                if acct in trusted:
+                    res['trusted_entities'].setdefault(trusted[acct]['name'], []).append(name)
+                elif acct in known:
+                    vendor = known[acct]['name']
+                    res['known_vendors'].setdefault(vendor, []).append(name)
+                    if not self.has_external_id(policy):
+                        res['vulnerable_roles'].setdefault(vendor, []).append(name)
+                else:
+                    display = f"{acct} ({aliases.get(acct, acct)})"
+                    res['unknown_accounts'].setdefault(display, []).append(name)
+                    if not self.has_external_id(policy):
+                        res['vulnerable_roles'].setdefault(display, []).append(name)
         return res
 
     def check_s3_buckets(self,
-                         session,
+                         aws: AWSTaskContext,
                          known: Dict[str, Any],
                          trusted: Dict[str, Any],
-                         aliases: Dict[str, str]
+                         aliases: Dict[str, str],
+                         max_concurrency: Optional[int] = None
                          ) -> Dict[str, Any]:
         """
         Check S3 buckets for external access.
+        Buckets whose policy could not be read are listed under 'errors'
+        ('*' when the buckets could not be listed at all).
         """
         logger.info("Checking S3 buckets for external access")
-        s3 = session.client('s3')
-        res = {'known_vendors': {}, 'unknown_accounts': {}, 'trusted_entities': {}}
+        max_concurrency = max_concurrency or self.S3_POLICY_CONCURRENCY
+        s3 = aws.client('s3', config=self._s3_config(max_concurrency))
+        res = {'known_vendors': {}, 'unknown_accounts': {}, 'trusted_entities': {}, 'errors': {}}
         try:
-            for b in s3.list_buckets().get('Buckets', []):
+            buckets = s3.list_buckets().get('Buckets', [])
+            policies = self.fetch_bucket_policies(aws, buckets, max_concurrency, res['errors'])
+            # Fold results in list_buckets order so output is deterministic
+            for b in buckets:
                 name = b['Name']
-                try:
-                    doc = json.loads(s3.get_bucket_policy(Bucket=name)['Policy'])
-                except ClientError:
+                doc = policies.get(name)
+                if doc is None:
                     continue
                 acct_ids = self.extract_account_ids(doc)
                 for acct in acct_ids:
@@ -319,8 +487,54 @@ class AWSAccountAnalysisAgent(BaseA2AAgent):
                         res['unknown_accounts'].setdefault(display, []).append(name)
         except Exception as e:
             logger.error(f"Error checking S3 buckets: {str(e)}")
+            res['errors']['*'] = str(e)
+        if res['errors']:
+            logger.warning(f"Could not read the policies of {len(res['errors'])} S3 bucket(s)")
         return res
 
+    def fetch_bucket_policies(self, aws: AWSTaskContext, buckets: List[Dict[str, Any]],
+                              max_concurrency: int,
+                              errors: Optional[Dict[str, str]] = None) -> Dict[str, Any]:
+        """
+        Fetch bucket policies concurrently on a bounded thread pool.
+        Each request goes to a client in the bucket's own region (BucketRegion
+        from list_buckets) so S3 does not redirect it; buckets without a
+        readable policy are omitted. Policies that could not be read for any
+        reason other than not existing are recorded in errors by bucket name.
+        Returns mapping bucket name -> policy document.
+        """
+        config = self._s3_config(max_concurrency)
+
+        def fetch(bucket: Dict[str, Any]):
+            name = bucket['Name']
+            try:
+                s3 = aws.client('s3', region_name=bucket.get('BucketRegion'), config=config)
+                policy = s3.get_bucket_policy(Bucket=name)['Policy']
+            except ClientError as e:
+                if e.response.get('Error', {}).get('Code') == 'NoSuchBucketPolicy':
+                    return name, None, None
+                return name, None, str(e)
+            return name, json.loads(policy), None
+
+        if not buckets:
+            return {}
+        workers = min(max_concurrency, len(buckets))
+        policies = {}
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix='s3-policy') as executor:
+            for name, doc, error in executor.map(fetch, buckets):
+                if error is not None and errors is not None:
+                    errors[name] = error
+                if doc is not None:
+                    policies[name] = doc
+        return policies
+
+    def _s3_config(self, max_concurrency: int) -> Config:
+        """Client config with adaptive retries and a connection pool sized for the fetch pool."""
+        return Config(
+            retries={'max_attempts': self.S3_MAX_ATTEMPTS, 'mode': 'adaptive'},
+            max_pool_connections=max(10, max_concurrency)
+        )
+
     def _merge_dicts(self, dict1: Dict[str, list], dict2: Dict[str, list]) -> Dict[str, list]:
         """Merge two dictionaries of lists, combining lists for the same keys."""
         result = dict1.copy()
@@ -1,11 +1,17 @@
 import os
-import boto3
+import time
+import random
+import asyncio
+import threading
 import botocore
 from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
-from typing import Dict, Any, List, Optional
+from typing import AsyncIterator, Dict, Any, List, Optional, Set, Tuple
 import logging
-from agent_registry import BaseA2AAgent, register_agent
+from agent_registry import RESULT_ARTIFACT, BaseA2AAgent, collect_result, register_agent
+from aws_context import AWSTaskContext
+from request_logging import LogPayload
 
 # Configure logging
 logger = logging.getLogger(__name__)
@@ -17,24 +23,138 @@ class VendorMap:
     def get_vendor_name(self, account_id: str) -> str:
         return self.account_to_name.get(account_id, "")
 
-@register_agent('aws_ec2_eye-a2a')
+class SnapshotPermissionResolver:
+    """
+    Resolves createVolumePermission for EBS snapshots, once per (region, snapshot)
+    for the lifetime of one analysis. Lookups run on a bounded thread pool whose
+    effective concurrency is halved whenever AWS throttles and grows back by one
+    after every successful call.
+    """
+    THROTTLE_ERROR_CODES = ('RequestLimitExceeded', 'Throttling', 'ThrottlingException')
+    MAX_ATTEMPTS = 5
+    BASE_BACKOFF = 0.5  # seconds, doubled on every throttled attempt
+
+    def __init__(self, clients: Dict[str, Any], max_concurrency: int = 8):
+        self.clients = clients
+        self.max_concurrency = max(1, max_concurrency)
+        self.requested = 0   # lookups asked for, duplicates included
+        self.resolved = 0    # distinct snapshots actually fetched
+        self.api_calls = 0   # describe_snapshot_attribute calls, retries included
+        self.throttled = 0
+        self._cache: Dict[Tuple[str, str], Dict[str, Any]] = {}
+        self._limit = self.max_concurrency
+        self._active = 0
+        self._cond = threading.Condition()
+
+    @property
+    def calls_saved(self) -> int:
+        """Lookups answered without an API call thanks to deduplication and memoization."""
+        return self.requested - self.resolved
+
+    def resolve(self, keys: List[Tuple[str, str]]) -> Dict[Tuple[str, str], Dict[str, Any]]:
+        """
+        Return {'public': bool, 'shared_with': [account IDs]} for each (region, snapshot_id).
+        """
+        self.requested += len(keys)
+        pending = [key for key in dict.fromkeys(keys) if key not in self._cache]
+        if pending:
+            workers = min(self.max_concurrency, len(pending))
+            with ThreadPoolExecutor(max_workers=workers, thread_name_prefix='ec2-eye-snapshot') as executor:
+                for key, perms in zip(pending, executor.map(self._fetch, pending)):
+                    self._cache[key] = perms
+            self.resolved += len(pending)
+        return {key: self._cache[key] for key in keys}
+
+    def _fetch(self, key: Tuple[str, str]) -> Dict[str, Any]:
+        region, snap_id = key
+        ec2 = self.clients[region]
+        for attempt in range(self.MAX_ATTEMPTS):
+            self._acquire()
+            throttled = False
+            try:
+                attr = ec2.describe_snapshot_attribute(SnapshotId=snap_id, Attribute='createVolumePermission')
+                perms = attr.get('CreateVolumePermissions', [])
+                return {
+                    'public': any(p.get('Group') == 'all' for p in perms),
+                    'shared_with': [p.get('UserId') for p in perms if 'UserId' in p]
+                }
+            except botocore.exceptions.ClientError as e:
+                code = e.response.get('Error', {}).get('Code', '')
+                if code not in self.THROTTLE_ERROR_CODES or attempt == self.MAX_ATTEMPTS - 1:
+                    return {'public': False, 'shared_with': []}
+                throttled = True
+            finally:
+                self._release(throttled)
+            time.sleep(self.BASE_BACKOFF * (2 ** attempt) * random.uniform(0.5, 1.0))
+        return {'public': False, 'shared_with': []}
+
+    def _acquire(self) -> None:
+        with self._cond:
+            while self._active >= self._limit:
+                self._cond.wait()
+            self._active += 1
+            self.api_calls += 1
+
+    def _release(self, throttled: bool) -> None:
+        with self._cond:
+            self._active -= 1
+            if throttled:
+                self.throttled += 1
+                self._limit = max(1, self._limit // 2)
+            else:
+                self._limit = min(self.max_concurrency, self._limit + 1)
+            self._cond.notify_all()
+
+@register_agent('aws_ec2_eye-a2a', blocking=True, max_workers=4, result_ttl=300, singleton=True,
+                max_concurrency=4)
 class AWSEc2EyeAgent(BaseA2AAgent):
     """
     A2A Agent for EC2 AMI inventory, EBS snapshot lineage, and categorization.
     Classifies AMIs by provider and trust, replicating aws_ec2_eye script logic,
     and checks backing snapshots for public-sharing permissions.
     """
+    # Maximum number of AMI IDs resolved per describe_images call
+    IMAGE_BATCH_SIZE = 200
+    # Error codes raised when some of the requested ImageIds cannot be resolved
+    MISSING_IMAGE_ERROR_CODES = (
+        'InvalidAMIID.NotFound', 'InvalidAMIID.Unavailable', 'InvalidAMIID.Malformed'
+    )
+    # AMI categories in classification precedence order
+    AMI_CATEGORIES = (
+        'verified', 'selfhosted', 'allowed', 'trusted',
+        'private_shared', 'known_unverified', 'unknown_unverified'
+    )
+    # Categories whose backing snapshots are checked for public sharing
+    LINEAGE_CATEGORIES = ('allowed', 'trusted', 'private_shared')
+    # Default number of regions scanned at once (parameter: max_region_concurrency)
+    MAX_REGION_CONCURRENCY = 8
+    # Default seconds allowed for a single region scan (parameter: region_timeout)
+    REGION_TIMEOUT = 600
+    # Default number of concurrent snapshot permission checks (parameter: max_snapshot_concurrency)
+    SNAPSHOT_CHECK_CONCURRENCY = 8
+
     async def analyze(self, agent_id: str, skill_id: str, parameters: Dict[str, Any], 
                      request_context: Dict[str, Any], task_context: Optional[Dict[str, Any]]) -> Dict[str, Any]:
         """
         Execute EC2 AMI analysis and return structured findings.
         """
-        logger.info(f"Starting AWS EC2 Eye analysis with parameters: {parameters}")
+        return await collect_result(self.analyze_stream(agent_id, skill_id, parameters,
+                                                        request_context, task_context))
+
+    async def analyze_stream(self, agent_id: str, skill_id: str, parameters: Dict[str, Any],
+                             request_context: Dict[str, Any],
+                             task_context: Optional[Dict[str, Any]]) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Execute EC2 AMI analysis, yielding one 'region:<name>' artifact with the
+        region's instance count and AMI classification (or error) as each region
+        finishes, then the complete findings.
+        """
+        logger.info("Starting AWS EC2 Eye analysis with parameters: %s", LogPayload(parameters))
         
         try:
             # 1. Parse configuration
             regions = parameters.get('regions', [])  # list of region strings
-            trusted_list = parameters.get('trusted_accounts', [])  # list of account IDs
+            trusted_list = set(parameters.get('trusted_accounts', []))  # account IDs
 
             # Get AWS credentials - they should already be decrypted by the A2A client
             aws_access_key = parameters.get('AWS Access Key')
@@ -43,146 +163,101 @@ class AWSEc2EyeAgent(BaseA2AAgent):
             # Check if credentials are in encrypted format (dict with 'is_encrypted' and 'value')
             if isinstance(aws_access_key, dict) and aws_access_key.get('is_encrypted'):
                 logger.warning("AWS Access Key is still encrypted. Credentials were not properly decrypted by the A2A client.")
-                return {
+                yield {'name': RESULT_ARTIFACT, 'json': {
                     "status": "error",
                     "error_message": "AWS credentials are encrypted. The A2A client failed to decrypt them. Make sure the ENCRYPTION_MASTER_KEY environment variable is set in the backend environment.",
                     "timestamp": datetime.utcnow().isoformat()
-                }
+                }}
+                return
             
             if isinstance(aws_secret_key, dict) and aws_secret_key.get('is_encrypted'):
                 logger.warning("AWS Secret Key is still encrypted. Credentials were not properly decrypted by the A2A client.")
-                return {
+                yield {'name': RESULT_ARTIFACT, 'json': {
                     "status": "error",
                     "error_message": "AWS credentials are encrypted. The A2A client failed to decrypt them. Make sure the ENCRYPTION_MASTER_KEY environment variable is set in the backend environment.",
                     "timestamp": datetime.utcnow().isoformat()
-                }
+                }}
+                return
             
             # Require explicit credentials - no profile or default credentials
             if not aws_access_key or not aws_secret_key:
                 logger.error("Missing required AWS credentials")
-                return {
+                yield {'name': RESULT_ARTIFACT, 'json': {
                     "status": "error",
                     "error_message": "Missing required AWS credentials. This SaaS agent requires explicit AWS Access Key and AWS Secret Key to be provided.",
                     "timestamp": datetime.utcnow().isoformat()
-                }
+                }}
+                return
             
-            # Initialize session with provided credentials only
+            # Initialize the task's AWS context with provided credentials only
             logger.info("Using provided AWS credentials")
-            session = boto3.Session(
-                aws_access_key_id=aws_access_key,
-                aws_secret_access_key=aws_secret_key
-            )
-                
-            sts = session.client('sts', region_name='us-east-1')
-            ec2_global = session.client('ec2', region_name='us-east-1')
+            aws = AWSTaskContext.from_credentials(aws_access_key, aws_secret_key, default_region='us-east-1')
 
             # 2. Determine caller ID
-            caller = sts.get_caller_identity()['Account']
+            caller = aws.account_id()
 
             # 3. Regions to scan
             if not regions:
+                ec2_global = aws.client('ec2')
                 regions = [r['RegionName'] for r in ec2_global.describe_regions()['Regions']]
 
             # 4. Data structures
-            ami_to_instances     = defaultdict(list)
+            ami_data             = {category: {} for category in self.AMI_CATEGORIES}
             processed_amis       = set()
-            verified             = {}
-            selfhosted           = {}
-            allowed              = {}
-            trusted              = {}
-            private_shared       = {}
-            known_unverified     = {}
-            unknown_unverified   = {}
-            snapshot_lineage     = {}  # Map AMI -> list of snapshot info
+            lineage_snapshots    = {}  # Map AMI -> (region, backing snapshot IDs)
             total_instances      = 0
             
             # 5. Build VendorMap stub
             vendor_map = VendorMap()  # extend mapping via parameters if provided
 
-            # 6. Scan each region
+            # 6. Scan regions concurrently; every AMI is resolved against the region it was seen in
+            max_concurrency = max(1, int(parameters.get('max_region_concurrency', self.MAX_REGION_CONCURRENCY)))
+            region_timeout = float(parameters.get('region_timeout', self.REGION_TIMEOUT))
+            clients = {reg: aws.client('ec2', region_name=reg) for reg in regions}
+            region_results = {}
+            async for reg, region_result in self.iter_regions(clients, caller, trusted_list, vendor_map,
+                                                              max_concurrency, region_timeout):
+                region_results[reg] = region_result
+                if 'error' in region_result:
+                    summary = {'region': reg, 'error': region_result['error']}
+                else:
+                    summary = {'region': reg, 'instance_count': region_result['instance_count'],
+                               'ami_data': region_result['ami_data']}
+                yield {'name': f'region:{reg}', 'json': summary}
+
+            # Merge in the requested region order so results are deterministic
+            region_errors = {}
             for reg in regions:
-                ec2 = session.client('ec2', region_name=reg)
-                # a. List instances
-                paginator = ec2.get_paginator('describe_instances')
-                instances = []
-                for page in paginator.paginate():
-                    for res in page.get('Reservations', []):
-                        for inst in res.get('Instances', []):
-                            instances.append(inst)
-                if not instances:
+                region_result = region_results[reg]
+                if 'error' in region_result:
+                    region_errors[reg] = region_result['error']
                     continue
-                total_instances += len(instances)
-                # b. Map AMI to instances
-                for inst in instances:
-                    ami = inst.get('ImageId')
-                    name = next((t['Value'] for t in inst.get('Tags', []) if t['Key']=='Name'), '')
-                    ami_to_instances[ami].append({'InstanceId': inst['InstanceId'], 'Name': name, 'Region': reg})
-                # c. Fetch allowed AMIs state
-                try:
-                    resp = ec2.get_allowed_images_settings()
-                    allowed_state    = resp.get('State')
-                    allowed_accounts = [p for c in resp.get('ImageCriteria', []) for p in c.get('ImageProviders', [])]
-                except botocore.exceptions.ClientError:
-                    allowed_state, allowed_accounts = None, []
-                # d. Classify each AMI once
-                for ami, inst_list in ami_to_instances.items():
-                    if ami in processed_amis:
-                        continue
-                    processed_amis.add(ami)
-
-                    # retrieve image metadata
-                    try:
-                        imgs = ec2.describe_images(ImageIds=[ami]).get('Images', [])
-                        img  = imgs[0] if imgs else {}
-                    except botocore.exceptions.ClientError:
-                        img = {}
-
-                    public = img.get('Public', False)
-                    owner  = img.get('OwnerId', '')
-                    alias  = img.get('ImageOwnerAlias', '')
-                    vendor = vendor_map.get_vendor_name(owner) or 'Unknown'
-                    data   = {'alias': alias, 'owner': owner, 'public': public, 'vendor': vendor, 'region': reg}
-
-                    # classification logic
-                    if alias in ('amazon', 'aws-marketplace'):
-                        verified[ami] = data
-                    elif alias == 'self' or owner == caller:
-                        selfhosted[ami] = data
-                    elif allowed_state in ('enabled', 'audit-mode') and owner in allowed_accounts:
-                        allowed[ami] = data
-                    elif owner in trusted_list:
-                        trusted[ami] = data
-                    elif not public:
-                        private_shared[ami] = data
-                    elif vendor != 'Unknown':
-                        known_unverified[ami] = data
-                    else:
-                        unknown_unverified[ami] = data
-
-                    # --- Snapshot Lineage for private/shared AMIs ---
-                    if ami in private_shared or ami in allowed or ami in trusted:
-                        snaps_info: List[Dict[str, Any]] = []
-                        for bd in img.get('BlockDeviceMappings', []):
-                            ebs = bd.get('Ebs')
-                            if not ebs:
-                                continue
-                            snap_id = ebs.get('SnapshotId')
-                            if not snap_id:
-                                continue
-                            # Check snapshot permissions
-                            try:
-                                attr = ec2.describe_snapshot_attribute(SnapshotId=snap_id, Attribute='createVolumePermission')
-                                perms = attr.get('CreateVolumePermissions', [])
-                                public_snap = any(p.get('Group') == 'all' for p in perms)
-                                shared_with = [p.get('UserId') for p in perms if 'UserId' in p]
-                            except botocore.exceptions.ClientError:
-                                public_snap = False
-                                shared_with = []
-                            snaps_info.append({'snapshot_id': snap_id, 'public': public_snap, 'shared_with': shared_with})
-                        if snaps_info:
-                            snapshot_lineage[ami] = snaps_info
-
-            # 7. Compile results
+                total_instances += region_result['instance_count']
+                for category, amis in region_result['ami_data'].items():
+                    for ami, data in amis.items():
+                        if ami in processed_amis:
+                            continue
+                        processed_amis.add(ami)
+                        ami_data[category][ami] = data
+                        if ami in region_result['lineage_snapshots']:
+                            lineage_snapshots[ami] = (reg, region_result['lineage_snapshots'][ami])
+
+            # 7. Snapshot lineage, checking each distinct snapshot's permissions once
+            snapshot_concurrency = max(1, int(parameters.get('max_snapshot_concurrency',
+                                                             self.SNAPSHOT_CHECK_CONCURRENCY)))
+            resolver = SnapshotPermissionResolver(clients, snapshot_concurrency)
+            lookups = [(reg, snap_id) for reg, snap_ids in lineage_snapshots.values() for snap_id in snap_ids]
+            permissions = await asyncio.to_thread(resolver.resolve, lookups)
+            snapshot_lineage = {}  # Map AMI -> list of snapshot info
+            for ami, (reg, snap_ids) in lineage_snapshots.items():
+                snapshot_lineage[ami] = [
+                    {'snapshot_id': snap_id,
+                     'public': permissions[(reg, snap_id)]['public'],
+                     'shared_with': list(permissions[(reg, snap_id)]['shared_with'])}
+                    for snap_id in snap_ids
+                ]
+
+            # 8. Compile results
             results = {
                 'summary': 'EC2 AMI inventory and EBS snapshot analysis complete',
                 'timestamp': datetime.utcnow().isoformat(),
@@ -190,40 +265,214 @@ class AWSEc2EyeAgent(BaseA2AAgent):
                 'total_amis': len(processed_amis),
 
                 # AMI categorizations
-                'ami_data': {
-                    'verified': verified,
-                    'selfhosted': selfhosted,
-                    'allowed': allowed,
-                    'trusted': trusted,
-                    'private_shared': private_shared,
-                    'known_unverified': known_unverified,
-                    'unknown_unverified': unknown_unverified,
-                },
+                'ami_data': ami_data,
                 # EBS snapshot lineage for key AMIs
                 'snapshot_lineage': snapshot_lineage,
+                # Regions that failed or timed out, with the reason
+                'region_errors': region_errors,
 
                 # Aggregated counts
                 'metrics': {
-                    'verified_AMIs_count': len(verified),
-                    'selfhosted_AMIs_count': len(selfhosted),
-                    'allowed_AMIs_count': len(allowed),
-                    'trusted_AMIs_count': len(trusted),
-                    'private_shared_AMIs_count': len(private_shared),
-                    'known_AMIs_count': len(known_unverified),
-                    'unknown_AMIs_count': len(unknown_unverified),
+                    'verified_AMIs_count': len(ami_data['verified']),
+                    'selfhosted_AMIs_count': len(ami_data['selfhosted']),
+                    'allowed_AMIs_count': len(ami_data['allowed']),
+                    'trusted_AMIs_count': len(ami_data['trusted']),
+                    'private_shared_AMIs_count': len(ami_data['private_shared']),
+                    'known_AMIs_count': len(ami_data['known_unverified']),
+                    'unknown_AMIs_count': len(ami_data['unknown_unverified']),
                     'AMIs_with_snapshot_lineage': len(snapshot_lineage),
                     'total_instances': total_instances,
-                    'total_amis': len(processed_amis)
+                    'total_amis': len(processed_amis),
+                    'regions_scanned': len(regions) - len(region_errors),
+                    'regions_failed': len(region_errors),
+                    'snapshot_permission_calls': resolver.api_calls,
+                    'snapshot_permission_calls_saved': resolver.calls_saved,
+                    'snapshot_permission_throttles': resolver.throttled,
+                    'aws_clients_created': aws.clients_created,
+                    'aws_clients_reused': aws.clients_reused
                 }
             }
             
             logger.info("AWS EC2 Eye analysis completed successfully")
-            return results
+            yield {'name': RESULT_ARTIFACT, 'json': results}
             
         except Exception as e:
             logger.error(f"Error performing AWS EC2 Eye analysis: {str(e)}", exc_info=True)
-            return {
+            yield {'name': RESULT_ARTIFACT, 'json': {
                 "status": "error",
                 "message": f"Error performing AWS EC2 Eye analysis: {str(e)}",
                 "timestamp": datetime.utcnow().isoformat()
-            } 
\ No newline at end of file
+            }}
+
+    async def iter_regions(self, clients: Dict[str, Any], caller: str, trusted_list: Set[str],
+                           vendor_map: VendorMap, max_concurrency: int,
+                           region_timeout: float) -> AsyncIterator[Tuple[str, Dict[str, Any]]]:
+        """
+        Run scan_region for every region on a bounded thread pool, yielding
+        (region, result) pairs in completion order. A region that raises or
+        exceeds region_timeout yields an {'error': ...} result instead of
+        failing the whole scan.
+
+        A region holds its concurrency slot until its thread really finishes,
+        even after it timed out, so a region only starts when a worker is free
+        and its timeout never includes time spent waiting behind a hung scan.
+        """
+        loop = asyncio.get_running_loop()
+        semaphore = asyncio.Semaphore(max_concurrency)
+        executor = ThreadPoolExecutor(max_workers=max_concurrency, thread_name_prefix='ec2-eye-region')
+
+        def thread_finished(future: asyncio.Future) -> None:
+            semaphore.release()
+            if not future.cancelled():
+                # Retrieved so a timed-out region failing later is not reported as unhandled
+                future.exception()
+
+        async def scan(reg: str) -> Tuple[str, Dict[str, Any]]:
+            await semaphore.acquire()
+            running = loop.run_in_executor(executor, self.scan_region, clients[reg], reg,
+                                           caller, trusted_list, vendor_map)
+            running.add_done_callback(thread_finished)
+            try:
+                # Shielded so a timeout does not mark the still-running thread as done
+                return reg, await asyncio.wait_for(asyncio.shield(running), timeout=region_timeout)
+            except asyncio.TimeoutError:
+                logger.error(f"EC2 Eye scan of region {reg} timed out after {region_timeout}s")
+                return reg, {'error': f"Region scan timed out after {region_timeout}s"}
+            except Exception as e:
+                logger.error(f"EC2 Eye scan of region {reg} failed: {str(e)}")
+                return reg, {'error': str(e)}
+
+        scans = [asyncio.ensure_future(scan(reg)) for reg in clients]
+        try:
+            for finished in asyncio.as_completed(scans):
+                yield await finished
+        finally:
+            for pending in scans:
+                pending.cancel()
+            # Timed-out scans cannot be interrupted; let them finish in the background
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    def scan_region(self, ec2, region: str, caller: str, trusted_list: Set[str],
+                    vendor_map: VendorMap) -> Dict[str, Any]:
+        """
+        Inventory, resolve and classify the AMIs used by instances in one region.
+        Every AMI seen in the region is resolved and classified exactly once with
+        the region's own client and allowed-images settings.
+        """
+        result: Dict[str, Any] = {
+            'instance_count': 0,
+            'ami_data': {category: {} for category in self.AMI_CATEGORIES},
+            'lineage_snapshots': {},
+        }
+
+        # a. List instances and map AMI to instances
+        ami_to_instances = defaultdict(list)
+        paginator = ec2.get_paginator('describe_instances')
+        for page in paginator.paginate():
+            for res in page.get('Reservations', []):
+                for inst in res.get('Instances', []):
+                    result['instance_count'] += 1
+                    ami = inst.get('ImageId')
+                    name = next((t['Value'] for t in inst.get('Tags', []) if t['Key']=='Name'), '')
+                    ami_to_instances[ami].append({'InstanceId': inst['InstanceId'], 'Name': name, 'Region': region})
+        if not ami_to_instances:
+            return result
+
+        # b. Fetch allowed AMIs state
+        try:
+            resp = ec2.get_allowed_images_settings()
+            allowed_state    = resp.get('State')
+            allowed_accounts = [p for c in resp.get('ImageCriteria', []) for p in c.get('ImageProviders', [])]
+        except botocore.exceptions.ClientError:
+            allowed_state, allowed_accounts = None, []
+
+        # c. Resolve image metadata in batches
+        images = self.describe_images_batched(ec2, list(ami_to_instances))
+
+        # d. Classify each AMI once
+        for ami in ami_to_instances:
+            img = images.get(ami, {})
+            category, data = self.classify_ami(img, region, caller, allowed_state, allowed_accounts,
+                                               trusted_list, vendor_map)
+            result['ami_data'][category][ami] = data
+
+            # --- Snapshot Lineage for private/shared AMIs, resolved after all regions ---
+            if category in self.LINEAGE_CATEGORIES:
+                snap_ids = self.snapshot_ids_for_image(img)
+                if snap_ids:
+                    result['lineage_snapshots'][ami] = snap_ids
+        return result
+
+    def classify_ami(self, img: Dict[str, Any], region: str, caller: str,
+                     allowed_state: Optional[str], allowed_accounts: List[str],
+                     trusted_list: Set[str], vendor_map: VendorMap) -> Tuple[str, Dict[str, Any]]:
+        """
+        Classify a single AMI by provider and trust.
+        Returns the category name and the AMI data recorded under it.
+        """
+        public = img.get('Public', False)
+        owner  = img.get('OwnerId', '')
+        alias  = img.get('ImageOwnerAlias', '')
+        vendor = vendor_map.get_vendor_name(owner) or 'Unknown'
+        data   = {'alias': alias, 'owner': owner, 'public': public, 'vendor': vendor, 'region': region}
+
+        if alias in ('amazon', 'aws-marketplace'):
+            return 'verified', data
+        if alias == 'self' or owner == caller:
+            return 'selfhosted', data
+        if allowed_state in ('enabled', 'audit-mode') and owner in allowed_accounts:
+            return 'allowed', data
+        if owner in trusted_list:
+            return 'trusted', data
+        if not public:
+            return 'private_shared', data
+        if vendor != 'Unknown':
+            return 'known_unverified', data
+        return 'unknown_unverified', data
+
+    def snapshot_ids_for_image(self, img: Dict[str, Any]) -> List[str]:
+        """
+        List the EBS snapshots backing an image, in block device order.
+        """
+        snap_ids: List[str] = []
+        for bd in img.get('BlockDeviceMappings', []):
+            ebs = bd.get('Ebs')
+            if not ebs:
+                continue
+            snap_id = ebs.get('SnapshotId')
+            if snap_id:
+                snap_ids.append(snap_id)
+        return snap_ids
+
+    def describe_images_batched(self, ec2, ami_ids: List[str]) -> Dict[str, Dict[str, Any]]:
+        """
+        Resolve image metadata for many AMIs with chunked describe_images calls.
+        A chunk rejected because some of its IDs no longer exist is split in half
+        and retried, so only the unresolvable AMIs end up without metadata.
+        Any other error (access denied, or throttling and server errors that
+        outlasted the client's retries) is raised so the region is reported in
+        region_errors rather than its AMIs being classified without metadata.
+        Returns mapping AMI ID -> image description.
+        """
+        images: Dict[str, Dict[str, Any]] = {}
+        size = max(1, self.IMAGE_BATCH_SIZE)
+        pending = [ami_ids[i:i + size] for i in range(0, len(ami_ids), size)]
+        while pending:
+            chunk = pending.pop()
+            try:
+                resp = ec2.describe_images(ImageIds=chunk)
+            except botocore.exceptions.ClientError as e:
+                code = e.response.get('Error', {}).get('Code', '')
+                if code in self.MISSING_IMAGE_ERROR_CODES and len(chunk) > 1:
+                    mid = len(chunk) // 2
+                    pending.append(chunk[mid:])
+                    pending.append(chunk[:mid])
+                elif code in self.MISSING_IMAGE_ERROR_CODES:
+                    logger.debug(f"AMI {chunk[0]} could not be resolved: {code}")
+                else:
+                    logger.warning(f"Unable to describe {len(chunk)} AMI(s): {code or str(e)}")
+                    raise
+                continue
+            for img in resp.get('Images', []):
+                images[img.get('ImageId')] = img
+        return images
@@ -0,0 +1,162 @@
+import hashlib
+import hmac
+import os
+import threading
+import time
+import logging
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+import boto3
+import botocore.session
+from botocore.config import Config
+
+logger = logging.getLogger(__name__)
+
+# Per-process key so credential fingerprints are never comparable across processes
+_FINGERPRINT_KEY = os.urandom(32)
+
+# Connection pool size for pooled clients; matches the largest worker pool an
+# agent runs against a single client (bucket policy fetches, snapshot checks)
+DEFAULT_MAX_POOL_CONNECTIONS = int(os.environ.get("A2A_AWS_MAX_POOL_CONNECTIONS", "32"))
+
+
+def credential_fingerprint(aws_access_key: str, aws_secret_key: str) -> str:
+    """
+    Keyed hash identifying a credential pair without retaining the secret.
+    """
+    material = f"{aws_access_key}\0{aws_secret_key}".encode()
+    return hmac.new(_FINGERPRINT_KEY, material, hashlib.sha256).hexdigest()
+
+
+class _PoolEntry:
+    __slots__ = ("value", "last_used")
+
+    def __init__(self, value: Any):
+        self.value = value
+        self.last_used = time.monotonic()
+
+
+class ClientFactory:
+    """
+    Process-wide pool of boto3 sessions and clients shared by all AWS agents.
+
+    Clients are keyed by credential fingerprint, service, region and client
+    config, so botocore model loading, endpoint resolution and TLS connections
+    are paid once per key instead of once per request. All sessions share one
+    botocore data loader. Entries are evicted least-recently-used beyond
+    max_clients and after idle_ttl seconds without use. Safe to use from threads.
+    """
+
+    def __init__(self, max_clients: int = 256, idle_ttl: float = 900,
+                 max_pool_connections: int = DEFAULT_MAX_POOL_CONNECTIONS):
+        self.max_clients = max_clients
+        self.idle_ttl = idle_ttl
+        self.default_config = Config(max_pool_connections=max_pool_connections)
+        self.stats = {"clients_created": 0, "clients_reused": 0, "sessions_created": 0, "evictions": 0}
+        self._sessions: "OrderedDict[str, _PoolEntry]" = OrderedDict()
+        self._clients: "OrderedDict[Tuple, _PoolEntry]" = OrderedDict()
+        self._session_locks: Dict[str, threading.Lock] = {}
+        self._lock = threading.Lock()
+        self._loader = botocore.session.get_session().get_component("data_loader")
+        self._last_sweep = time.monotonic()
+
+    def get_client(self, aws_access_key: str, aws_secret_key: str, service_name: str,
+                   region_name: Optional[str] = None, config: Optional[Config] = None) -> Tuple[Any, bool]:
+        """
+        Return (client, created) for the credentials, service, region and config.
+        config is merged over the factory default, so it may override
+        max_pool_connections or add retry settings.
+        """
+        fingerprint = credential_fingerprint(aws_access_key, aws_secret_key)
+        merged = self.default_config.merge(config) if config is not None else self.default_config
+        key = (fingerprint, service_name, region_name, self._config_key(merged))
+        with self._lock:
+            self._sweep_idle()
+            entry = self._clients.get(key)
+            if entry is not None:
+                entry.last_used = time.monotonic()
+                self._clients.move_to_end(key)
+                self.stats["clients_reused"] += 1
+                return entry.value, False
+            session_lock = self._session_locks.setdefault(fingerprint, threading.Lock())
+
+        # boto3 sessions are not thread-safe, so creation is serialized per credential
+        with session_lock:
+            with self._lock:
+                entry = self._clients.get(key)
+                if entry is not None:
+                    entry.last_used = time.monotonic()
+                    self._clients.move_to_end(key)
+                    self.stats["clients_reused"] += 1
+                    return entry.value, False
+            session = self._session(fingerprint, aws_access_key, aws_secret_key)
+            kwargs = {"config": merged}
+            if region_name:
+                kwargs["region_name"] = region_name
+            client = session.client(service_name, **kwargs)
+            with self._lock:
+                self._clients[key] = _PoolEntry(client)
+                self.stats["clients_created"] += 1
+                self._evict_overflow()
+        return client, True
+
+    def clear(self) -> None:
+        """Drop every pooled session and client."""
+        with self._lock:
+            self._clients.clear()
+            self._sessions.clear()
+
+    def _session(self, fingerprint: str, aws_access_key: str, aws_secret_key: str) -> boto3.Session:
+        with self._lock:
+            entry = self._sessions.get(fingerprint)
+            if entry is not None:
+                entry.last_used = time.monotonic()
+                self._sessions.move_to_end(fingerprint)
+                return entry.value
+        botocore_session = botocore.session.get_session()
+        # Share parsed service models across every pooled session
+        botocore_session.register_component("data_loader", self._loader)
+        session = boto3.Session(
+            aws_access_key_id=aws_access_key,
+            aws_secret_access_key=aws_secret_key,
+            botocore_session=botocore_session
+        )
+        with self._lock:
+            self._sessions[fingerprint] = _PoolEntry(session)
+            self.stats["sessions_created"] += 1
+        return session
+
+    def _sweep_idle(self) -> None:
+        # Caller holds self._lock
+        now = time.monotonic()
+        if now - self._last_sweep < min(60.0, self.idle_ttl):
+            return
+        self._last_sweep = now
+        for pool in (self._clients, self._sessions):
+            expired = [key for key, entry in pool.items() if now - entry.last_used >= self.idle_ttl]
+            for key in expired:
+                del pool[key]
+            if pool is self._clients:
+                self.stats["evictions"] += len(expired)
+        live = {key[0] for key in self._clients} | set(self._sessions)
+        for fingerprint, lock in list(self._session_locks.items()):
+            if fingerprint not in live and not lock.locked():
+                del self._session_locks[fingerprint]
+
+    def _evict_overflow(self) -> None:
+        # Caller holds self._lock
+        while len(self._clients) > self.max_clients:
+            self._clients.popitem(last=False)
+            self.stats["evictions"] += 1
+        while len(self._sessions) > self.max_clients:
+            self._sessions.popitem(last=False)
+
+    @staticmethod
+    def _config_key(config: Config) -> Tuple:
+        options = getattr(config, "_user_provided_options", {})
+        return tuple(sorted((name, repr(value)) for name, value in options.items()))
+
+
+# Shared by every AWS agent in the process
+CLIENT_FACTORY = ClientFactory()
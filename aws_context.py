@@ -0,0 +1,104 @@
+import threading
+import logging
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import boto3
+
+from aws_clients import CLIENT_FACTORY, ClientFactory, credential_fingerprint
+
+logger = logging.getLogger(__name__)
+
+
+class AWSTaskContext:
+    """
+    AWS state shared by every check of one analysis task.
+
+    Each client is obtained once per (service, region) and reused by all checks,
+    either from a plain boto3 session or from the process-wide ClientFactory
+    pool; caller identity, account aliases and other derived data are looked up
+    once and memoized for the lifetime of the task. Safe to use from worker threads.
+    """
+
+    def __init__(self, session: Optional[boto3.Session] = None, default_region: Optional[str] = None,
+                 factory: Optional[ClientFactory] = None,
+                 credentials: Optional[Tuple[str, str]] = None):
+        if session is None and (factory is None or credentials is None):
+            raise ValueError("AWSTaskContext needs a session or a client factory with credentials")
+        self.session = session
+        self.default_region = default_region
+        self.factory = factory
+        self.fingerprint = credential_fingerprint(*credentials) if credentials else None
+        self.clients_created = 0
+        self.clients_reused = 0
+        self._credentials = credentials
+        self._clients: Dict[Tuple[str, Optional[str]], Any] = {}
+        self._memo: Dict[str, Any] = {}
+        self._memo_locks: Dict[str, threading.Lock] = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_credentials(cls, aws_access_key: str, aws_secret_key: str,
+                         default_region: Optional[str] = None) -> "AWSTaskContext":
+        """
+        Build a context from explicit credentials only - no profile or default
+        chain - drawing clients from the process-wide pool.
+        """
+        return cls(default_region=default_region, factory=CLIENT_FACTORY,
+                   credentials=(aws_access_key, aws_secret_key))
+
+    def client(self, service_name: str, region_name: Optional[str] = None, config: Any = None):
+        """
+        Return the task's client for (service_name, region_name), obtaining it on
+        first use. region_name defaults to the context's default_region; config
+        only applies when the client is first obtained.
+        """
+        region_name = region_name or self.default_region
+        key = (service_name, region_name)
+        with self._lock:
+            # boto3 sessions are not thread-safe, so clients are created under the lock
+            if key not in self._clients:
+                if self.factory is not None:
+                    client, created = self.factory.get_client(*self._credentials, service_name,
+                                                              region_name, config)
+                else:
+                    kwargs = {}
+                    if region_name:
+                        kwargs['region_name'] = region_name
+                    if config is not None:
+                        kwargs['config'] = config
+                    client, created = self.session.client(service_name, **kwargs), True
+                self._clients[key] = client
+                if created:
+                    self.clients_created += 1
+                else:
+                    self.clients_reused += 1
+            return self._clients[key]
+
+    def memoize(self, key: str, factory: Callable[[], Any]) -> Any:
+        """Return the task-scoped value for key, computing it with factory on first use."""
+        with self._lock:
+            if key in self._memo:
+                return self._memo[key]
+            key_lock = self._memo_locks.setdefault(key, threading.Lock())
+        # Compute outside the shared lock so slow lookups do not block client creation
+        with key_lock:
+            with self._lock:
+                if key in self._memo:
+                    return self._memo[key]
+            value = factory()
+            with self._lock:
+                self._memo[key] = value
+            return value
+
+    def caller_identity(self) -> Dict[str, Any]:
+        """sts:GetCallerIdentity for the task's credentials."""
+        return self.memoize('caller_identity', lambda: self.client('sts').get_caller_identity())
+
+    def account_id(self) -> str:
+        """Account ID of the task's credentials."""
+        return self.caller_identity()['Account']
+
+    def account_aliases(self) -> List[str]:
+        """iam:ListAccountAliases for the task's account."""
+        return self.memoize('account_aliases',
+                            lambda: self.client('iam').list_account_aliases().get('AccountAliases', []))
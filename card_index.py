@@ -0,0 +1,147 @@
+import hashlib
+import json
+import os
+import logging
+from types import MappingProxyType
+from typing import Any, Dict, Mapping, Tuple
+
+from serialization import SERIALIZER
+
+logger = logging.getLogger(__name__)
+
+# (st_mtime_ns, st_size) of a card file; a change in either means it is reparsed
+FileSignature = Tuple[int, int]
+
+
+class EncodedDocument:
+    """A JSON document encoded once, with a strong ETag over its bytes."""
+
+    __slots__ = ("body", "etag")
+
+    def __init__(self, content: Any):
+        self.body = SERIALIZER.dumps(content)
+        self.etag = f'"{hashlib.sha256(self.body).hexdigest()[:32]}"'
+
+
+def build_aggregated_card(cards: Dict[str, Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Aggregates the skills of all agent cards into the default Agent Card.
+    """
+    aggregated_card = {
+        "name": "Valide5 A2A Agent Hub",
+        "description": "Provides multiple security analysis capabilities via A2A protocol",
+        "url": "YOUR_SERVER_BASE_URL",
+        "version": "1.0.0",
+        "capabilities": {
+            "streaming": True,
+            "pushNotifications": True,
+            "stateTransitionHistory": False
+        },
+        "authentication": None,
+        "defaultInputModes": ["text", "json"],
+        "defaultOutputModes": ["json"],
+        "skills": []
+    }
+    
+    # Keep track of skills by a compound key of card name + skill ID
+    # This prevents skills with the same ID from different agents from being merged
+    seen_skills = {}
+    
+    # Combine skills from all agent cards
+    for card_name, card_data in cards.items():
+        for skill in card_data.get("skills", []):
+            skill_id = skill.get("id")
+            # Create a unique identifier for each skill by combining card name and skill ID
+            unique_skill_key = f"{card_name}:{skill_id}"
+            
+            # If this is a new skill, add it to the aggregated card
+            if unique_skill_key not in seen_skills:
+                # Create a copy of the skill to avoid modifying the original
+                skill_copy = skill.copy()
+                
+                # Prepend the card name to the skill name for clarity in the aggregated view
+                card_prefix = card_data.get("name", "").split(" Agent")[0]
+                if card_prefix and not skill_copy.get("name", "").startswith(card_prefix):
+                    skill_copy["name"] = f"{card_prefix} - {skill_copy.get('name', skill_id)}"
+                
+                aggregated_card["skills"].append(skill_copy)
+                seen_skills[unique_skill_key] = True
+    
+    return aggregated_card
+
+
+class CardIndex:
+    """
+    Immutable snapshot of the loaded agent cards: the parsed cards, the
+    agent_id to card mapping, and pre-encoded documents for the discovery
+    endpoints. A reload builds a new index and swaps it in as a whole, so a
+    request never sees cards from two different loads.
+    """
+
+    def __init__(self, cards: Dict[str, Dict[str, Any]], signatures: Dict[str, FileSignature]):
+        self.cards: Mapping[str, Dict[str, Any]] = MappingProxyType(dict(cards))
+        self.signatures: Mapping[str, FileSignature] = MappingProxyType(dict(signatures))
+        agent_to_card = {}
+        for card_name, card_data in cards.items():
+            # Map each agent_id to its card
+            for agent_id in card_data.get("agent_ids", []):
+                agent_to_card[agent_id] = card_name
+        self.agent_to_card: Mapping[str, str] = MappingProxyType(agent_to_card)
+
+        aggregated_card = build_aggregated_card(cards) if cards else None
+        self.aggregated = EncodedDocument(aggregated_card) if aggregated_card is not None else None
+        self.documents = {card_name: EncodedDocument(card_data) for card_name, card_data in cards.items()}
+        self.listing = EncodedDocument({"agent_cards": list(cards.keys()), "agent_mappings": agent_to_card})
+        if aggregated_card is not None:
+            logger.info(f"Created aggregated agent card with {len(aggregated_card['skills'])} skills")
+
+    def card_for_agent(self, agent_id: str) -> Dict[str, Any]:
+        """The card listing agent_id, or an empty dict."""
+        return self.cards.get(self.agent_to_card.get(agent_id, ""), {})
+
+
+EMPTY_INDEX = CardIndex({}, {})
+
+
+def scan_card_files(directory: str) -> Dict[str, FileSignature]:
+    """Signatures of the *.json files in directory, keyed by file name."""
+    signatures = {}
+    with os.scandir(directory) as entries:
+        for entry in entries:
+            if entry.name.endswith(".json") and entry.is_file():
+                stat = entry.stat()
+                signatures[entry.name] = (stat.st_mtime_ns, stat.st_size)
+    return signatures
+
+
+def load_card_index(directory: str, previous: CardIndex = EMPTY_INDEX) -> CardIndex:
+    """
+    Load the agent cards in directory, reparsing only files whose signature
+    differs from previous. Returns previous itself when nothing changed. A
+    changed card that fails to parse - e.g. one caught half-written - keeps
+    its previous version and is retried on the next load.
+    """
+    signatures = scan_card_files(directory)
+    if signatures == dict(previous.signatures):
+        return previous
+
+    cards: Dict[str, Dict[str, Any]] = {}
+    for card_name, signature in sorted(signatures.items()):
+        if previous.signatures.get(card_name) == signature:
+            cards[card_name] = previous.cards[card_name]
+            continue
+        try:
+            with open(os.path.join(directory, card_name), "r") as f:
+                cards[card_name] = json.load(f)
+            logger.info(f"Loaded agent card: {card_name}")
+        except Exception as e:
+            logger.error(f"Error loading agent card {card_name}: {str(e)}")
+            if card_name in previous.cards:
+                cards[card_name] = previous.cards[card_name]
+                # Keep the old signature so the file is read again next time
+                signatures[card_name] = previous.signatures[card_name]
+            else:
+                signatures.pop(card_name)
+    for card_name in previous.cards.keys() - cards.keys():
+        logger.info(f"Removed agent card: {card_name}")
+    return CardIndex(cards, signatures)
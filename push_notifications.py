@@ -0,0 +1,252 @@
+import asyncio
+import ipaddress
+import os
+import socket
+import random
+import time
+import logging
+from typing import Any, Dict, List, Optional, Set
+from urllib.parse import urlparse
+
+import httpx
+
+from serialization import dumps
+
+logger = logging.getLogger(__name__)
+
+# Pending notifications beyond which new ones are dropped
+DEFAULT_QUEUE_SIZE = int(os.environ.get("A2A_PUSH_QUEUE_SIZE", "1000"))
+# Webhook hosts allowed even when they resolve to private, loopback or link-local addresses
+DEFAULT_ALLOWED_HOSTS = frozenset(host.strip().lower() for host in
+                                  os.environ.get("A2A_PUSH_ALLOWED_HOSTS", "").split(",") if host.strip())
+
+
+def validate_push_config(config: Any, allowed_hosts: Optional[Set[str]] = None) -> Dict[str, Any]:
+    """
+    Validate a PushNotificationConfig ({"url": ..., "token": ...}) and return
+    the normalized copy. Raises ValueError for anything but an http(s) URL,
+    and for an IP address or localhost that is not public unless the host is
+    in allowed_hosts. Host names are resolved later by check_push_target.
+    """
+    if not isinstance(config, dict) or not isinstance(config.get("url"), str):
+        raise ValueError("pushNotificationConfig must be an object with a 'url'")
+    parsed = urlparse(config["url"])
+    try:
+        host = parsed.hostname
+        parsed.port
+    except ValueError:
+        host = None
+    if parsed.scheme not in ("http", "https") or not host:
+        raise ValueError(f"Invalid push notification URL: {config['url']}")
+    if not _host_allowed(host, allowed_hosts):
+        if host == "localhost" or host.endswith(".localhost"):
+            raise ValueError(f"Push notification URL must not point at this server: {config['url']}")
+        try:
+            address = ipaddress.ip_address(host)
+        except ValueError:
+            address = None
+        if address is not None and not address.is_global:
+            raise ValueError(f"Push notification URL must use a public address: {config['url']}")
+    normalized = {"url": config["url"]}
+    if config.get("token"):
+        normalized["token"] = str(config["token"])
+    return normalized
+
+
+async def check_push_target(url: str, allowed_hosts: Optional[Set[str]] = None) -> None:
+    """
+    Resolve the host of a webhook URL and raise ValueError unless every
+    address it resolves to is public, so webhooks cannot reach loopback,
+    link-local (e.g. cloud metadata) or private network services. Hosts in
+    allowed_hosts are not checked. A host that cannot be resolved raises
+    socket.gaierror.
+    """
+    parsed = urlparse(url)
+    host = parsed.hostname
+    if _host_allowed(host, allowed_hosts):
+        return
+    port = parsed.port or (443 if parsed.scheme == "https" else 80)
+    infos = await asyncio.get_running_loop().getaddrinfo(host, port, type=socket.SOCK_STREAM)
+    for info in infos:
+        address = ipaddress.ip_address(info[4][0].split("%")[0])
+        if not address.is_global:
+            raise ValueError(f"Push notification host {host} resolves to non-public address {address}")
+
+
+async def accept_push_config(config: Any, allowed_hosts: Optional[Set[str]] = None) -> Dict[str, Any]:
+    """
+    validate_push_config followed by check_push_target, for configs received
+    from clients. Raises ValueError for invalid, unresolvable or non-public targets.
+    """
+    normalized = validate_push_config(config, allowed_hosts)
+    try:
+        await check_push_target(normalized["url"], allowed_hosts)
+    except OSError as e:
+        raise ValueError(f"Cannot resolve push notification URL {normalized['url']}: {str(e)}")
+    return normalized
+
+
+def _host_allowed(host: Optional[str], allowed_hosts: Optional[Set[str]]) -> bool:
+    allowed = DEFAULT_ALLOWED_HOSTS if allowed_hosts is None else allowed_hosts
+    return bool(host) and host.lower() in allowed
+
+
+class _Notification:
+    __slots__ = ("url", "token", "payload", "attempts", "queued_at")
+
+    def __init__(self, url: str, token: Optional[str], payload: Dict[str, Any]):
+        self.url = url
+        self.token = token
+        self.payload = payload
+        self.attempts = 0
+        self.queued_at = time.monotonic()
+
+
+class PushNotifier:
+    """
+    Delivers push notifications to client webhooks from a bounded async queue.
+
+    A fixed set of workers POST each payload with a shared, connection-pooled
+    HTTP client. Connection errors, 429 and 5xx responses are retried with
+    capped exponential backoff and jitter; retries wait off the queue, so a
+    slow receiver does not hold up deliveries to others. When the queue is
+    full new notifications are dropped and counted rather than blocking the
+    task that produced them. Every attempt first checks the target with
+    check_push_target; non-public targets are blocked, not retried.
+    """
+
+    # Status codes worth retrying; other errors are permanent
+    RETRY_STATUS_CODES = (408, 425, 429, 500, 502, 503, 504)
+
+    def __init__(self, max_queue: int = DEFAULT_QUEUE_SIZE, workers: int = 4, max_attempts: int = 5,
+                 base_backoff: float = 0.5, max_backoff: float = 30, timeout: float = 10,
+                 allowed_hosts: Optional[Set[str]] = None):
+        self.max_queue = max_queue
+        self.workers = workers
+        self.max_attempts = max_attempts
+        self.base_backoff = base_backoff
+        self.max_backoff = max_backoff
+        self.timeout = timeout
+        self.allowed_hosts = allowed_hosts
+        self.stats = {"queued": 0, "delivered": 0, "retried": 0, "failed": 0, "dropped": 0, "blocked": 0}
+        self.last_error: Optional[str] = None
+        self.last_delivery_seconds: Optional[float] = None
+        self._queue: Optional[asyncio.Queue] = None
+        self._client: Optional[httpx.AsyncClient] = None
+        self._workers: List[asyncio.Task] = []
+        self._retries: Set[asyncio.Task] = set()
+
+    def notify(self, config: Dict[str, Any], payload: Dict[str, Any]) -> bool:
+        """
+        Queue payload for delivery to config["url"]. Must be called from the
+        event loop. Returns False when the queue is full and it was dropped.
+        """
+        self._start()
+        notification = _Notification(config["url"], config.get("token"), payload)
+        try:
+            self._queue.put_nowait(notification)
+        except asyncio.QueueFull:
+            self.stats["dropped"] += 1
+            logger.warning(f"Push notification queue full, dropping notification for {config['url']}")
+            return False
+        self.stats["queued"] += 1
+        return True
+
+    def metrics(self) -> Dict[str, Any]:
+        """Delivery counters and backlog for monitoring."""
+        return dict(
+            self.stats,
+            pending=self._queue.qsize() if self._queue is not None else 0,
+            waiting_to_retry=len(self._retries),
+            last_delivery_seconds=self.last_delivery_seconds,
+            last_error=self.last_error
+        )
+
+    async def join(self) -> None:
+        """Wait until every queued notification, including retries, is delivered or given up."""
+        while self._queue is not None:
+            await self._queue.join()
+            if not self._retries:
+                return
+            await asyncio.gather(*list(self._retries), return_exceptions=True)
+
+    async def close(self) -> None:
+        """Stop the workers and close the HTTP client; undelivered notifications are lost."""
+        pending = list(self._retries) + self._workers
+        for task in pending:
+            task.cancel()
+        await asyncio.gather(*pending, return_exceptions=True)
+        self._workers.clear()
+        if self._client is not None:
+            await self._client.aclose()
+        self._client = None
+        self._queue = None
+
+    def _start(self) -> None:
+        if self._queue is not None:
+            return
+        self._queue = asyncio.Queue(maxsize=self.max_queue)
+        self._client = httpx.AsyncClient(
+            timeout=self.timeout,
+            limits=httpx.Limits(max_connections=self.workers, max_keepalive_connections=self.workers)
+        )
+        self._workers = [asyncio.create_task(self._work(), name=f"push-notifier-{n}")
+                         for n in range(self.workers)]
+
+    async def _work(self) -> None:
+        while True:
+            notification = await self._queue.get()
+            try:
+                await self._deliver(notification)
+            except Exception as e:
+                logger.error(f"Unexpected error delivering push notification: {str(e)}", exc_info=True)
+            finally:
+                self._queue.task_done()
+
+    async def _deliver(self, notification: _Notification) -> None:
+        notification.attempts += 1
+        headers = {"Content-Type": "application/json"}
+        if notification.token:
+            headers["Authorization"] = f"Bearer {notification.token}"
+        try:
+            # Checked on every attempt, since DNS answers can change after the config was set
+            await check_push_target(notification.url, self.allowed_hosts)
+            resp = await self._client.post(notification.url, content=dumps(notification.payload), headers=headers)
+            if resp.status_code < 300:
+                self.stats["delivered"] += 1
+                self.last_delivery_seconds = round(time.monotonic() - notification.queued_at, 3)
+                return
+            error = f"HTTP {resp.status_code}"
+            retryable = resp.status_code in self.RETRY_STATUS_CODES
+        except ValueError as e:
+            self.stats["blocked"] += 1
+            self.last_error = f"{notification.url}: {str(e)}"
+            logger.error(f"Not delivering push notification: {str(e)}")
+            return
+        except (httpx.HTTPError, OSError) as e:
+            error = f"{type(e).__name__}: {str(e)}"
+            retryable = True
+
+        self.last_error = f"{notification.url}: {error}"
+        if not retryable or notification.attempts >= self.max_attempts:
+            self.stats["failed"] += 1
+            logger.error(f"Giving up on push notification to {notification.url} after "
+                         f"{notification.attempts} attempts: {error}")
+            return
+        delay = min(self.max_backoff, self.base_backoff * 2 ** (notification.attempts - 1))
+        delay *= random.uniform(0.5, 1.0)
+        self.stats["retried"] += 1
+        logger.warning(f"Push notification to {notification.url} failed ({error}), retrying in {delay:.2f}s")
+        retry = asyncio.create_task(self._requeue(notification, delay))
+        self._retries.add(retry)
+        retry.add_done_callback(self._retries.discard)
+
+    async def _requeue(self, notification: _Notification, delay: float) -> None:
+        await asyncio.sleep(delay)
+        if self._queue is None:
+            return
+        try:
+            self._queue.put_nowait(notification)
+        except asyncio.QueueFull:
+            self.stats["dropped"] += 1
+            logger.warning(f"Push notification queue full, dropping retry for {notification.url}")
@@ -0,0 +1,270 @@
+import json
+import os
+import stat
+import tempfile
+import threading
+import time
+import logging
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional, Tuple
+
+import requests
+import yaml
+
+logger = logging.getLogger(__name__)
+
+# Per-user directory holding on-disk copies of cached reference data
+DEFAULT_CACHE_DIR = os.environ.get(
+    "A2A_CACHE_DIR",
+    os.path.join(os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache"),
+                 "a2a-security-agents")
+)
+
+
+def is_private_path(path: str) -> bool:
+    """
+    Whether path is owned by the current user and not world-writable, so
+    another local user cannot have planted or altered it.
+    """
+    st = os.stat(path)
+    if hasattr(os, "getuid") and st.st_uid != os.getuid():
+        return False
+    return not st.st_mode & stat.S_IWOTH
+
+
+class ReferenceDataCache:
+    """
+    Process-wide cache for a remote YAML reference document.
+
+    The parsed mapping is kept in memory and mirrored to a JSON file on disk, so
+    a cold start skips both the download and YAML parsing. Once the data is older
+    than ttl it is still served while a single background refresh revalidates it
+    with If-None-Match/If-Modified-Since; requests only block when there is no
+    copy at all.
+    """
+
+    def __init__(self, url: str, parser: Callable[[Any], Dict[str, Any]], cache_file: str,
+                 ttl: float = 3600, timeout: float = 10, retry_interval: float = 60):
+        self.url = url
+        self.parser = parser
+        self.cache_file = cache_file
+        self.ttl = ttl
+        self.timeout = timeout
+        self.retry_interval = retry_interval
+        self.stats = {"downloads": 0, "revalidations": 0, "disk_loads": 0, "errors": 0}
+        self.last_error: Optional[str] = None
+        self._data: Optional[Dict[str, Any]] = None
+        self._etag: Optional[str] = None
+        self._last_modified: Optional[str] = None
+        self._fetched_at = 0.0
+        self._last_attempt = 0.0
+        self._disk_checked = False
+        self._refresh_thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+        self._refresh_lock = threading.Lock()
+
+    def get(self) -> Dict[str, Any]:
+        """
+        Return the cached mapping, refreshing it in the background when stale.
+        Returns {} only when no copy has ever been obtained.
+        """
+        with self._lock:
+            if self._data is None and not self._disk_checked:
+                self._load_from_disk()
+            data = self._data
+            stale = time.time() - self._fetched_at >= self.ttl
+            recently_failed = time.time() - self._last_attempt < self.retry_interval
+
+        if data is None:
+            if recently_failed:
+                return {}
+            self.refresh()
+            return self._data or {}
+        if stale:
+            self._refresh_in_background()
+        return data
+
+    def refresh(self) -> bool:
+        """
+        Download the document, or revalidate the cached copy when there is one.
+        Returns True when the cache holds fresh data afterwards.
+        """
+        with self._refresh_lock:
+            headers = {}
+            with self._lock:
+                self._last_attempt = time.time()
+                if self._data is not None:
+                    if self._etag:
+                        headers["If-None-Match"] = self._etag
+                    if self._last_modified:
+                        headers["If-Modified-Since"] = self._last_modified
+            try:
+                resp = requests.get(self.url, headers=headers, timeout=self.timeout)
+                if resp.status_code == 304:
+                    with self._lock:
+                        self._fetched_at = time.time()
+                        self.last_error = None
+                        self.stats["revalidations"] += 1
+                else:
+                    resp.raise_for_status()
+                    data = self.parser(yaml.safe_load(resp.text))
+                    with self._lock:
+                        self._data = data
+                        self._etag = resp.headers.get("ETag")
+                        # Only validators the server supplied are sent back to it
+                        self._last_modified = resp.headers.get("Last-Modified")
+                        self._fetched_at = time.time()
+                        self.last_error = None
+                        self.stats["downloads"] += 1
+            except Exception as e:
+                with self._lock:
+                    self.last_error = str(e)
+                    self.stats["errors"] += 1
+                logger.error(f"Error refreshing reference data from {self.url}: {str(e)}")
+                return False
+            self._save_to_disk()
+            return True
+
+    def status(self) -> Dict[str, Any]:
+        """Describe the cached copy for inclusion in analysis results."""
+        with self._lock:
+            age = time.time() - self._fetched_at if self._data is not None else None
+            return {
+                "source": self.url,
+                "entries": len(self._data or {}),
+                "age_seconds": round(age, 1) if age is not None else None,
+                "stale": age is None or age >= self.ttl,
+                "last_error": self.last_error,
+            }
+
+    def _refresh_in_background(self) -> None:
+        with self._lock:
+            if self._refresh_thread is not None and self._refresh_thread.is_alive():
+                return
+            if time.time() - self._last_attempt < self.retry_interval:
+                return
+            self._refresh_thread = threading.Thread(
+                target=self.refresh, name="reference-data-refresh", daemon=True
+            )
+            self._refresh_thread.start()
+
+    def _load_from_disk(self) -> None:
+        # Caller holds self._lock
+        self._disk_checked = True
+        try:
+            directory = os.path.dirname(self.cache_file) or "."
+            if not (is_private_path(directory) and is_private_path(self.cache_file)):
+                logger.warning(f"Ignoring reference data cache {self.cache_file}: "
+                               f"not owned by this user or writable by others")
+                return
+            with open(self.cache_file, "r") as f:
+                cached = json.load(f)
+        except FileNotFoundError:
+            return
+        except Exception as e:
+            logger.warning(f"Ignoring unreadable reference data cache {self.cache_file}: {str(e)}")
+            return
+        if cached.get("url") != self.url or not isinstance(cached.get("data"), dict):
+            return
+        self._data = cached["data"]
+        self._etag = cached.get("etag")
+        self._last_modified = cached.get("last_modified")
+        # A copy claiming to be from the future would never go stale
+        try:
+            self._fetched_at = min(float(cached.get("fetched_at", 0.0)), time.time())
+        except (TypeError, ValueError):
+            self._fetched_at = 0.0
+        self.stats["disk_loads"] += 1
+        logger.info(f"Loaded {len(self._data)} reference entries from {self.cache_file}")
+
+    def _save_to_disk(self) -> None:
+        with self._lock:
+            cached = {
+                "url": self.url,
+                "etag": self._etag,
+                "last_modified": self._last_modified,
+                "fetched_at": self._fetched_at,
+                "data": self._data,
+            }
+        try:
+            directory = os.path.dirname(self.cache_file) or "."
+            os.makedirs(directory, mode=0o700, exist_ok=True)
+            # Write to a temporary file first so readers never see a partial copy
+            fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+            with os.fdopen(fd, "w") as f:
+                json.dump(cached, f)
+            os.replace(tmp_path, self.cache_file)
+        except Exception as e:
+            logger.warning(f"Unable to write reference data cache {self.cache_file}: {str(e)}")
+
+
+class FileConfigCache:
+    """
+    Process-wide cache of parsed YAML config files keyed by (path, mtime, size).
+
+    A file is re-read and re-parsed only when it changes on disk; otherwise the
+    pre-built mapping is returned. Returned mappings are shared between callers
+    and must be treated as read-only.
+    """
+
+    def __init__(self, parser: Callable[[Any], Dict[str, Any]], max_entries: int = 32):
+        self.parser = parser
+        self.max_entries = max_entries
+        self.stats = {"hits": 0, "misses": 0}
+        self._entries: "OrderedDict[str, Tuple[Tuple[int, int], Dict[str, Any]]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, path: str) -> Dict[str, Any]:
+        """
+        Return the parsed mapping for path, or {} when the file does not exist.
+        Parse errors are raised to the caller.
+        """
+        return self.lookup(path)[0]
+
+    def lookup(self, path: str) -> Tuple[Dict[str, Any], bool]:
+        """
+        Like get, but also report whether this call was served from the cache,
+        for callers that account per request rather than per process.
+        """
+        try:
+            st = os.stat(path)
+        except FileNotFoundError:
+            logger.warning(f"Config file not found: {path}")
+            return {}, False
+        real_path = os.path.realpath(path)
+        version = (st.st_mtime_ns, st.st_size)
+        with self._lock:
+            entry = self._entries.get(real_path)
+            if entry is not None and entry[0] == version:
+                self.stats["hits"] += 1
+                self._entries.move_to_end(real_path)
+                return entry[1], True
+            self.stats["misses"] += 1
+
+        with open(path, "r") as f:
+            data = self.parser(yaml.safe_load(f))
+        with self._lock:
+            self._entries[real_path] = (version, data)
+            self._entries.move_to_end(real_path)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return data, False
+
+
+def parse_trusted_accounts(entries: Any) -> Dict[str, Dict[str, Any]]:
+    """
+    Build mapping account_id -> metadata from a parsed trusted accounts file.
+    """
+    mapping: Dict[str, Dict[str, Any]] = {}
+    for ent in entries or []:
+        for acct in ent.get("accounts", []):
+            mapping[str(acct)] = {
+                "name": ent.get("name", "Internal"),
+                "type": "trusted",
+                "description": ent.get("description", "")
+            }
+    return mapping
+
+
+# Shared by every agent that reads trusted account lists
+TRUSTED_ACCOUNTS_FILES = FileConfigCache(parse_trusted_accounts)
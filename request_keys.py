@@ -0,0 +1,66 @@
+import hashlib
+import hmac
+import json
+import os
+from typing import Any, Dict, Tuple
+
+# Per-process key so secret fingerprints are never comparable across processes
+_FINGERPRINT_KEY = os.urandom(32)
+
+# Parameter names containing any of these are treated as secrets
+SECRET_PARAMETER_MARKERS = ("secret", "password", "token", "access key", "access_key", "credential", "private")
+# Stands in for secret values wherever a request is kept or shown
+REDACTED = "***"
+
+
+def is_secret_parameter(name: str) -> bool:
+    """True when a parameter name looks like it carries a credential."""
+    lowered = name.lower()
+    return any(marker in lowered for marker in SECRET_PARAMETER_MARKERS)
+
+
+def mask_secrets(value: Any) -> Any:
+    """
+    Copy of value, to any depth, with the values of secret-looking keys
+    replaced by REDACTED; used for requests that are retained after the
+    agent has received the original.
+    """
+    if isinstance(value, dict):
+        return {key: REDACTED if is_secret_parameter(str(key)) else mask_secrets(item)
+                for key, item in value.items()}
+    if isinstance(value, list):
+        return [mask_secrets(item) for item in value]
+    return value
+
+
+def split_parameters(parameters: Dict[str, Any]) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+    """Split top-level parameters into (public, secret) mappings."""
+    public: Dict[str, Any] = {}
+    secret: Dict[str, Any] = {}
+    for name, value in (parameters or {}).items():
+        (secret if is_secret_parameter(name) else public)[name] = value
+    return public, secret
+
+
+def secret_fingerprint(secrets: Dict[str, Any]) -> str:
+    """
+    Keyed hash identifying a set of secret values without retaining them.
+    Equal secrets give equal fingerprints within this process only.
+    """
+    material = json.dumps(secrets, sort_keys=True, default=str).encode()
+    return hmac.new(_FINGERPRINT_KEY, material, hashlib.sha256).hexdigest()
+
+
+def request_fingerprint(agent_id: str, skill_id: str, parameters: Dict[str, Any]) -> str:
+    """
+    Stable key for an analysis request: agent, skill, the public parameters in
+    canonical form and a keyed fingerprint of the secret ones, so requests made
+    with different credentials never share a key.
+    """
+    public, secret = split_parameters(parameters)
+    material = json.dumps(
+        {"agent_id": agent_id, "skill_id": skill_id, "parameters": public,
+         "credentials": secret_fingerprint(secret) if secret else None},
+        sort_keys=True, separators=(",", ":"), default=str
+    )
+    return hashlib.sha256(material.encode()).hexdigest()
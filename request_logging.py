@@ -0,0 +1,110 @@
+import atexit
+import json
+import os
+import queue
+import logging
+import logging.handlers
+from typing import Any, Optional
+
+from request_keys import REDACTED, is_secret_parameter
+
+# Level for the server's loggers; DEBUG adds request and response payloads
+DEFAULT_LOG_LEVEL = os.environ.get("A2A_LOG_LEVEL", "INFO").upper()
+# Characters of a logged payload kept before it is cut off
+DEFAULT_MAX_PAYLOAD_CHARS = int(os.environ.get("A2A_LOG_PAYLOAD_CHARS", "2048"))
+
+LOG_FORMAT = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+
+# Limits on how much of a payload is walked before it is formatted
+MAX_ITEMS = 20
+MAX_DEPTH = 10
+MAX_STRING_CHARS = 256
+
+_listener: Optional[logging.handlers.QueueListener] = None
+
+
+def configure_logging(level: str = DEFAULT_LOG_LEVEL) -> None:
+    """
+    Route root logging through a queue so records are written by a
+    background thread instead of the event loop. Safe to call more than once.
+    """
+    global _listener
+    root = logging.getLogger()
+    root.setLevel(level)
+    if _listener is not None:
+        return
+    # Handlers already on the root logger (e.g. from basicConfig) move behind the queue
+    handlers = list(root.handlers)
+    if not handlers:
+        stream_handler = logging.StreamHandler()
+        stream_handler.setFormatter(logging.Formatter(LOG_FORMAT))
+        handlers = [stream_handler]
+    for handler in handlers:
+        root.removeHandler(handler)
+    log_queue: queue.SimpleQueue = queue.SimpleQueue()
+    root.addHandler(logging.handlers.QueueHandler(log_queue))
+    _listener = logging.handlers.QueueListener(log_queue, *handlers, respect_handler_level=True)
+    _listener.start()
+    atexit.register(stop_logging)
+
+
+def stop_logging() -> None:
+    """Flush queued records and stop the background writer."""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+
+def redact(value: Any, depth: int = 0) -> Any:
+    """
+    Bounded copy of value for logging: secret parameters are replaced, and
+    long strings, large collections and deep nesting are cut short, so the
+    cost does not grow with the size of an analysis result.
+    """
+    if depth >= MAX_DEPTH:
+        return "..."
+    if isinstance(value, dict):
+        copy = {}
+        for n, (key, item) in enumerate(value.items()):
+            if n == MAX_ITEMS:
+                copy["..."] = f"{len(value) - MAX_ITEMS} more keys"
+                break
+            copy[key] = REDACTED if is_secret_parameter(str(key)) else redact(item, depth + 1)
+        return copy
+    if isinstance(value, (list, tuple)):
+        items = [redact(item, depth + 1) for item in value[:MAX_ITEMS]]
+        if len(value) > MAX_ITEMS:
+            items.append(f"... {len(value) - MAX_ITEMS} more items")
+        return items
+    if isinstance(value, str) and len(value) > MAX_STRING_CHARS:
+        return value[:MAX_STRING_CHARS] + "..."
+    return value
+
+
+class LogPayload:
+    """
+    Payload argument for %-style log calls. Redaction and serialization
+    happen in __str__, so they are skipped entirely when the record is
+    filtered out by level.
+    """
+
+    __slots__ = ("payload", "max_chars")
+
+    def __init__(self, payload: Any, max_chars: int = DEFAULT_MAX_PAYLOAD_CHARS):
+        self.payload = payload
+        self.max_chars = max_chars
+
+    def __str__(self) -> str:
+        text = json.dumps(redact(self.payload), separators=(",", ":"), default=str)
+        if len(text) > self.max_chars:
+            return f"{text[:self.max_chars]}... ({len(text)} chars)"
+        return text
+
+
+def log_rpc(logger: logging.Logger, direction: str, agent_id: str, method: Any, request_id: Any,
+            payload: Any, level: int = logging.DEBUG) -> None:
+    """Log one JSON-RPC request or response as a single structured line."""
+    if logger.isEnabledFor(level):
+        logger.log(level, "a2a %s agent_id=%s method=%s id=%s payload=%s",
+                   direction, agent_id, method, request_id, LogPayload(payload))
@@ -0,0 +1,92 @@
+import os
+import time
+import logging
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+from serialization import dumps
+
+logger = logging.getLogger(__name__)
+
+# Upper bound on the serialized size of all cached results
+DEFAULT_MAX_BYTES = int(os.environ.get("A2A_RESULT_CACHE_BYTES", str(64 * 1024 * 1024)))
+# TTL for agents that declare none in register_agent or their card (0 disables caching)
+DEFAULT_TTL = float(os.environ.get("A2A_RESULT_CACHE_TTL", "0"))
+
+
+class _CacheEntry:
+    __slots__ = ("result", "size", "expires_at")
+
+    def __init__(self, result: Any, size: int, expires_at: float):
+        self.result = result
+        self.size = size
+        self.expires_at = expires_at
+
+
+class ResultCache:
+    """
+    In-memory cache of finished analysis results.
+
+    Entries are keyed by request fingerprint - which covers the credentials,
+    so different credentials never share a result - and expire after the TTL
+    given when they were stored. The total serialized size of all entries is
+    kept under max_bytes by evicting the least recently used ones. Cached
+    results are shared between tasks and must be treated as read-only.
+    """
+
+    def __init__(self, max_bytes: int = DEFAULT_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self.stats = {"hits": 0, "misses": 0, "evictions": 0, "expirations": 0, "bypasses": 0, "too_large": 0}
+        self._entries: "OrderedDict[str, _CacheEntry]" = OrderedDict()
+        self._bytes = 0
+
+    def get(self, key: str) -> Optional[Any]:
+        """Return the cached result for key, or None when absent or expired."""
+        entry = self._entries.get(key)
+        if entry is not None and entry.expires_at <= time.monotonic():
+            self._remove(key)
+            self.stats["expirations"] += 1
+            entry = None
+        if entry is None:
+            self.stats["misses"] += 1
+            return None
+        self._entries.move_to_end(key)
+        self.stats["hits"] += 1
+        return entry.result
+
+    def contains(self, key: str) -> bool:
+        """True when key has an unexpired entry; unlike get, counts nothing."""
+        entry = self._entries.get(key)
+        return entry is not None and entry.expires_at > time.monotonic()
+
+    def put(self, key: str, result: Any, ttl: float) -> bool:
+        """
+        Cache result for ttl seconds. Returns False when it is larger than the
+        whole cache and was not stored.
+        """
+        size = len(dumps(result))
+        if size > self.max_bytes:
+            self.stats["too_large"] += 1
+            logger.warning(f"Result of {size} bytes exceeds the {self.max_bytes} byte result cache, not caching")
+            return False
+        if key in self._entries:
+            self._remove(key)
+        self._entries[key] = _CacheEntry(result, size, time.monotonic() + ttl)
+        self._bytes += size
+        while self._bytes > self.max_bytes:
+            oldest = next(iter(self._entries))
+            self._remove(oldest)
+            self.stats["evictions"] += 1
+        return True
+
+    def metrics(self) -> Dict[str, Any]:
+        """Counters plus current size for monitoring."""
+        return dict(self.stats, entries=len(self._entries), bytes=self._bytes, max_bytes=self.max_bytes)
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self._bytes = 0
+
+    def _remove(self, key: str) -> None:
+        entry = self._entries.pop(key)
+        self._bytes -= entry.size
@@ -0,0 +1,91 @@
+import json
+import os
+import logging
+from datetime import date, datetime, time
+from decimal import Decimal
+from typing import Any, Union
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+logger = logging.getLogger(__name__)
+
+# JSON backend: "orjson", "stdlib", or "auto" for orjson when it is installed
+DEFAULT_BACKEND = os.environ.get("A2A_JSON_BACKEND", "auto").lower()
+
+
+def _default(value: Any) -> Any:
+    # Types agents return that JSON has no representation for
+    if isinstance(value, (datetime, date, time)):
+        return value.isoformat()
+    if isinstance(value, (set, frozenset)):
+        return list(value)
+    if isinstance(value, Decimal):
+        return float(value)
+    return str(value)
+
+
+class StdlibSerializer:
+    """Encodes with the json module; always available."""
+
+    name = "stdlib"
+
+    def dumps(self, value: Any) -> bytes:
+        return json.dumps(value, separators=(",", ":"), ensure_ascii=False, default=_default).encode("utf-8")
+
+    def loads(self, data: Union[bytes, str]) -> Any:
+        return json.loads(data)
+
+
+class OrjsonSerializer:
+    """
+    Encodes with orjson, which serializes datetimes natively in the same ISO
+    format as the stdlib path. Values orjson rejects, such as integers wider
+    than 64 bits, fall back to the stdlib encoder.
+    """
+
+    name = "orjson"
+    OPTIONS = orjson.OPT_NON_STR_KEYS if orjson is not None else 0
+
+    def __init__(self):
+        self._fallback = StdlibSerializer()
+
+    def dumps(self, value: Any) -> bytes:
+        try:
+            return orjson.dumps(value, default=_default, option=self.OPTIONS)
+        except TypeError:
+            return self._fallback.dumps(value)
+
+    def loads(self, data: Union[bytes, str]) -> Any:
+        return orjson.loads(data)
+
+
+def get_serializer(backend: str = DEFAULT_BACKEND):
+    """Return the serializer for backend, falling back to stdlib when orjson is missing."""
+    if backend not in ("auto", "orjson", "stdlib"):
+        raise ValueError(f"Unknown JSON backend: {backend}")
+    if backend == "stdlib":
+        return StdlibSerializer()
+    if orjson is None:
+        if backend == "orjson":
+            logger.warning("A2A_JSON_BACKEND=orjson but orjson is not installed, using the stdlib json module")
+        return StdlibSerializer()
+    return OrjsonSerializer()
+
+
+SERIALIZER = get_serializer()
+
+
+def dumps(value: Any) -> bytes:
+    """Compact UTF-8 JSON for value using the configured backend."""
+    return SERIALIZER.dumps(value)
+
+
+def loads(data: Union[bytes, str]) -> Any:
+    """
+    Parse JSON using the configured backend. Invalid input raises
+    json.JSONDecodeError with either backend.
+    """
+    return SERIALIZER.loads(data)
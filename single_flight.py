@@ -0,0 +1,87 @@
+import asyncio
+import os
+import time
+import logging
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Seconds a just-finished result is handed to identical requests (0 disables reuse)
+DEFAULT_FRESHNESS = float(os.environ.get("A2A_SINGLE_FLIGHT_FRESHNESS", "0"))
+
+
+class _Call:
+    __slots__ = ("task", "waiters")
+
+    def __init__(self, task: asyncio.Task):
+        self.task = task
+        self.waiters = 0
+
+
+class SingleFlight:
+    """
+    Runs concurrent identical analyses once and fans the result out.
+
+    Callers pass a key identifying the work - agent, skill, normalized
+    parameters and credential fingerprint - and a factory that performs it.
+    The first caller for a key starts the work in its own task; everyone who
+    asks for the same key before it finishes awaits that task. A waiter that
+    is cancelled only stops waiting; the work is cancelled once nobody waits
+    for it. Reusable results are also handed out for freshness seconds after
+    they finish, keeping at most max_recent of them.
+    """
+
+    def __init__(self, freshness: float = DEFAULT_FRESHNESS, max_recent: int = 256):
+        self.freshness = freshness
+        self.max_recent = max_recent
+        self.stats = {"executions": 0, "coalesced": 0, "fresh_reuses": 0}
+        self._calls: Dict[str, _Call] = {}
+        self._recent: "OrderedDict[str, Tuple[float, Any]]" = OrderedDict()
+
+    async def run(self, key: str, factory: Callable[[], Awaitable[Any]],
+                  reusable: Optional[Callable[[Any], bool]] = None, reuse_recent: bool = True) -> Any:
+        """
+        Return the result of factory() for key, sharing one execution with
+        every concurrent caller. reusable decides whether a result may be
+        served from the freshness window; by default every result is. With
+        reuse_recent false only work still in flight is shared.
+        """
+        recent = self._recent.get(key)
+        if recent is not None:
+            if reuse_recent and time.monotonic() - recent[0] < self.freshness:
+                self.stats["fresh_reuses"] += 1
+                return recent[1]
+            del self._recent[key]
+
+        call = self._calls.get(key)
+        if call is None:
+            call = _Call(asyncio.create_task(self._execute(key, factory, reusable)))
+            self._calls[key] = call
+            self.stats["executions"] += 1
+        else:
+            self.stats["coalesced"] += 1
+            logger.info(f"Coalescing identical analysis {key[:12]} with the one in flight")
+
+        call.waiters += 1
+        try:
+            return await asyncio.shield(call.task)
+        except asyncio.CancelledError:
+            if call.waiters == 1 and not call.task.done():
+                call.task.cancel()
+            raise
+        finally:
+            call.waiters -= 1
+
+    async def _execute(self, key: str, factory: Callable[[], Awaitable[Any]],
+                       reusable: Optional[Callable[[Any], bool]]) -> Any:
+        try:
+            result = await factory()
+            if self.freshness > 0 and (reusable is None or reusable(result)):
+                self._recent[key] = (time.monotonic(), result)
+                self._recent.move_to_end(key)
+                while len(self._recent) > self.max_recent:
+                    self._recent.popitem(last=False)
+            return result
+        finally:
+            self._calls.pop(key, None)
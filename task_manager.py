@@ -0,0 +1,269 @@
+import asyncio
+import time
+import logging
+from collections import OrderedDict
+from datetime import datetime
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# A2A task states
+SUBMITTED = "submitted"
+WORKING = "working"
+COMPLETED = "completed"
+FAILED = "failed"
+CANCELED = "canceled"
+FINAL_STATES = (COMPLETED, FAILED, CANCELED)
+
+
+class TaskRecord:
+    """
+    State of one A2A task executed by the TaskManager.
+    """
+
+    def __init__(self, task_id: str, agent_id: str, messages: List[Dict[str, Any]],
+                 task_context: Optional[Dict[str, Any]]):
+        self.task_id = task_id
+        self.agent_id = agent_id
+        self.messages = messages
+        self.task_context = task_context
+        self.state = SUBMITTED
+        self.result: Optional[Dict[str, Any]] = None
+        self.error: Optional[str] = None
+        self.created_at = time.time()
+        self.updated_at = self.created_at
+        self.finished_at: Optional[float] = None
+        self.artifacts: List[Dict[str, Any]] = []
+        # PushNotificationConfig per task_id this execution is known by
+        self.push_notifications: Dict[str, Dict[str, Any]] = {}
+        # Other task_ids attached to this execution by request fingerprint
+        self.aliases: List[str] = []
+        self.fingerprint: Optional[str] = None
+        # Run slot from the admission callback given to TaskManager.submit
+        self.ticket: Optional[Any] = None
+        self.done = asyncio.Event()
+        self._worker: Optional[asyncio.Task] = None
+        self._subscribers: List[asyncio.Queue] = []
+
+    @property
+    def is_final(self) -> bool:
+        return self.state in FINAL_STATES
+
+    def set_state(self, state: str) -> None:
+        self.state = state
+        self.updated_at = time.time()
+        if state in FINAL_STATES:
+            self.finished_at = self.updated_at
+            self.done.set()
+        # TaskStatusUpdateEvent
+        self._publish({"task_id": self.task_id, "status": self.status(), "final": self.is_final})
+
+    def add_artifact(self, name: str, data: Dict[str, Any]) -> None:
+        """Record a partial result and publish it to subscribers."""
+        artifact = {"name": name, "parts": [{"json": data}], "index": len(self.artifacts)}
+        self.artifacts.append(artifact)
+        # TaskArtifactUpdateEvent
+        self._publish({"task_id": self.task_id, "artifact": artifact})
+
+    def subscribe(self) -> asyncio.Queue:
+        """
+        Return a queue receiving every later status and artifact update event.
+        The last event carries final=True.
+        """
+        queue: asyncio.Queue = asyncio.Queue()
+        self._subscribers.append(queue)
+        return queue
+
+    def unsubscribe(self, queue: asyncio.Queue) -> None:
+        if queue in self._subscribers:
+            self._subscribers.remove(queue)
+
+    def status(self) -> Dict[str, Any]:
+        status: Dict[str, Any] = {
+            "state": self.state,
+            "timestamp": datetime.utcfromtimestamp(self.updated_at).isoformat()
+        }
+        if self.state == FAILED:
+            status["error"] = {"message": self.error}
+        return status
+
+    def to_task(self, task_id: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Render the record as an A2A Task object, under task_id when it was
+        requested by one of its aliases.
+        """
+        messages = list(self.messages)
+        if self.state == COMPLETED:
+            # Include original messages + agent's reply with the analysis results
+            messages.append({
+                "role": "agent",
+                "parts": [
+                    {
+                        "text": "Analysis completed.",
+                        "json": self.result
+                    }
+                ]
+            })
+        task = {
+            "task_id": task_id or self.task_id,
+            "status": self.status(),
+            "messages": messages,
+            "context": self.task_context  # Include original task-level context
+        }
+        if self.artifacts:
+            task["artifacts"] = self.artifacts
+        return task
+
+    def _publish(self, event: Dict[str, Any]) -> None:
+        for queue in self._subscribers:
+            queue.put_nowait(event)
+
+
+class TaskManager:
+    """
+    Runs A2A tasks in background workers and keeps their state for tasks/get
+    and tasks/cancel. Finished tasks are retained up to max_finished entries and
+    for at most finished_ttl seconds, oldest first. Callables in on_finished are
+    called with each record once it reaches a final state.
+
+    Submission is idempotent: a repeated task_id, or optionally a repeated
+    request fingerprint, is attached to the existing execution instead of
+    starting another one.
+    """
+
+    def __init__(self, max_finished: int = 1000, finished_ttl: float = 3600):
+        self.max_finished = max_finished
+        self.finished_ttl = finished_ttl
+        self._tasks: Dict[str, TaskRecord] = {}
+        self._finished: "OrderedDict[str, TaskRecord]" = OrderedDict()
+        self.on_finished: List[Callable[[TaskRecord], None]] = []
+        self.coalesced = {"task_id": 0, "fingerprint": 0}
+        self._by_fingerprint: Dict[str, TaskRecord] = {}
+
+    def submit(self, task_id: str, agent_id: str, messages: List[Dict[str, Any]],
+               task_context: Optional[Dict[str, Any]],
+               run: Callable[[TaskRecord], Awaitable[Dict[str, Any]]],
+               fingerprint: Optional[str] = None, dedupe_by_fingerprint: bool = False,
+               admit: Optional[Callable[[], Any]] = None) -> TaskRecord:
+        """
+        Start run(record) in a background worker and return the record
+        immediately; run may publish partial results with record.add_artifact.
+        admit, when given, is called only when a new execution is about to be
+        created. It returns a ticket whose wait() is awaited before the task
+        leaves the submitted state, and whose release() is called once the
+        task ends. admit may raise to reject the task.
+
+        When task_id is already running or has completed, its record is
+        returned instead and nothing new runs; failed and canceled tasks run
+        again. With dedupe_by_fingerprint, a running or completed task with the
+        same request fingerprint is likewise returned, and the new task_id is
+        added to its aliases so get and cancel find it under that id too.
+        Raises ValueError when task_id was used for a different request.
+        """
+        self._prune()
+        existing = self._tasks.get(task_id)
+        if existing is not None:
+            if existing.agent_id != agent_id or (fingerprint and existing.fingerprint
+                                                 and existing.fingerprint != fingerprint):
+                raise ValueError(f"Task {task_id} already exists for a different request")
+            if existing.state not in (FAILED, CANCELED):
+                self.coalesced["task_id"] += 1
+                logger.info(f"Task {task_id} is already {existing.state}, reusing it")
+                return existing
+        if dedupe_by_fingerprint and fingerprint:
+            match = self._by_fingerprint.get(fingerprint)
+            if match is not None and match.state not in (FAILED, CANCELED):
+                self.coalesced["fingerprint"] += 1
+                logger.info(f"Task {task_id} repeats task {match.task_id} ({match.state}), reusing it")
+                match.aliases.append(task_id)
+                self._tasks[task_id] = match
+                self._finished.pop(task_id, None)
+                return match
+
+        ticket = admit() if admit is not None else None
+        # Only once admitted, so a rejected retry keeps its failed record retained and prunable
+        self._finished.pop(task_id, None)
+        record = TaskRecord(task_id, agent_id, messages, task_context)
+        record.fingerprint = fingerprint
+        record.ticket = ticket
+        self._tasks[task_id] = record
+        if fingerprint:
+            self._by_fingerprint[fingerprint] = record
+        record._worker = asyncio.create_task(self._run(record, run), name=f"a2a-task-{task_id}")
+        if ticket is not None:
+            # Also covers a worker cancelled before it started running
+            record._worker.add_done_callback(lambda _: ticket.release())
+        return record
+
+    def get(self, task_id: str) -> Optional[TaskRecord]:
+        """Return the record for task_id, if it is running or still retained."""
+        self._prune()
+        return self._tasks.get(task_id)
+
+    async def wait(self, record: TaskRecord, timeout: Optional[float] = None) -> TaskRecord:
+        """
+        Wait until the task reaches a final state. Cancelling the waiter (for
+        example because the client disconnected) leaves the task running.
+        """
+        await asyncio.wait_for(asyncio.shield(record.done.wait()), timeout)
+        return record
+
+    async def cancel(self, task_id: str) -> Optional[TaskRecord]:
+        """
+        Cancel a running task. Returns None for unknown tasks; a task that has
+        already finished is returned unchanged.
+        """
+        record = self.get(task_id)
+        if record is None or record.is_final:
+            return record
+        if record._worker is not None:
+            record._worker.cancel()
+            try:
+                await record._worker
+            except asyncio.CancelledError:
+                pass
+        return record
+
+    def stats(self) -> Dict[str, int]:
+        running = sum(1 for record in self._tasks.values() if not record.is_final)
+        return {"running": running, "retained_finished": len(self._finished),
+                "coalesced_by_task_id": self.coalesced["task_id"],
+                "coalesced_by_fingerprint": self.coalesced["fingerprint"]}
+
+    async def _run(self, record: TaskRecord, run: Callable[[TaskRecord], Awaitable[Dict[str, Any]]]) -> None:
+        try:
+            if record.ticket is not None:
+                await record.ticket.wait()
+            record.set_state(WORKING)
+            record.result = await run(record)
+            record.set_state(COMPLETED)
+        except asyncio.CancelledError:
+            logger.info(f"Task {record.task_id} canceled")
+            record.set_state(CANCELED)
+        except Exception as e:
+            logger.error(f"Task {record.task_id} failed: {str(e)}", exc_info=True)
+            record.error = str(e)
+            record.set_state(FAILED)
+        finally:
+            if record.ticket is not None:
+                record.ticket.release()
+            self._finished[record.task_id] = record
+            self._prune()
+            for callback in self.on_finished:
+                try:
+                    callback(record)
+                except Exception as e:
+                    logger.error(f"Task {record.task_id} completion callback failed: {str(e)}", exc_info=True)
+
+    def _prune(self) -> None:
+        cutoff = time.time() - self.finished_ttl
+        while self._finished:
+            task_id, record = next(iter(self._finished.items()))
+            if len(self._finished) <= self.max_finished and record.finished_at >= cutoff:
+                break
+            self._finished.popitem(last=False)
+            for known_id in [task_id] + record.aliases:
+                if self._tasks.get(known_id) is record:
+                    del self._tasks[known_id]
+            if record.fingerprint and self._by_fingerprint.get(record.fingerprint) is record:
+                del self._by_fingerprint[record.fingerprint]
@@ -0,0 +1,316 @@
+import asyncio
+import itertools
+import os
+import time
+import logging
+from collections import deque
+from typing import Any, Deque, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Tasks allowed to run at once across all agents
+DEFAULT_MAX_RUNNING = int(os.environ.get("A2A_MAX_RUNNING_TASKS", "64"))
+# Tasks allowed to wait for a slot before new ones are rejected as busy
+DEFAULT_MAX_QUEUED = int(os.environ.get("A2A_TASK_QUEUE_SIZE", "256"))
+# Queued tasks allowed per tenant, so one tenant cannot fill the whole queue
+DEFAULT_MAX_QUEUED_PER_TENANT = int(os.environ.get("A2A_TENANT_QUEUE_SIZE", str(DEFAULT_MAX_QUEUED // 2)))
+# Wait and run times kept for the percentiles in metrics()
+WAIT_SAMPLES = 1000
+TENANT_SAMPLES = 200
+
+# Priority classes, highest first; a queued task of a higher class always starts first
+PRIORITIES = ("interactive", "normal", "batch")
+DEFAULT_PRIORITY = "normal"
+DEFAULT_TENANT = "default"
+
+
+def parse_weights(spec: str) -> Dict[str, float]:
+    """Parse "tenant=weight,..." as used by A2A_TENANT_WEIGHTS."""
+    weights = {}
+    for item in spec.split(","):
+        if item.strip():
+            tenant, _, weight = item.partition("=")
+            weights[tenant.strip()] = float(weight)
+    return weights
+
+
+# Relative share of run slots per tenant; tenants not listed have weight 1
+DEFAULT_TENANT_WEIGHTS = parse_weights(os.environ.get("A2A_TENANT_WEIGHTS", ""))
+
+
+class SchedulerBusy(Exception):
+    """Raised when a task can neither start nor be queued."""
+
+
+class Ticket:
+    """
+    One task's claim on a run slot. wait() returns once the slot is granted;
+    release() gives it back, or leaves the queue, and may be called any
+    number of times. Tasks that share the slot through share() hold it too;
+    it is given back once every holder has released it.
+    """
+
+    __slots__ = ("scheduler", "agent_id", "limit", "tenant", "priority", "start_tag", "seq",
+                 "enqueued_at", "started_at", "state", "share_key", "holders", "_released", "_granted")
+
+    def __init__(self, scheduler: "TaskScheduler", agent_id: str, limit: Optional[int],
+                 tenant: str, priority: str, start_tag: float, seq: int):
+        self.scheduler = scheduler
+        self.agent_id = agent_id
+        self.limit = limit
+        self.tenant = tenant
+        self.priority = priority
+        self.start_tag = start_tag
+        self.seq = seq
+        self.enqueued_at = time.monotonic()
+        self.started_at: Optional[float] = None
+        self.state = "queued"
+        self.share_key: Optional[str] = None
+        self.holders = 1
+        self._released = False
+        self._granted: Optional[asyncio.Future] = None
+
+    @property
+    def order(self):
+        # Dispatch order: priority class, then fair-share start tag, then arrival
+        return PRIORITIES.index(self.priority), self.start_tag, self.seq
+
+    async def wait(self) -> None:
+        if self.state == "queued":
+            if self._granted is None:
+                self._granted = asyncio.get_running_loop().create_future()
+            # Shielded so one holder giving up does not cancel the wait of the others
+            await asyncio.shield(self._granted)
+
+    def release(self) -> None:
+        if not self._released:
+            self._released = True
+            self._drop_holder()
+
+    def share(self) -> "SharedTicket":
+        """Another holder of this slot, for a task whose work runs as part of this one's."""
+        self.holders += 1
+        self.scheduler.stats["shared"] += 1
+        return SharedTicket(self)
+
+    def _drop_holder(self) -> None:
+        self.holders -= 1
+        if self.holders == 0:
+            self.scheduler._release(self)
+
+
+class SharedTicket:
+    """A Ticket as seen by one of the tasks sharing it."""
+
+    __slots__ = ("ticket", "_released")
+
+    def __init__(self, ticket: Ticket):
+        self.ticket = ticket
+        self._released = False
+
+    @property
+    def state(self) -> str:
+        return self.ticket.state
+
+    async def wait(self) -> None:
+        await self.ticket.wait()
+
+    def release(self) -> None:
+        if not self._released:
+            self._released = True
+            self.ticket._drop_holder()
+
+
+class _TenantStats:
+    __slots__ = ("running", "queued", "started", "rejected", "waits", "runs")
+
+    def __init__(self):
+        self.running = 0
+        self.queued = 0
+        self.started = 0
+        self.rejected = 0
+        self.waits: Deque[float] = deque(maxlen=TENANT_SAMPLES)
+        self.runs: Deque[float] = deque(maxlen=TENANT_SAMPLES)
+
+
+class TaskScheduler:
+    """
+    Admission control and ordering for A2A tasks.
+
+    At most max_running tasks run at once, and at most limit tasks of any
+    agent that declares one. Tasks beyond that wait in a queue of at most
+    max_queued entries, and at most max_queued_per_tenant from one tenant;
+    when either is full reserve raises SchedulerBusy instead of queueing.
+
+    Queued tasks start in priority class order (PRIORITIES). Within a class,
+    tenants share run slots in proportion to their weights by start-time
+    fair queuing: each task is tagged with its tenant's virtual start time,
+    and the lowest tag goes first, so a tenant that submits hundreds of tasks
+    at once is interleaved with, rather than ahead of, everyone else. A task
+    whose agent is at its limit does not hold up tasks of other agents.
+
+    Tasks reserved with the same share_key, such as identical analyses that
+    are executed once, share the first one's slot instead of taking their own.
+    """
+
+    def __init__(self, max_running: int = DEFAULT_MAX_RUNNING, max_queued: int = DEFAULT_MAX_QUEUED,
+                 max_queued_per_tenant: Optional[int] = DEFAULT_MAX_QUEUED_PER_TENANT,
+                 weights: Optional[Dict[str, float]] = None):
+        self.max_running = max_running
+        self.max_queued = max_queued
+        self.max_queued_per_tenant = max_queued_per_tenant
+        self.weights = dict(DEFAULT_TENANT_WEIGHTS if weights is None else weights)
+        self.stats = {"admitted": 0, "queued": 0, "rejected": 0, "completed": 0, "shared": 0}
+        self._queue: List[Ticket] = []
+        self._running: Dict[str, int] = {}
+        self._running_total = 0
+        self._waits: Deque[float] = deque(maxlen=WAIT_SAMPLES)
+        self._max_wait = 0.0
+        self._tenants: Dict[str, _TenantStats] = {}
+        # Start-time fair queuing state: system virtual time and each tenant's last finish tag
+        self._virtual_time = 0.0
+        self._finish_tags: Dict[str, float] = {}
+        self._seq = itertools.count()
+        # Unreleased tickets reserved with a share_key
+        self._shared: Dict[str, Ticket] = {}
+
+    def reserve(self, agent_id: str, limit: Optional[int] = None, tenant: str = DEFAULT_TENANT,
+                priority: str = DEFAULT_PRIORITY, share_key: Optional[str] = None):
+        """
+        Claim a run slot for a task of agent_id on behalf of tenant, running
+        at most limit of that agent's tasks at once. When a ticket reserved
+        with the same share_key is still held, a share of it is returned
+        instead. Must be called from the event loop. Raises ValueError for an
+        unknown priority.
+        """
+        if priority not in PRIORITIES:
+            raise ValueError(f"Unknown priority '{priority}', expected one of {', '.join(PRIORITIES)}")
+        if share_key is not None and share_key in self._shared:
+            return self._shared[share_key].share()
+        tenant_stats = self._tenants.setdefault(tenant, _TenantStats())
+        ticket = Ticket(self, agent_id, limit, tenant, priority,
+                        max(self._virtual_time, self._finish_tags.get(tenant, 0.0)), next(self._seq))
+        if not self._has_capacity(ticket):
+            reason = None
+            if len(self._queue) >= self.max_queued:
+                reason = f"{len(self._queue)} tasks are already waiting"
+            elif self.max_queued_per_tenant is not None and tenant_stats.queued >= self.max_queued_per_tenant:
+                reason = f"tenant '{tenant}' already has {tenant_stats.queued} tasks waiting"
+            if reason is not None:
+                self.stats["rejected"] += 1
+                tenant_stats.rejected += 1
+                logger.warning(f"Rejecting task for agent '{agent_id}': {reason}")
+                raise SchedulerBusy(f"Server busy: {reason}")
+
+        self._finish_tags[tenant] = ticket.start_tag + 1 / self.weights.get(tenant, 1.0)
+        if share_key is not None:
+            ticket.share_key = share_key
+            self._shared[share_key] = ticket
+        self.stats["admitted"] += 1
+        self._queue.append(ticket)
+        tenant_stats.queued += 1
+        self._dispatch()
+        if ticket.state == "queued":
+            self.stats["queued"] += 1
+            logger.info(f"Queued {priority} task of tenant '{tenant}' for agent '{agent_id}' "
+                        f"behind {len(self._queue) - 1} others")
+        return ticket
+
+    def metrics(self) -> Dict[str, Any]:
+        """Running and queued tasks per agent, priority and tenant, plus wait and run times."""
+        queued: Dict[str, int] = {}
+        by_priority = {priority: 0 for priority in PRIORITIES}
+        for ticket in self._queue:
+            queued[ticket.agent_id] = queued.get(ticket.agent_id, 0) + 1
+            by_priority[ticket.priority] += 1
+        return dict(
+            self.stats,
+            running=self._running_total,
+            max_running=self.max_running,
+            queue_depth=len(self._queue),
+            max_queued=self.max_queued,
+            queued_by_priority=by_priority,
+            agents={agent_id: {"running": self._running.get(agent_id, 0), "queued": queued.get(agent_id, 0)}
+                    for agent_id in sorted(set(self._running) | set(queued))},
+            tenants={tenant: {
+                "weight": self.weights.get(tenant, 1.0),
+                "running": stats.running,
+                "queued": stats.queued,
+                "started": stats.started,
+                "rejected": stats.rejected,
+                "wait_seconds": _summary(stats.waits),
+                "run_seconds": _summary(stats.runs)
+            } for tenant, stats in sorted(self._tenants.items())},
+            wait_seconds=dict(_summary(self._waits), max=round(self._max_wait, 3))
+        )
+
+    def _has_capacity(self, ticket: Ticket) -> bool:
+        if self._running_total >= self.max_running:
+            return False
+        return not ticket.limit or self._running.get(ticket.agent_id, 0) < ticket.limit
+
+    def _start(self, ticket: Ticket) -> None:
+        ticket.state = "running"
+        ticket.started_at = time.monotonic()
+        self._running[ticket.agent_id] = self._running.get(ticket.agent_id, 0) + 1
+        self._running_total += 1
+        self._virtual_time = max(self._virtual_time, ticket.start_tag)
+        wait = ticket.started_at - ticket.enqueued_at
+        self._waits.append(wait)
+        self._max_wait = max(self._max_wait, wait)
+        tenant_stats = self._tenants[ticket.tenant]
+        tenant_stats.queued -= 1
+        tenant_stats.running += 1
+        tenant_stats.started += 1
+        tenant_stats.waits.append(wait)
+        if ticket._granted is not None and not ticket._granted.done():
+            ticket._granted.set_result(None)
+
+    def _release(self, ticket: Ticket) -> None:
+        if ticket.share_key is not None and self._shared.get(ticket.share_key) is ticket:
+            del self._shared[ticket.share_key]
+        tenant_stats = self._tenants[ticket.tenant]
+        if ticket.state == "running":
+            self._running[ticket.agent_id] -= 1
+            if not self._running[ticket.agent_id]:
+                del self._running[ticket.agent_id]
+            self._running_total -= 1
+            self.stats["completed"] += 1
+            tenant_stats.running -= 1
+            tenant_stats.runs.append(time.monotonic() - ticket.started_at)
+        elif ticket.state == "queued":
+            self._queue.remove(ticket)
+            tenant_stats.queued -= 1
+        ticket.state = "released"
+        self._dispatch()
+        self._forget_idle_tenants()
+
+    def _dispatch(self) -> None:
+        # Start the best-ordered queued task that can run until none can
+        while self._queue and self._running_total < self.max_running:
+            runnable = [ticket for ticket in self._queue if self._has_capacity(ticket)]
+            if not runnable:
+                return
+            ticket = min(runnable, key=lambda t: t.order)
+            self._queue.remove(ticket)
+            self._start(ticket)
+
+    def _forget_idle_tenants(self) -> None:
+        # A finish tag at or below the virtual time no longer affects ordering
+        if len(self._finish_tags) > 1024:
+            for tenant, finish in list(self._finish_tags.items()):
+                stats = self._tenants.get(tenant)
+                if finish <= self._virtual_time and (stats is None or not (stats.running or stats.queued)):
+                    del self._finish_tags[tenant]
+                    self._tenants.pop(tenant, None)
+
+
+def _summary(samples: Deque[float]) -> Dict[str, Optional[float]]:
+    ordered = sorted(samples)
+    return {"p50": _percentile(ordered, 0.5), "p95": _percentile(ordered, 0.95)}
+
+
+def _percentile(ordered: List[float], fraction: float) -> Optional[float]:
+    if not ordered:
+        return None
+    return round(ordered[min(len(ordered) - 1, int(len(ordered) * fraction))], 3)
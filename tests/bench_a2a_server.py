@@ -0,0 +1,234 @@
+import argparse
+import asyncio
+import json
+import logging
+import os
+import statistics
+import sys
+import time
+import uuid
+
+import httpx
+
+# Add the parent directory to the Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from agent_registry import BaseA2AAgent, register_agent
+from a2a_server import app
+import request_logging
+
+SLOW_AGENT_ID = "bench-slow-scan"
+BLOCKING_AGENT_ID = "bench-blocking-scan"
+INLINE_AGENT_ID = "bench-inline-scan"
+LARGE_RESULT_AGENT_ID = "bench-large-result"
+
+
+@register_agent(SLOW_AGENT_ID)
+class SlowScanAgent(BaseA2AAgent):
+    """Stands in for a long EC2 Eye scan: holds its worker for scan_seconds."""
+
+    async def analyze(self, agent_id, skill_id, parameters, request_context, task_context):
+        await asyncio.sleep(parameters.get("scan_seconds", 5))
+        return {"status": "success"}
+
+
+class SynchronousScanAgent(BaseA2AAgent):
+    """Makes synchronous calls like boto3 does: 50 ms sleeps for scan_seconds."""
+
+    async def analyze(self, agent_id, skill_id, parameters, request_context, task_context):
+        deadline = time.perf_counter() + parameters.get("scan_seconds", 5)
+        while time.perf_counter() < deadline:
+            time.sleep(0.05)
+        return {"status": "success"}
+
+
+@register_agent(BLOCKING_AGENT_ID, blocking=True, max_workers=10)
+class BlockingScanAgent(SynchronousScanAgent):
+    """Declared blocking, so it runs on the agent executor."""
+
+
+@register_agent(INLINE_AGENT_ID)
+class InlineScanAgent(SynchronousScanAgent):
+    """Not declared blocking, so it runs on the event loop."""
+
+
+@register_agent(LARGE_RESULT_AGENT_ID)
+class LargeResultAgent(BaseA2AAgent):
+    """Returns an EC2 Eye sized result: instances records across regions."""
+
+    async def analyze(self, agent_id, skill_id, parameters, request_context, task_context):
+        instances = parameters.get("instances", 20000)
+        return {"status": "success", "regions": {
+            f"region-{r}": {"instance_count": instances // 10, "ami_data": [
+                {"instance_id": f"i-{r:02d}{n:08d}", "ami_id": f"ami-{n:08x}", "owner": "123456789012",
+                 "launch_time": "2024-01-01T00:00:00+00:00", "trusted": n % 3 != 0}
+                for n in range(instances // 10)
+            ]} for r in range(10)
+        }}
+
+
+def send_payload(agent_id: str, scan_seconds: float, blocking: bool):
+    return {
+        "jsonrpc": "2.0",
+        "method": "tasks/send",
+        "id": str(uuid.uuid4()),
+        "params": {
+            "blocking": blocking,
+            "task": {
+                "task_id": str(uuid.uuid4()),
+                "messages": [{"role": "user", "parts": [{"json": {
+                    "agent_id": agent_id,
+                    "skill_id": "analyze",
+                    "parameters": {"scan_seconds": scan_seconds}
+                }}]}]
+            }
+        }
+    }
+
+
+async def probe_card(client: httpx.AsyncClient, probes: int, interval: float):
+    """
+    Fetch the agent card probes times, one every interval seconds. Latency is
+    measured from when each request was due, so time spent waiting for a
+    blocked event loop is counted too.
+    """
+    latencies = []
+    start = time.perf_counter()
+    for n in range(probes):
+        due = start + n * interval
+        await asyncio.sleep(max(0.0, due - time.perf_counter()))
+        resp = await client.get("/.well-known/agent.json")
+        resp.raise_for_status()
+        latencies.append((time.perf_counter() - max(due, start)) * 1000)
+    latencies.sort()
+    return statistics.median(latencies), latencies[max(int(len(latencies) * 0.99) - 1, 0)]
+
+
+async def wait_for_tasks(client: httpx.AsyncClient, url: str, task_ids):
+    pending = list(task_ids)
+    while pending:
+        await asyncio.sleep(0.1)
+        polls = await asyncio.gather(*[client.post(url, json={
+            "jsonrpc": "2.0", "method": "tasks/get", "id": task_id, "params": {"task_id": task_id}
+        }) for task_id in pending])
+        pending = [task_id for task_id, p in zip(pending, polls)
+                   if p.json()["result"]["task"]["status"]["state"] not in ("completed", "failed")]
+
+
+async def run_background_benchmark(scans: int, scan_seconds: float, probes: int):
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None) as client:
+        url = f"/a2a/analyzer/{SLOW_AGENT_ID}"
+
+        start = time.perf_counter()
+        submitted = await asyncio.gather(*[
+            client.post(url, json=send_payload(SLOW_AGENT_ID, scan_seconds, blocking=False)) for _ in range(scans)
+        ])
+        submit_time = time.perf_counter() - start
+        task_ids = [r.json()["result"]["task"]["task_id"] for r in submitted]
+        states = {r.json()["result"]["task"]["status"]["state"] for r in submitted}
+
+        # While every scan is running, the card endpoint must stay responsive
+        # Spread the probes over the first half of the scans
+        p50, p99 = await probe_card(client, probes, interval=scan_seconds / (2 * probes))
+        await wait_for_tasks(client, url, task_ids)
+        total_time = time.perf_counter() - start
+
+    print(f"{scans} concurrent {scan_seconds:.1f}s scans submitted with blocking=false")
+    print(f"all submissions answered in {submit_time * 1000:.1f} ms (states: {', '.join(sorted(states))})")
+    print(f"agent card during scans: p50 {p50:.2f} ms, p99 {p99:.2f} ms over {probes} requests")
+    print(f"all scans completed after {total_time:.2f} s")
+
+
+async def run_blocking_benchmark(scans: int, scan_seconds: float, probes: int):
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None) as client:
+        idle = await probe_card(client, probes, interval=scan_seconds / probes)
+        rows = [("idle", idle)]
+        for label, agent_id in (("inline", INLINE_AGENT_ID), ("executor", BLOCKING_AGENT_ID)):
+            url = f"/a2a/analyzer/{agent_id}"
+            # Probe throughout the scans, starting before they are submitted
+            probes_task = asyncio.create_task(probe_card(client, probes, interval=scan_seconds / probes))
+            submitted = await asyncio.gather(*[
+                client.post(url, json=send_payload(agent_id, scan_seconds, blocking=False)) for _ in range(scans)
+            ])
+            rows.append((label, await probes_task))
+            await wait_for_tasks(client, url, [r.json()["result"]["task"]["task_id"] for r in submitted])
+
+    print(f"agent card latency while {scans} synchronous {scan_seconds:.1f}s scans run")
+    print(f"{'agent runs':<12}{'p50 (ms)':>10}{'p99 (ms)':>10}")
+    for label, (p50, p99) in rows:
+        print(f"{label:<12}{p50:>10.2f}{p99:>10.2f}")
+
+
+async def run_logging_benchmark(requests: int, instances: int):
+    # Every configuration writes synchronously to the same sink so only formatting cost differs
+    request_logging.stop_logging()
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+    sink = open(os.devnull, "w")
+    sink_handler = logging.StreamHandler(sink)
+    sink_handler.setFormatter(logging.Formatter(request_logging.LOG_FORMAT))
+    root.addHandler(sink_handler)
+    legacy_logger = logging.getLogger("bench.legacy")
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None) as client:
+        url = f"/a2a/analyzer/{LARGE_RESULT_AGENT_ID}"
+        rows = []
+        for label, level, legacy in (("pretty INFO (before)", logging.INFO, True),
+                                     ("structured INFO", logging.INFO, False),
+                                     ("structured DEBUG", logging.DEBUG, False)):
+            root.setLevel(level)
+            cpu = []
+            for _ in range(requests):
+                payload = send_payload(LARGE_RESULT_AGENT_ID, 0, blocking=True)
+                payload["params"]["task"]["messages"][0]["parts"][0]["json"]["parameters"] = {
+                    "instances": instances, "AWS Access Key": "AKIAEXAMPLE", "AWS Secret Key": "example-secret"
+                }
+                start = time.process_time()
+                resp = await client.post(url, json=payload)
+                elapsed = time.process_time() - start
+                if legacy:
+                    # What handle_agent_specific_request used to log for every request
+                    response_payload = resp.json()
+                    start = time.process_time()
+                    legacy_logger.info(f"Received A2A request payload: {json.dumps(payload, indent=2)}")
+                    legacy_logger.info(f"Sending response: {json.dumps(response_payload, indent=2)}")
+                    elapsed += time.process_time() - start
+                cpu.append(elapsed * 1000)
+            rows.append((label, statistics.median(cpu)))
+        result_bytes = len(resp.content)
+    sink.close()
+
+    print(f"per-request CPU for tasks/send returning a {result_bytes / 1e6:.1f} MB result ({requests} requests)")
+    print(f"{'logging':<24}{'CPU p50 (ms)':>14}")
+    for label, p50 in rows:
+        print(f"{label:<24}{p50:>14.1f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Load test the A2A server while long scans run")
+    subparsers = parser.add_subparsers(dest="benchmark", required=True)
+
+    background_parser = subparsers.add_parser("background", help="Non-blocking tasks/send with many long scans")
+    background_parser.add_argument("--scans", type=int, default=50)
+    background_parser.add_argument("--scan-seconds", type=float, default=5)
+    background_parser.add_argument("--probes", type=int, default=500)
+
+    blocking_parser = subparsers.add_parser("blocking", help="Synchronous agents inline vs on the agent executor")
+    blocking_parser.add_argument("--scans", type=int, default=10)
+    blocking_parser.add_argument("--scan-seconds", type=float, default=2)
+    blocking_parser.add_argument("--probes", type=int, default=200)
+
+    logging_parser = subparsers.add_parser("logging", help="Per-request CPU of request/response logging")
+    logging_parser.add_argument("--requests", type=int, default=20)
+    logging_parser.add_argument("--instances", type=int, default=20000)
+    args = parser.parse_args()
+
+    if args.benchmark == "logging":
+        asyncio.run(run_logging_benchmark(args.requests, args.instances))
+    elif args.benchmark == "background":
+        asyncio.run(run_background_benchmark(args.scans, args.scan_seconds, args.probes))
+    else:
+        asyncio.run(run_blocking_benchmark(args.scans, args.scan_seconds, args.probes))
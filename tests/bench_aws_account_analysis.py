@@ -0,0 +1,79 @@
+import argparse
+import json
+import os
+import sys
+import time
+
+import boto3
+from moto import mock_aws
+
+# Add the parent directory to the Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from agents.aws_account_analysis import AWSAccountAnalysisAgent
+from tests.fake_aws import count_api_calls
+
+REGIONS = ["us-east-1", "us-west-2", "eu-west-1", "ap-southeast-2"]
+VENDOR_ACCOUNT = "464622532012"
+UNKNOWN_ACCOUNT = "999988887777"
+
+
+def build_buckets(bucket_count: int):
+    """
+    Create bucket_count buckets spread over REGIONS; two out of three get a
+    policy granting access to an external account.
+    """
+    for i in range(bucket_count):
+        region = REGIONS[i % len(REGIONS)]
+        s3 = boto3.client("s3", region_name=region)
+        name = f"bench-bucket-{i:05d}"
+        if region == "us-east-1":
+            s3.create_bucket(Bucket=name)
+        else:
+            s3.create_bucket(Bucket=name, CreateBucketConfiguration={"LocationConstraint": region})
+        if i % 3:
+            principal = VENDOR_ACCOUNT if i % 3 == 1 else UNKNOWN_ACCOUNT
+            policy = {
+                "Version": "2012-10-17",
+                "Statement": [{
+                    "Effect": "Allow",
+                    "Principal": {"AWS": f"arn:aws:iam::{principal}:root"},
+                    "Action": "s3:GetObject",
+                    "Resource": f"arn:aws:s3:::{name}/*",
+                }],
+            }
+            s3.put_bucket_policy(Bucket=name, Policy=json.dumps(policy))
+
+
+def run_check(agent, session, known, concurrency: int, latency_ms: float):
+    with count_api_calls(latency_ms) as calls:
+        start = time.perf_counter()
+        res = agent.check_s3_buckets(session, known, {}, {}, concurrency)
+        elapsed = time.perf_counter() - start
+    return res, calls["GetBucketPolicy"], elapsed
+
+
+def run_benchmark(bucket_count: int, concurrency: int, latency_ms: float):
+    with mock_aws():
+        build_buckets(bucket_count)
+        session = boto3.Session(aws_access_key_id="testing", aws_secret_access_key="testing")
+        agent = AWSAccountAnalysisAgent()
+        known = {VENDOR_ACCOUNT: {"name": "Datadog", "type": "third-party", "source": []}}
+
+        serial, serial_calls, serial_time = run_check(agent, session, known, 1, latency_ms)
+        pooled, pooled_calls, pooled_time = run_check(agent, session, known, concurrency, latency_ms)
+
+    assert serial == pooled, "concurrent fetch must produce the same findings as the serial fetch"
+
+    print(f"Buckets: {bucket_count} across {len(REGIONS)} regions, simulated latency: {latency_ms} ms/call")
+    print(f"{'mode':<14}{'GetBucketPolicy calls':>23}{'wall time (s)':>16}")
+    print(f"{'serial':<14}{serial_calls:>23}{serial_time:>16.3f}")
+    print(f"{f'pool of {concurrency}':<14}{pooled_calls:>23}{pooled_time:>16.3f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark S3 bucket policy retrieval against moto")
+    parser.add_argument("--buckets", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=AWSAccountAnalysisAgent.S3_POLICY_CONCURRENCY)
+    parser.add_argument("--latency-ms", type=float, default=20.0)
+    args = parser.parse_args()
+    run_benchmark(args.buckets, args.concurrency, args.latency_ms)
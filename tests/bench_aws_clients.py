@@ -0,0 +1,72 @@
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+import boto3
+from moto import mock_aws
+
+# Add the parent directory to the Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from agents.aws_account_analysis import AWSAccountAnalysisAgent
+from aws_clients import CLIENT_FACTORY
+from aws_context import AWSTaskContext
+from tests.fake_aws import count_api_calls
+
+PARAMETERS = {
+    "AWS Access Key": "testing",
+    "AWS Secret Key": "testing",
+    "trusted_accounts_file": "does-not-exist.yaml",
+}
+
+
+def unpooled_context(cls, aws_access_key, aws_secret_key, default_region=None):
+    """Previous behaviour: a fresh boto3 session, and fresh clients, per task."""
+    return cls(boto3.Session(aws_access_key_id=aws_access_key, aws_secret_access_key=aws_secret_key),
+               default_region)
+
+
+def run_analyses(count: int):
+    agent_results = []
+    start = time.perf_counter()
+    for _ in range(count):
+        agent_results.append(asyncio.run(AWSAccountAnalysisAgent().analyze(
+            "aws_account_analysis-a2a", "analyze", PARAMETERS, {}, None)))
+    elapsed = time.perf_counter() - start
+    created = sum(r["metrics"]["aws_clients_created"] for r in agent_results)
+    return elapsed, created
+
+
+def run_benchmark(count: int):
+    # Keep the benchmark offline and focused on AWS client setup
+    AWSAccountAnalysisAgent.fetch_reference_data = lambda self: {}
+    with mock_aws():
+        s3 = boto3.client("s3", region_name="us-east-1")
+        s3.create_bucket(Bucket="bench-small-account")
+
+        original = AWSTaskContext.from_credentials
+        AWSTaskContext.from_credentials = classmethod(unpooled_context)
+        try:
+            with count_api_calls() as unpooled_calls:
+                unpooled_time, unpooled_created = run_analyses(count)
+        finally:
+            AWSTaskContext.from_credentials = original
+
+        CLIENT_FACTORY.clear()
+        with count_api_calls() as pooled_calls:
+            pooled_time, pooled_created = run_analyses(count)
+
+    print(f"{count} back-to-back account analyses of a small account")
+    print(f"{'mode':<10}{'clients created':>17}{'API calls':>11}{'total (s)':>11}{'per analysis (ms)':>19}")
+    print(f"{'unpooled':<10}{unpooled_created:>17}{sum(unpooled_calls.values()):>11}"
+          f"{unpooled_time:>11.3f}{unpooled_time / count * 1000:>19.2f}")
+    print(f"{'pooled':<10}{pooled_created:>17}{sum(pooled_calls.values()):>11}"
+          f"{pooled_time:>11.3f}{pooled_time / count * 1000:>19.2f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark pooled vs per-task boto3 clients")
+    parser.add_argument("--analyses", type=int, default=100)
+    args = parser.parse_args()
+    run_benchmark(args.analyses)
@@ -0,0 +1,212 @@
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+import boto3
+from botocore.exceptions import ClientError
+from moto import mock_aws
+
+# Add the parent directory to the Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from agents.aws_ec2_eye import AWSEc2EyeAgent
+from tests.fake_aws import FakeEC2, FakeSession, count_api_calls, make_instances
+
+REGION = "us-east-1"
+
+
+def build_fleet(ec2, ami_count: int, missing_count: int, unregistered_count: int):
+    """
+    Register ami_count AMIs, launch one instance from each, then deregister
+    missing_count of them so the scan sees AMIs that no longer exist.
+    unregistered_count IDs that never existed are spread through the list
+    too, so chunks hit InvalidAMIID.NotFound and take the split path.
+    """
+    ami_ids = []
+    for i in range(ami_count):
+        resp = ec2.register_image(
+            Name=f"bench-ami-{i}",
+            RootDeviceName="/dev/sda1",
+            BlockDeviceMappings=[{"DeviceName": "/dev/sda1", "Ebs": {"VolumeSize": 8}}],
+        )
+        ami_ids.append(resp["ImageId"])
+    for ami in ami_ids:
+        ec2.run_instances(ImageId=ami, MinCount=1, MaxCount=1, InstanceType="t3.micro")
+    for ami in ami_ids[:missing_count]:
+        ec2.deregister_image(ImageId=ami)
+    if unregistered_count:
+        step = max(1, len(ami_ids) // unregistered_count)
+        for i in range(unregistered_count):
+            ami_ids.insert(i * (step + 1), f"ami-{i:017x}")
+    return ami_ids
+
+
+class StrictImagesEC2:
+    """
+    moto client whose describe_images fails the whole request when any of the
+    given IDs does not exist, as EC2 does. moto only raises when none of them
+    exist, so mixed chunks would never reach the split path.
+    """
+
+    def __init__(self, ec2):
+        self.ec2 = ec2
+
+    def describe_images(self, ImageIds):
+        resp = self.ec2.describe_images(ImageIds=ImageIds)
+        found = {img["ImageId"] for img in resp.get("Images", [])}
+        missing = [ami for ami in ImageIds if ami not in found]
+        if missing:
+            raise ClientError({"Error": {"Code": "InvalidAMIID.NotFound",
+                                         "Message": f"The image ids '{missing}' do not exist"}},
+                              "DescribeImages")
+        return resp
+
+
+def resolve(agent: AWSEc2EyeAgent, ec2, ami_ids, latency_ms: float):
+    with count_api_calls(latency_ms) as calls:
+        start = time.perf_counter()
+        images = agent.describe_images_batched(ec2, ami_ids)
+        elapsed = time.perf_counter() - start
+    return images, calls["DescribeImages"], elapsed
+
+
+def run_benchmark(ami_count: int, missing_count: int, unregistered_count: int, latency_ms: float):
+    with mock_aws():
+        ec2 = boto3.client("ec2", region_name=REGION)
+        ami_ids = build_fleet(ec2, ami_count, missing_count, unregistered_count)
+        ec2 = StrictImagesEC2(ec2)
+
+        # One describe_images call per AMI reproduces the previous behaviour
+        per_ami = AWSEc2EyeAgent()
+        per_ami.IMAGE_BATCH_SIZE = 1
+        before_images, before_calls, before_time = resolve(per_ami, ec2, ami_ids, latency_ms)
+
+        batched = AWSEc2EyeAgent()
+        after_images, after_calls, after_time = resolve(batched, ec2, ami_ids, latency_ms)
+
+    assert before_images.keys() == after_images.keys(), "batched resolution must match per-AMI resolution"
+    # Calls beyond one per chunk were made by splitting chunks that hit InvalidAMIID.NotFound
+    chunks = -(-len(ami_ids) // batched.IMAGE_BATCH_SIZE)
+    split_calls = after_calls - chunks
+
+    print(f"AMIs: {len(ami_ids)} ({missing_count} deregistered, {unregistered_count} never registered), "
+          f"simulated latency: {latency_ms} ms/call")
+    print(f"{'mode':<10}{'DescribeImages calls':>22}{'wall time (s)':>16}")
+    print(f"{'per-AMI':<10}{before_calls:>22}{before_time:>16.3f}")
+    print(f"{'batched':<10}{after_calls:>22}{after_time:>16.3f}")
+    print(f"split path: {split_calls} of the batched calls ({chunks} chunks of up to {batched.IMAGE_BATCH_SIZE})")
+
+
+def run_pipeline_benchmark(region_counts, instances_per_region: int, amis_per_region: int):
+    """
+    Time full analyses over in-memory regions of growing count. With a linear
+    pipeline the cost per instance stays flat as regions are added; the old
+    cross-region re-walk of ami_to_instances made it grow with the region count.
+    """
+    print(f"{instances_per_region} instances and {amis_per_region} AMIs per region")
+    print(f"{'regions':>8}{'instances':>11}{'DescribeImages':>16}{'wall time (s)':>15}{'us/instance':>13}")
+    for region_count in region_counts:
+        regions = [f"region-{i:02d}" for i in range(region_count)]
+        clients = {}
+        for reg in regions:
+            amis = [f"ami-{reg}-{n:05d}" for n in range(amis_per_region)]
+            clients[reg] = FakeEC2(
+                reg,
+                instances=make_instances(reg, instances_per_region, amis),
+                images={ami: {"OwnerId": "999999999999", "Public": True} for ami in amis},
+            )
+        session = FakeSession(clients)
+        original_session = boto3.Session
+        boto3.Session = session
+        try:
+            start = time.perf_counter()
+            result = asyncio.run(AWSEc2EyeAgent().analyze(
+                "aws_ec2_eye-a2a", "analyze",
+                {"AWS Access Key": "AKIDEXAMPLE", "AWS Secret Key": "secret", "regions": regions},
+                {}, None))
+            elapsed = time.perf_counter() - start
+        finally:
+            boto3.Session = original_session
+        instances = result["total_instances"]
+        describe_calls = sum(clients[reg].calls["describe_images"] for reg in regions)
+        print(f"{region_count:>8}{instances:>11}{describe_calls:>16}{elapsed:>15.3f}{elapsed / instances * 1e6:>13.2f}")
+
+
+class DelayedEC2(FakeEC2):
+    """In-memory region whose instance listing takes delay seconds."""
+
+    def __init__(self, *args, delay: float = 0.0, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.delay = delay
+
+    def get_paginator(self, operation_name):
+        time.sleep(self.delay)
+        return super().get_paginator(operation_name)
+
+
+def run_stream_benchmark(region_count: int, max_delay: float):
+    """
+    Compare time to the first region artifact from analyze_stream with the
+    time analyze takes to return, for regions that finish one after another.
+    """
+    regions = [f"region-{i:02d}" for i in range(region_count)]
+    clients = {
+        reg: DelayedEC2(reg, instances=make_instances(reg, 100, [f"ami-{reg}"]),
+                        images={f"ami-{reg}": {"OwnerId": "999999999999", "Public": True}},
+                        delay=max_delay * (i + 1) / region_count)
+        for i, reg in enumerate(regions)
+    }
+    parameters = {"AWS Access Key": "AKIDEXAMPLE", "AWS Secret Key": "secret", "regions": regions,
+                  "max_region_concurrency": region_count}
+
+    async def stream():
+        start = time.perf_counter()
+        first = None
+        async for artifact in AWSEc2EyeAgent().analyze_stream("aws_ec2_eye-a2a", "analyze", parameters, {}, None):
+            if first is None:
+                first = (artifact["name"], time.perf_counter() - start)
+        return first, time.perf_counter() - start
+
+    original_session = boto3.Session
+    boto3.Session = FakeSession(clients)
+    try:
+        start = time.perf_counter()
+        asyncio.run(AWSEc2EyeAgent().analyze("aws_ec2_eye-a2a", "analyze", parameters, {}, None))
+        whole_scan = time.perf_counter() - start
+        (first_name, first_at), stream_total = asyncio.run(stream())
+    finally:
+        boto3.Session = original_session
+
+    print(f"{region_count} regions finishing between {max_delay / region_count:.2f} s and {max_delay:.2f} s")
+    print(f"{'delivery':<12}{'first result (s)':>18}{'complete (s)':>14}")
+    print(f"{'analyze':<12}{whole_scan:>18.3f}{whole_scan:>14.3f}")
+    print(f"{'stream':<12}{first_at:>18.3f}{stream_total:>14.3f}   first artifact: {first_name}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark EC2 Eye scanning")
+    subparsers = parser.add_subparsers(dest="benchmark", required=True)
+
+    images_parser = subparsers.add_parser("images", help="AMI resolution against a moto-backed fleet")
+    images_parser.add_argument("--amis", type=int, default=3000)
+    images_parser.add_argument("--missing", type=int, default=25)
+    images_parser.add_argument("--unregistered", type=int, default=25)
+    images_parser.add_argument("--latency-ms", type=float, default=0.0)
+
+    pipeline_parser = subparsers.add_parser("pipeline", help="Full multi-region scan over in-memory regions")
+    pipeline_parser.add_argument("--regions", type=int, nargs="+", default=[5, 10, 20])
+    pipeline_parser.add_argument("--instances", type=int, default=5000)
+    pipeline_parser.add_argument("--amis", type=int, default=1000)
+
+    stream_parser = subparsers.add_parser("stream", help="Time to first region artifact vs whole scan")
+    stream_parser.add_argument("--regions", type=int, default=16)
+    stream_parser.add_argument("--max-delay", type=float, default=2.0)
+
+    args = parser.parse_args()
+    if args.benchmark == "images":
+        run_benchmark(args.amis, args.missing, args.unregistered, args.latency_ms)
+    elif args.benchmark == "stream":
+        run_stream_benchmark(args.regions, args.max_delay)
+    else:
+        run_pipeline_benchmark(args.regions, args.instances, args.amis)
@@ -0,0 +1,61 @@
+import argparse
+import os
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+
+# Add the parent directory to the Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from serialization import OrjsonSerializer, StdlibSerializer, orjson
+
+
+def ec2_eye_result(target_bytes: int):
+    """An EC2 Eye style result with launch times as datetimes, grown to about target_bytes."""
+    launched = datetime(2024, 1, 1, tzinfo=timezone.utc)
+    regions = {}
+    n = 0
+    size = 0
+    while size < target_bytes:
+        region = f"region-{n % 17}"
+        entry = regions.setdefault(region, {"region": region, "instance_count": 0, "ami_data": []})
+        entry["ami_data"].append({
+            "instance_id": f"i-{n:017x}", "ami_id": f"ami-{n:017x}", "ami_name": f"amzn2-ami-hvm-2.0.{n}-x86_64-gp2",
+            "owner_id": "137112412989", "launch_time": launched + timedelta(minutes=n),
+            "state": "running", "trusted": n % 4 != 0, "tags": {"Name": f"web-{n}", "team": "platform"}
+        })
+        entry["instance_count"] += 1
+        size += 264
+        n += 1
+    return {"status": "success", "summary": {"instances": n, "regions": len(regions)}, "regions": regions}
+
+
+def throughput(fn, data, repeat: int):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn(data)
+    return repeat / (time.perf_counter() - start)
+
+
+def run_benchmark(megabytes: float, repeat: int):
+    result = ec2_eye_result(int(megabytes * 1024 * 1024))
+    serializers = [StdlibSerializer()] + ([OrjsonSerializer()] if orjson is not None else [])
+    encoded = serializers[0].dumps(result)
+    mb = len(encoded) / (1024 * 1024)
+
+    print(f"EC2 Eye result of {mb:.1f} MB, {result['summary']['instances']} instances, {repeat} runs")
+    print(f"{'backend':<10}{'encode (MB/s)':>15}{'decode (MB/s)':>15}{'encode (ms)':>13}{'decode (ms)':>13}")
+    for serializer in serializers:
+        encodes = throughput(serializer.dumps, result, repeat)
+        decodes = throughput(serializer.loads, encoded, repeat)
+        print(f"{serializer.name:<10}{encodes * mb:>15.1f}{decodes * mb:>15.1f}"
+              f"{1000 / encodes:>13.1f}{1000 / decodes:>13.1f}")
+    if orjson is None:
+        print("orjson is not installed; only the stdlib backend was measured")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark JSON backends on a large EC2 Eye result")
+    parser.add_argument("--megabytes", type=float, default=5)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+    run_benchmark(args.megabytes, args.repeat)
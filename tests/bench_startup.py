@@ -0,0 +1,67 @@
+import argparse
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+import httpx
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def time_to_first_response(lazy: bool, manifest_path: str) -> float:
+    """Seconds from launching the server process until the agent card is served."""
+    port = free_port()
+    env = dict(os.environ, A2A_LAZY_AGENTS="true" if lazy else "false", A2A_AGENT_MANIFEST=manifest_path,
+               A2A_LOG_LEVEL="WARNING")
+    start = time.perf_counter()
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "a2a_server:app", "--port", str(port), "--log-level", "warning"],
+        cwd=ROOT, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    try:
+        while True:
+            try:
+                if httpx.get(f"http://127.0.0.1:{port}/.well-known/agent.json", timeout=1).status_code == 200:
+                    return time.perf_counter() - start
+            except httpx.TransportError:
+                pass
+            if server.poll() is not None:
+                raise RuntimeError("server exited before answering")
+            time.sleep(0.005)
+    finally:
+        server.terminate()
+        server.wait()
+
+
+def run_benchmark(starts: int):
+    with tempfile.TemporaryDirectory() as directory:
+        manifest_path = os.path.join(directory, "agent_manifest.json")
+        # The first lazy start writes the manifest; later ones read it
+        first_lazy = time_to_first_response(True, manifest_path)
+        rows = []
+        for label, lazy in (("eager", False), ("lazy", True)):
+            times = [time_to_first_response(lazy, manifest_path) for _ in range(starts)]
+            rows.append((label, statistics.median(times), min(times)))
+
+    print(f"time to first agent card response over {starts} server starts")
+    print(f"{'agents':<26}{'p50 (ms)':>10}{'min (ms)':>10}")
+    for label, p50, best in rows:
+        print(f"{label:<26}{p50 * 1000:>10.0f}{best * 1000:>10.0f}")
+    print(f"{'lazy, writing manifest':<26}{first_lazy * 1000:>10.0f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark server cold start with eager vs lazy agent imports")
+    parser.add_argument("--starts", type=int, default=10)
+    args = parser.parse_args()
+    run_benchmark(args.starts)
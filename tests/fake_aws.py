@@ -0,0 +1,231 @@
+"""
+In-memory stand-ins for the boto3 clients used by the AWS agents, plus
+botocore call instrumentation. They record every call so tests and
+benchmarks can assert on API usage without network access.
+"""
+import json
+import time
+from collections import Counter
+from contextlib import contextmanager
+from typing import Any, Dict, List, Optional
+
+from botocore.client import BaseClient
+from botocore.exceptions import ClientError
+
+CALLER_ACCOUNT = "111111111111"
+
+
+@contextmanager
+def count_api_calls(latency_ms: float = 0.0):
+    """
+    Count every botocore API call made while the context is active.
+    An optional per-call latency models the network round trip moto skips.
+    """
+    calls = Counter()
+    original = BaseClient._make_api_call
+
+    def counting_call(self, operation_name, api_params):
+        calls[operation_name] += 1
+        if latency_ms:
+            time.sleep(latency_ms / 1000.0)
+        return original(self, operation_name, api_params)
+
+    BaseClient._make_api_call = counting_call
+    try:
+        yield calls
+    finally:
+        BaseClient._make_api_call = original
+
+
+class FakePaginator:
+    def __init__(self, pages: List[Dict[str, Any]]):
+        self.pages = pages
+
+    def paginate(self, **kwargs):
+        return iter(self.pages)
+
+
+class FakeEC2:
+    """
+    Regional EC2 client serving a fixed set of instances, images and snapshots.
+    """
+    def __init__(self, region: str, instances: List[Dict[str, Any]] = None,
+                 images: Dict[str, Dict[str, Any]] = None,
+                 snapshot_permissions: Dict[str, List[Dict[str, str]]] = None,
+                 allowed_settings: Optional[Dict[str, Any]] = None,
+                 page_size: int = 1000):
+        self.region = region
+        self.instances = instances or []
+        self.images = images or {}
+        self.snapshot_permissions = snapshot_permissions or {}
+        self.allowed_settings = allowed_settings
+        self.page_size = page_size
+        self.calls = Counter()
+        self.described_images: List[str] = []
+
+    def get_paginator(self, operation_name: str) -> FakePaginator:
+        self.calls[operation_name] += 1
+        pages = []
+        for i in range(0, len(self.instances), self.page_size):
+            pages.append({"Reservations": [{"Instances": self.instances[i:i + self.page_size]}]})
+        return FakePaginator(pages)
+
+    def get_allowed_images_settings(self) -> Dict[str, Any]:
+        self.calls["get_allowed_images_settings"] += 1
+        if self.allowed_settings is None:
+            raise ClientError({"Error": {"Code": "UnsupportedOperation"}}, "GetAllowedImagesSettings")
+        return self.allowed_settings
+
+    def describe_images(self, ImageIds: List[str]) -> Dict[str, Any]:
+        self.calls["describe_images"] += 1
+        self.described_images.extend(ImageIds)
+        missing = [ami for ami in ImageIds if ami not in self.images]
+        if missing:
+            raise ClientError(
+                {"Error": {"Code": "InvalidAMIID.NotFound",
+                           "Message": f"The image ids '{missing}' do not exist"}},
+                "DescribeImages")
+        return {"Images": [dict(self.images[ami], ImageId=ami) for ami in ImageIds]}
+
+    def describe_snapshot_attribute(self, SnapshotId: str, Attribute: str) -> Dict[str, Any]:
+        self.calls["describe_snapshot_attribute"] += 1
+        return {"SnapshotId": SnapshotId,
+                "CreateVolumePermissions": self.snapshot_permissions.get(SnapshotId, [])}
+
+    def describe_regions(self) -> Dict[str, Any]:
+        self.calls["describe_regions"] += 1
+        return {"Regions": []}
+
+
+class FakeSTS:
+    def __init__(self, account: str = CALLER_ACCOUNT):
+        self.account = account
+        self.calls = Counter()
+
+    def get_caller_identity(self) -> Dict[str, Any]:
+        self.calls["get_caller_identity"] += 1
+        return {"Account": self.account, "Arn": f"arn:aws:iam::{self.account}:user/test"}
+
+
+class FakeRolePoliciesPaginator:
+    def __init__(self, roles: Dict[str, Dict[str, Any]]):
+        self.roles = roles
+
+    def paginate(self, RoleName: str, **kwargs):
+        return iter([{"PolicyNames": [p["PolicyName"] for p in self.roles[RoleName].get("RolePolicyList", [])]}])
+
+
+class DeniedPaginator:
+    def __init__(self, operation_name: str):
+        self.operation_name = operation_name
+
+    def paginate(self, **kwargs):
+        raise ClientError({"Error": {"Code": "AccessDenied"}}, self.operation_name)
+
+
+class FakeIAM:
+    """
+    IAM client serving get_account_authorization_details pages, and the roles
+    in them through list_roles, list_role_policies and get_role_policy.
+    With deny_authorization_details the sweep fails with AccessDenied.
+    """
+    def __init__(self, pages: List[Dict[str, Any]] = None, aliases: List[str] = None,
+                 deny_authorization_details: bool = False):
+        self.pages = pages or []
+        self.aliases = aliases or []
+        self.deny_authorization_details = deny_authorization_details
+        self.calls = Counter()
+
+    def _roles(self) -> Dict[str, Dict[str, Any]]:
+        return {role["RoleName"]: role for page in self.pages for role in page.get("RoleDetailList", [])}
+
+    def get_paginator(self, operation_name: str, RoleName: str = None):
+        self.calls[operation_name] += 1
+        if operation_name == "get_account_authorization_details":
+            if self.deny_authorization_details:
+                return DeniedPaginator("GetAccountAuthorizationDetails")
+            return FakePaginator(self.pages)
+        if operation_name == "list_roles":
+            return FakePaginator([{"Roles": [
+                {"RoleName": name, "AssumeRolePolicyDocument": role.get("AssumeRolePolicyDocument")}
+                for name, role in self._roles().items()
+            ]}])
+        if operation_name == "list_role_policies":
+            return FakeRolePoliciesPaginator(self._roles())
+        raise ValueError(f"No fake paginator for {operation_name}")
+
+    def get_role_policy(self, RoleName: str, PolicyName: str) -> Dict[str, Any]:
+        self.calls["get_role_policy"] += 1
+        inline = {p["PolicyName"]: p for p in self._roles()[RoleName].get("RolePolicyList", [])}
+        return {"RoleName": RoleName, "PolicyName": PolicyName,
+                "PolicyDocument": inline[PolicyName]["PolicyDocument"]}
+
+    def list_account_aliases(self) -> Dict[str, Any]:
+        self.calls["list_account_aliases"] += 1
+        return {"AccountAliases": self.aliases}
+
+
+class FakeS3:
+    """
+    S3 client bound to one region over a shared bucket store. Policy reads for
+    buckets in another region are counted as redirects.
+    """
+    def __init__(self, region: Optional[str], buckets: Dict[str, Dict[str, Any]]):
+        self.region = region
+        self.buckets = buckets
+        self.calls = Counter()
+
+    def list_buckets(self) -> Dict[str, Any]:
+        self.calls["list_buckets"] += 1
+        return {"Buckets": [{"Name": name, "BucketRegion": bucket["region"]}
+                            for name, bucket in self.buckets.items()]}
+
+    def get_bucket_policy(self, Bucket: str) -> Dict[str, Any]:
+        self.calls["get_bucket_policy"] += 1
+        bucket = self.buckets[Bucket]
+        if bucket["region"] != (self.region or "us-east-1"):
+            self.calls["redirects"] += 1
+        if bucket.get("error"):
+            raise ClientError({"Error": {"Code": bucket["error"]}}, "GetBucketPolicy")
+        if bucket.get("policy") is None:
+            raise ClientError({"Error": {"Code": "NoSuchBucketPolicy"}}, "GetBucketPolicy")
+        return {"Policy": json.dumps(bucket["policy"])}
+
+
+class FakeSession:
+    """
+    Replacement for boto3.Session handing out the fake clients above.
+    """
+    def __init__(self, ec2_clients: Dict[str, FakeEC2] = None, sts: FakeSTS = None,
+                 buckets: Dict[str, Dict[str, Any]] = None, iam: FakeIAM = None):
+        self.ec2_clients = ec2_clients or {}
+        self.sts = sts or FakeSTS()
+        self.iam = iam or FakeIAM()
+        self.buckets = buckets or {}
+        self.s3_clients: Dict[Optional[str], FakeS3] = {}
+        self.clients_created = Counter()
+
+    def __call__(self, *args, **kwargs) -> "FakeSession":
+        # Allows the instance to be patched in place of the boto3.Session class
+        return self
+
+    def client(self, service_name: str, region_name: str = None, **kwargs):
+        self.clients_created[(service_name, region_name)] += 1
+        if service_name == "sts":
+            return self.sts
+        if service_name == "iam":
+            return self.iam
+        if service_name == "ec2":
+            return self.ec2_clients.setdefault(region_name, FakeEC2(region_name))
+        if service_name == "s3":
+            return self.s3_clients.setdefault(region_name, FakeS3(region_name, self.buckets))
+        raise ValueError(f"No fake client for service {service_name}")
+
+
+def make_instances(region: str, count: int, ami_ids: List[str]) -> List[Dict[str, Any]]:
+    """Build count instances spread round-robin over ami_ids."""
+    return [
+        {"InstanceId": f"i-{region}-{i:06d}", "ImageId": ami_ids[i % len(ami_ids)],
+         "Tags": [{"Key": "Name", "Value": f"{region}-{i}"}]}
+        for i in range(count)
+    ]
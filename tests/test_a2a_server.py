@@ -0,0 +1,474 @@
+import asyncio
+import json
+import os
+import sys
+import uuid
+
+import httpx
+
+# Add the parent directory to the Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from agent_registry import RESULT_ARTIFACT, BaseA2AAgent, register_agent
+import a2a_server
+import push_notifications
+
+AGENT_ID = "test-server-agent"
+URL = f"/a2a/analyzer/{AGENT_ID}"
+
+
+@register_agent(AGENT_ID)
+class StepAgent(BaseA2AAgent):
+    """Produces one artifact per step, sleeping between steps."""
+    runs = 0
+
+    async def analyze(self, agent_id, skill_id, parameters, request_context, task_context):
+        StepAgent.runs += 1
+        await asyncio.sleep(parameters.get("delay", 0))
+        return {"steps": parameters.get("steps", 1)}
+
+    async def analyze_stream(self, agent_id, skill_id, parameters, request_context, task_context):
+        for step in range(parameters.get("steps", 1)):
+            await asyncio.sleep(parameters.get("delay", 0))
+            yield {"name": f"step:{step}", "json": {"step": step}}
+        yield {"name": RESULT_ARTIFACT, "json": await self.analyze(agent_id, skill_id, parameters,
+                                                                  request_context, task_context)}
+
+
+def rpc(method, params, request_id=None):
+    return {"jsonrpc": "2.0", "method": method, "params": params, "id": request_id or str(uuid.uuid4())}
+
+
+def send_params(task_id, **parameters):
+    return {"task": {"task_id": task_id, "messages": [{"role": "user", "parts": [
+        {"json": {"agent_id": AGENT_ID, "skill_id": "analyze", "parameters": parameters}}
+    ]}]}}
+
+
+def run(scenario):
+    async def with_client():
+        transport = httpx.ASGITransport(app=a2a_server.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            return await scenario(client)
+    return asyncio.run(with_client())
+
+
+def test_non_blocking_send_then_get_and_cancel():
+    async def scenario(client):
+        params = dict(send_params("srv-task-1", steps=1, delay=0.05), blocking=False)
+        sent = (await client.post(URL, json=rpc("tasks/send", params))).json()
+        assert sent["result"]["task"]["status"]["state"] == "working"
+
+        await a2a_server.TASK_MANAGER.wait(a2a_server.TASK_MANAGER.get("srv-task-1"), timeout=5)
+        got = (await client.post(URL, json=rpc("tasks/get", {"task_id": "srv-task-1"}))).json()
+        assert got["result"]["task"]["status"]["state"] == "completed"
+        assert got["result"]["task"]["messages"][-1]["parts"][0]["json"] == {"steps": 1}
+
+        cancel = (await client.post(URL, json=rpc("tasks/cancel", {"task_id": "srv-task-1"}))).json()
+        assert cancel["error"]["code"] == -32002
+        missing = (await client.post(URL, json=rpc("tasks/get", {"task_id": "no-such-task"}))).json()
+        assert missing["error"]["code"] == -32001
+
+    run(scenario)
+
+
+def test_send_subscribe_streams_artifacts_then_the_final_status():
+    async def scenario(client):
+        payload = rpc("tasks/sendSubscribe", send_params("srv-task-2", steps=2), request_id="req-2")
+        events = []
+        async with client.stream("POST", URL, json=payload) as resp:
+            assert resp.headers["content-type"].startswith("text/event-stream")
+            async for line in resp.aiter_lines():
+                if line.startswith("data: "):
+                    events.append(json.loads(line[len("data: "):]))
+        return events
+
+    events = run(scenario)
+
+    assert {e["id"] for e in events} == {"req-2"}
+    results = [e["result"] for e in events]
+    assert [r["artifact"]["name"] if "artifact" in r else r["status"]["state"] for r in results] == \
+        ["working", "step:0", "step:1", RESULT_ARTIFACT, "completed"]
+    assert results[-1]["final"] is True
+
+
+def test_push_notification_config_is_validated_and_stored(monkeypatch):
+    monkeypatch.setattr(push_notifications, "DEFAULT_ALLOWED_HOSTS", frozenset({"127.0.0.1"}))
+
+    async def scenario(client):
+        await client.post(URL, json=rpc("tasks/send", send_params("srv-task-3")))
+        for url in ("ftp://example.com", "http://169.254.169.254/latest/meta-data/", "http://192.168.1.1/"):
+            bad = await client.post(URL, json=rpc("tasks/pushNotification/set", {
+                "task_id": "srv-task-3", "pushNotificationConfig": {"url": url}}))
+            assert bad.status_code == 400
+
+        config = {"url": "http://127.0.0.1:9/hook", "token": "t"}
+        a2a_server.PUSH_NOTIFIER.max_attempts = 1
+        stored = (await client.post(URL, json=rpc("tasks/pushNotification/set", {
+            "task_id": "srv-task-3", "pushNotificationConfig": config}))).json()
+        assert stored["result"]["pushNotificationConfig"] == config
+        # The task had already finished, so it is pushed right away
+        await asyncio.wait_for(a2a_server.PUSH_NOTIFIER.join(), timeout=5)
+        metrics = (await client.get("/a2a/metrics")).json()
+        await a2a_server.PUSH_NOTIFIER.close()
+        assert metrics["push_notifications"]["queued"] >= 1
+        assert metrics["tasks"]["running"] == 0
+
+        got = (await client.post(URL, json=rpc("tasks/pushNotification/get", {"task_id": "srv-task-3"}))).json()
+        assert got["result"]["pushNotificationConfig"] == config
+
+    run(scenario)
+
+
+def test_coalesced_requests_keep_their_own_webhooks(monkeypatch):
+    monkeypatch.setattr(push_notifications, "DEFAULT_ALLOWED_HOSTS", frozenset({"127.0.0.1"}))
+    pushed = []
+    monkeypatch.setattr(a2a_server.PUSH_NOTIFIER, "notify", lambda config, payload: pushed.append((config, payload)))
+
+    async def scenario(client):
+        async def send(task_id, port):
+            params = dict(send_params(task_id, steps=1, delay=0.1, hooks=True), idempotent=True,
+                          pushNotification={"url": f"http://127.0.0.1:{port}/hook"})
+            return await client.post(URL, json=rpc("tasks/send", params))
+
+        runs_before = StepAgent.runs
+        await asyncio.gather(send("srv-hook-1", 9001), send("srv-hook-2", 9002))
+        assert StepAgent.runs - runs_before == 1
+        first = await client.post(URL, json=rpc("tasks/pushNotification/get", {"task_id": "srv-hook-1"}))
+        return first.json()["result"]["pushNotificationConfig"]
+
+    first_config = run(scenario)
+
+    assert first_config == {"url": "http://127.0.0.1:9001/hook"}
+    assert sorted((config["url"], payload["task_id"]) for config, payload in pushed) == [
+        ("http://127.0.0.1:9001/hook", "srv-hook-1"), ("http://127.0.0.1:9002/hook", "srv-hook-2")]
+
+
+def test_retrieved_tasks_never_contain_secrets():
+    secret = "wJalrXUtnFEMI/K7MDENG"
+
+    async def scenario(client):
+        params = send_params("srv-secret-1", steps=1, **{"AWS Access Key": "AKIDEXAMPLE", "AWS Secret Key": secret})
+        sent = await client.post(URL, json=rpc("tasks/send", params))
+        got = await client.post(URL, json=rpc("tasks/get", {"task_id": "srv-secret-1"}))
+        params = send_params("srv-secret-2", steps=1, **{"AWS Secret Key": secret})
+        async with client.stream("POST", URL, json=rpc("tasks/sendSubscribe", params)) as streamed:
+            events = [line async for line in streamed.aiter_lines()]
+        return sent.text, got, "\n".join(events)
+
+    sent, got, events = run(scenario)
+
+    parameters = got.json()["result"]["task"]["messages"][0]["parts"][0]["json"]["parameters"]
+    assert parameters["AWS Secret Key"] == "***" and parameters["steps"] == 1
+    for text in (sent, got.text, events):
+        assert secret not in text and "AKIDEXAMPLE" not in text
+
+
+def test_default_analysis_results_never_contain_secrets():
+    url = "/a2a/analyzer/test-unregistered-agent"
+
+    async def scenario(client):
+        params = send_params("srv-secret-3", **{"AWS Access Key": "AKIAREAL", "AWS Secret Key": "REALSECRET"})
+        params["task"]["messages"][0]["parts"][0]["json"]["agent_id"] = "test-unregistered-agent"
+        sent = await client.post(url, json=rpc("tasks/send", params))
+        got = await client.post(url, json=rpc("tasks/get", {"task_id": "srv-secret-3"}))
+        return sent, got
+
+    sent, got = run(scenario)
+
+    result = got.json()["result"]["task"]["messages"][-1]["parts"][0]["json"]
+    assert result["parameters_received"]["AWS Secret Key"] == "***"
+    for response in (sent, got):
+        assert "AKIAREAL" not in response.text and "REALSECRET" not in response.text
+
+
+def test_push_notifications_carry_no_request_messages(monkeypatch):
+    monkeypatch.setattr(push_notifications, "DEFAULT_ALLOWED_HOSTS", frozenset({"127.0.0.1"}))
+    pushed = []
+    monkeypatch.setattr(a2a_server.PUSH_NOTIFIER, "notify", lambda config, payload: pushed.append(payload))
+
+    async def scenario(client):
+        params = dict(send_params("srv-push-1", steps=1, **{"AWS Secret Key": "wJalrXUtnFEMI"}),
+                      pushNotification={"url": "http://127.0.0.1:9/hook"})
+        await client.post(URL, json=rpc("tasks/send", params))
+
+    run(scenario)
+
+    assert len(pushed) == 1
+    assert set(pushed[0]) == {"task_id", "status", "artifacts"}
+    assert pushed[0]["artifacts"][0]["name"] == RESULT_ARTIFACT
+    assert "wJalrXUtnFEMI" not in json.dumps(pushed[0])
+
+
+def test_retried_and_idempotent_sends_reuse_the_first_execution():
+    async def scenario(client):
+        runs_before = StepAgent.runs
+        params = send_params("srv-task-4", steps=4, delay=0.05)
+        first, retry = await asyncio.gather(
+            client.post(URL, json=rpc("tasks/send", params)),
+            client.post(URL, json=rpc("tasks/send", params)),
+        )
+        late_retry = await client.post(URL, json=rpc("tasks/send", params))
+        renamed = await client.post(URL, json=rpc("tasks/send", dict(
+            send_params("srv-task-5", steps=4, delay=0.05), idempotent=True)))
+        conflict = await client.post(URL, json=rpc("tasks/send", send_params("srv-task-4", steps=5)))
+        metrics = (await client.get("/a2a/metrics")).json()
+
+        tasks = [r.json()["result"]["task"] for r in (first, retry, late_retry, renamed)]
+        assert [t["task_id"] for t in tasks] == ["srv-task-4"] * 3 + ["srv-task-5"]
+        assert all(t["status"]["state"] == "completed" for t in tasks)
+        # The renamed request's own task_id refers to the shared execution
+        got = (await client.post(URL, json=rpc("tasks/get", {"task_id": "srv-task-5"}))).json()
+        assert got["result"]["task"]["task_id"] == "srv-task-5"
+        assert StepAgent.runs - runs_before == 1
+        assert conflict.status_code == 400
+        assert metrics["tasks"]["coalesced_by_task_id"] >= 2
+        assert metrics["tasks"]["coalesced_by_fingerprint"] >= 1
+
+    run(scenario)
+
+
+def test_identical_analyses_under_different_task_ids_run_once():
+    async def scenario(client):
+        runs_before = StepAgent.runs
+        responses = await asyncio.gather(*[
+            client.post(URL, json=rpc("tasks/send", send_params(f"srv-flight-{n}", steps=6, delay=0.05)))
+            for n in range(3)
+        ])
+        tasks = [r.json()["result"]["task"] for r in responses]
+        assert [t["task_id"] for t in tasks] == ["srv-flight-0", "srv-flight-1", "srv-flight-2"]
+        assert all(t["messages"][-1]["parts"][0]["json"] == {"steps": 6} for t in tasks)
+        assert StepAgent.runs - runs_before == 1
+        assert (await client.get("/a2a/metrics")).json()["single_flight"]["coalesced"] >= 2
+
+    run(scenario)
+
+
+@register_agent("test-cached-agent", result_ttl=60)
+class CachedAgent(BaseA2AAgent):
+    """Counts analyses so cache hits are visible."""
+    runs = 0
+
+    async def analyze(self, agent_id, skill_id, parameters, request_context, task_context):
+        CachedAgent.runs += 1
+        if parameters.get("partial"):
+            return {"run": CachedAgent.runs, "region_errors": {"eu-west-1": "RequestLimitExceeded"}}
+        return {"run": CachedAgent.runs}
+
+
+def test_repeated_analyses_are_served_from_the_result_cache():
+    async def scenario(client):
+        url = "/a2a/analyzer/test-cached-agent"
+
+        async def send(task_id, secret_key, bypass=False):
+            body = send_params(task_id, secret_key=secret_key)
+            body["task"]["messages"][0]["parts"][0]["json"]["agent_id"] = "test-cached-agent"
+            body["bypassCache"] = bypass
+            task = (await client.post(url, json=rpc("tasks/send", body))).json()["result"]["task"]
+            return task["messages"][-1]["parts"][0]["json"]
+
+        first = await send("srv-cache-1", secret_key="a")
+        assert await send("srv-cache-2", secret_key="a") == first
+        # Different credentials never share a cached result
+        assert await send("srv-cache-3", secret_key="b") != first
+        # bypassCache runs the analysis again and refreshes the entry
+        fresh = await send("srv-cache-4", secret_key="a", bypass=True)
+        assert fresh != first
+        assert await send("srv-cache-5", secret_key="a") == fresh
+
+        metrics = (await client.get("/a2a/metrics")).json()["result_cache"]
+        assert metrics["hits"] >= 2
+        assert metrics["bypasses"] >= 1
+        assert CachedAgent.runs == 3
+
+    run(scenario)
+
+
+def test_partially_failed_analyses_are_not_cached():
+    async def scenario(client):
+        url = "/a2a/analyzer/test-cached-agent"
+
+        async def send(task_id):
+            body = send_params(task_id, secret_key="partial", partial=True)
+            body["task"]["messages"][0]["parts"][0]["json"]["agent_id"] = "test-cached-agent"
+            task = (await client.post(url, json=rpc("tasks/send", body))).json()["result"]["task"]
+            return task["messages"][-1]["parts"][0]["json"]
+
+        first = await send("srv-partial-1")
+        assert first["region_errors"]
+        # The failed regions are scanned again instead of served from the cache
+        assert await send("srv-partial-2") != first
+
+    run(scenario)
+
+
+def test_cards_are_served_with_etags_and_conditional_get():
+    async def scenario(client):
+        for path in ("/.well-known/agent.json", "/.well-known/agent-cards"):
+            first = await client.get(path)
+            assert first.status_code == 200
+            etag = first.headers["etag"]
+            assert first.headers["cache-control"].startswith("public, max-age=")
+
+            again = await client.get(path, headers={"If-None-Match": etag})
+            assert again.status_code == 304 and again.content == b""
+            assert again.headers["etag"] == etag
+            stale = await client.get(path, headers={"If-None-Match": '"stale", W/"other"'})
+            assert stale.status_code == 200 and stale.json() == first.json()
+
+        card_name = first.json()["agent_cards"][0]
+        card = await client.get(f"/.well-known/agent-cards/{card_name}")
+        assert card.json() == a2a_server.CARD_INDEX.cards[card_name]
+        assert (await client.get(f"/.well-known/agent-cards/{card_name}",
+                                 headers={"If-None-Match": f'W/{card.headers["etag"]}'})).status_code == 304
+        assert (await client.get("/.well-known/agent-cards/missing.json")).status_code == 404
+
+    run(scenario)
+
+
+def test_changed_cards_are_served_after_a_reload(tmp_path, monkeypatch):
+    for name, card in a2a_server.CARD_INDEX.cards.items():
+        (tmp_path / name).write_text(json.dumps(card))
+    monkeypatch.setattr(a2a_server, "AGENT_CARDS_DIR", str(tmp_path))
+    monkeypatch.setattr(a2a_server, "CARD_INDEX", a2a_server.CARD_INDEX)
+
+    async def scenario(client):
+        before = await client.get("/.well-known/agent.json")
+        assert a2a_server.load_agent_cards()
+        assert not a2a_server.load_agent_cards()
+        unchanged = await client.get("/.well-known/agent.json")
+        assert unchanged.headers["etag"] == before.headers["etag"]
+
+        (tmp_path / "new_agent.json").write_text(json.dumps({
+            "name": "New Agent", "agent_ids": ["new-agent"], "skills": [{"id": "analyze", "name": "Analyze"}]
+        }))
+        assert a2a_server.load_agent_cards()
+        after = await client.get("/.well-known/agent.json", headers={"If-None-Match": before.headers["etag"]})
+        assert after.status_code == 200
+        assert "New - Analyze" in [skill["name"] for skill in after.json()["skills"]]
+        assert "new_agent.json" in (await client.get("/.well-known/agent-cards")).json()["agent_cards"]
+
+    run(scenario)
+
+
+@register_agent("test-singleton-agent", singleton=True)
+class SingletonAgent(BaseA2AAgent):
+    """Reports which instance served the analysis."""
+    startups = 0
+
+    async def startup(self):
+        SingletonAgent.startups += 1
+
+    async def analyze(self, agent_id, skill_id, parameters, request_context, task_context):
+        return {"instance": id(self)}
+
+
+def test_singleton_agents_serve_every_analysis_from_one_instance():
+    async def scenario(client):
+        url = "/a2a/analyzer/test-singleton-agent"
+
+        async def send(task_id):
+            # Distinct parameters, so the analyses are not coalesced
+            body = send_params(task_id, n=task_id)
+            body["task"]["messages"][0]["parts"][0]["json"]["agent_id"] = "test-singleton-agent"
+            task = (await client.post(url, json=rpc("tasks/send", body))).json()["result"]["task"]
+            return task["messages"][-1]["parts"][0]["json"]["instance"]
+
+        instances = await asyncio.gather(*[send(f"srv-singleton-{n}") for n in range(3)])
+        assert len(set(instances)) == 1
+        assert SingletonAgent.startups == 1
+        pool = (await client.get("/a2a/metrics")).json()["agent_pools"]["test-singleton-agent/analyze"]
+        assert pool["mode"] == "singleton" and pool["leases"] >= 3 and pool["in_use"] == 0
+
+    run(scenario)
+
+
+@register_agent("test-limited-agent", max_concurrency=1)
+class LimitedAgent(BaseA2AAgent):
+    """Holds its run slot for delay seconds."""
+
+    async def analyze(self, agent_id, skill_id, parameters, request_context, task_context):
+        await asyncio.sleep(parameters.get("delay", 0))
+        return {"n": parameters.get("n")}
+
+
+def test_tasks_beyond_the_agent_limit_queue_then_get_a_busy_error(monkeypatch):
+    monkeypatch.setattr(a2a_server, "SCHEDULER", a2a_server.TaskScheduler(max_running=10, max_queued=1))
+
+    async def scenario(client):
+        url = "/a2a/analyzer/test-limited-agent"
+
+        async def send(task_id, n):
+            body = dict(send_params(task_id, n=n, delay=0.1), blocking=False)
+            body["task"]["messages"][0]["parts"][0]["json"]["agent_id"] = "test-limited-agent"
+            return await client.post(url, json=rpc("tasks/send", body))
+
+        first = (await send("srv-limit-1", 1)).json()["result"]["task"]
+        second = (await send("srv-limit-2", 2)).json()["result"]["task"]
+        assert first["status"]["state"] == "working"
+        assert second["status"]["state"] == "submitted"
+
+        busy = await send("srv-limit-3", 3)
+        assert busy.status_code == 503 and busy.headers["retry-after"] == "1"
+        assert busy.json()["error"]["code"] == -32003
+        assert a2a_server.TASK_MANAGER.get("srv-limit-3") is None
+
+        metrics = (await client.get("/a2a/metrics")).json()["scheduler"]
+        assert metrics["agents"]["test-limited-agent"] == {"running": 1, "queued": 1}
+        assert metrics["rejected"] == 1
+
+        await a2a_server.TASK_MANAGER.wait(a2a_server.TASK_MANAGER.get("srv-limit-2"), timeout=5)
+        assert (await client.get("/a2a/metrics")).json()["scheduler"]["running"] == 0
+
+    run(scenario)
+
+
+def test_tasks_are_scheduled_per_tenant_and_priority(monkeypatch):
+    monkeypatch.setattr(a2a_server, "SCHEDULER", a2a_server.TaskScheduler(max_running=10, max_queued=10))
+
+    async def scenario(client):
+        body = dict(send_params("srv-tenant-1", steps=1), priority="interactive")
+        body["task"]["messages"][0]["parts"][0]["json"]["context"] = {"workflow_id": "wf-7", "node_id": "n1"}
+        sent = (await client.post(URL, json=rpc("tasks/send", body))).json()
+        assert sent["result"]["task"]["status"]["state"] == "completed"
+
+        tenants = (await client.get("/a2a/metrics")).json()["scheduler"]["tenants"]
+        assert tenants["wf-7"]["started"] == 1 and tenants["wf-7"]["running"] == 0
+
+        invalid = await client.post(URL, json=rpc("tasks/send", dict(send_params("srv-tenant-2"), priority="urgent")))
+        assert invalid.status_code == 400 and invalid.json()["error"]["code"] == -32600
+        assert a2a_server.TASK_MANAGER.get("srv-tenant-2") is None
+
+    run(scenario)
+
+
+def test_cache_hits_and_identical_analyses_take_no_extra_run_slot(monkeypatch):
+    monkeypatch.setattr(a2a_server, "SCHEDULER", a2a_server.TaskScheduler(max_running=1, max_queued=10))
+
+    async def scenario(client):
+        async def send(agent_id, task_id, blocking=False, **parameters):
+            body = dict(send_params(task_id, **parameters), blocking=blocking)
+            body["task"]["messages"][0]["parts"][0]["json"]["agent_id"] = agent_id
+            response = await client.post(f"/a2a/analyzer/{agent_id}", json=rpc("tasks/send", body))
+            return response.json()["result"]["task"]
+
+        cached = await send("test-cached-agent", "srv-share-c1", blocking=True, secret_key="share")
+        runs_before = CachedAgent.runs
+
+        a1 = await send("test-limited-agent", "srv-share-a1", n=1, delay=0.3)
+        a2 = await send("test-limited-agent", "srv-share-a2", n=1, delay=0.3)
+        b1 = await send("test-limited-agent", "srv-share-b1", n=2, delay=0.01)
+        assert [t["status"]["state"] for t in (a1, a2, b1)] == ["working", "working", "submitted"]
+        metrics = (await client.get("/a2a/metrics")).json()["scheduler"]
+        assert metrics["running"] == 1 and metrics["queue_depth"] == 1 and metrics["shared"] == 1
+
+        # The only slot is taken, yet the cached result is served right away
+        again = await asyncio.wait_for(
+            send("test-cached-agent", "srv-share-c2", blocking=True, secret_key="share"), timeout=0.2)
+        assert again["messages"][-1]["parts"][0]["json"] == cached["messages"][-1]["parts"][0]["json"]
+        assert CachedAgent.runs == runs_before
+
+        await a2a_server.TASK_MANAGER.wait(a2a_server.TASK_MANAGER.get("srv-share-b1"), timeout=5)
+        assert (await client.get("/a2a/metrics")).json()["scheduler"]["running"] == 0
+
+    run(scenario)
+
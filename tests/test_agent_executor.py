@@ -0,0 +1,90 @@
+import asyncio
+import os
+import sys
+import threading
+import time
+
+import pytest
+
+# Add the parent directory to the Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from agent_executor import AgentExecutor
+from agent_registry import BaseA2AAgent, get_agent_options, register_agent
+
+
+@register_agent("test-blocking-agent", blocking=True, max_workers=2)
+class BlockingAgent(BaseA2AAgent):
+    async def analyze(self, agent_id, skill_id, parameters, request_context, task_context):
+        time.sleep(parameters["seconds"])
+        return {"thread": threading.current_thread().name}
+
+
+def test_blocking_options_are_recorded_at_registration():
+    assert get_agent_options("test-blocking-agent") == {"blocking": True, "max_workers": 2, "result_ttl": None,
+                                                        "singleton": False, "pool_size": None, "max_concurrency": None}
+    assert get_agent_options("not-registered") == {"blocking": False, "max_workers": None, "result_ttl": None,
+                                                   "singleton": False, "pool_size": None, "max_concurrency": None}
+
+
+def test_blocking_agents_leave_the_event_loop_free():
+    async def scenario():
+        executor = AgentExecutor()
+        agent = BlockingAgent()
+        ticks = 0
+
+        async def heartbeat():
+            nonlocal ticks
+            while True:
+                await asyncio.sleep(0.01)
+                ticks += 1
+
+        beat = asyncio.create_task(heartbeat())
+        start = time.perf_counter()
+        results = await asyncio.gather(*[
+            executor.run("test-blocking-agent", "analyze",
+                         lambda: agent.analyze("test-blocking-agent", "analyze", {"seconds": 0.2}, {}, None),
+                         max_workers=2)
+            for _ in range(4)
+        ])
+        elapsed = time.perf_counter() - start
+        beat.cancel()
+        executor.shutdown()
+
+        # Two workers run four 0.2 s scans in two waves while the loop keeps ticking
+        assert 0.35 < elapsed < 1.0
+        assert ticks >= 20
+        assert {r["thread"].split("_")[0] for r in results} == {"agent-test-blocking-agent"}
+        assert executor.stats == {"submitted": 4, "running": 0, "completed": 4, "failed": 0}
+
+    asyncio.run(scenario())
+
+
+@register_agent("test-streaming-agent", blocking=True)
+class StreamingAgent(BaseA2AAgent):
+    async def analyze(self, agent_id, skill_id, parameters, request_context, task_context):
+        return {}
+
+    async def analyze_stream(self, agent_id, skill_id, parameters, request_context, task_context):
+        for n in range(3):
+            time.sleep(0.05)
+            yield {"name": f"part-{n}", "json": {"n": n}}
+        raise RuntimeError("scan failed")
+
+
+def test_streamed_items_arrive_while_the_worker_runs():
+    async def scenario():
+        executor = AgentExecutor()
+        agent = StreamingAgent()
+        received = []
+        with pytest.raises(RuntimeError, match="scan failed"):
+            async for item in executor.stream(
+                    "test-streaming-agent", "analyze",
+                    lambda: agent.analyze_stream("test-streaming-agent", "analyze", {}, {}, None)):
+                received.append((item["name"], executor.stats["running"]))
+        executor.shutdown()
+        # Items are delivered while the agent is still producing the rest
+        assert [name for name, _ in received] == ["part-0", "part-1", "part-2"]
+        assert received[0] == ("part-0", 1)
+        assert executor.stats["failed"] == 1
+
+    asyncio.run(scenario())
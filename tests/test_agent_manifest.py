@@ -0,0 +1,102 @@
+import asyncio
+import os
+import subprocess
+import sys
+import textwrap
+
+# Add the parent directory to the Python path
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(ROOT)
+import agent_registry
+from agent_registry import build_manifest, get_agent, import_agent, read_manifest, write_manifest
+
+LAZY_LOAD = textwrap.dedent("""
+    import sys
+    import agent_registry
+    agent_registry.load_agents(lazy=True, manifest_path=sys.argv[1])
+    print("agents.aws_ec2_eye" in sys.modules, "aws_ec2_eye-a2a" in agent_registry.known_agent_ids())
+    print(agent_registry.get_agent_options("aws_ec2_eye-a2a")["blocking"], "agents.aws_ec2_eye" in sys.modules)
+""")
+
+
+def lazy_load(manifest_path):
+    result = subprocess.run([sys.executable, "-c", LAZY_LOAD, manifest_path], cwd=ROOT,
+                            capture_output=True, text=True, check=True)
+    return result.stdout.split()
+
+
+def test_agents_are_imported_on_first_use_once_the_manifest_exists(tmp_path):
+    manifest_path = str(tmp_path / "agent_manifest.json")
+    # The first start imports every agent and writes the manifest
+    assert lazy_load(manifest_path) == ["True", "True", "True", "True"]
+    assert os.path.exists(manifest_path)
+    # Later starts only import an agent when it is first used
+    assert lazy_load(manifest_path) == ["False", "True", "True", "True"]
+
+
+def test_manifest_is_invalidated_when_an_agent_module_changes(tmp_path):
+    package = tmp_path / "manifest_test_agents"
+    package.mkdir()
+    (package / "__init__.py").write_text("")
+    module = package / "greeter.py"
+    module.write_text(textwrap.dedent("""
+        from agent_registry import BaseA2AAgent, register_agent
+
+        @register_agent("manifest-test-greeter", skill_id="greet")
+        class Greeter(BaseA2AAgent):
+            async def analyze(self, agent_id, skill_id, parameters, request_context, task_context):
+                return {"greeting": "hello"}
+    """))
+    sys.path.insert(0, str(tmp_path))
+    try:
+        manifest = build_manifest("manifest_test_agents")
+    finally:
+        sys.path.remove(str(tmp_path))
+    assert manifest["agents"] == {"manifest-test-greeter": {"greet": "manifest_test_agents.greeter"}}
+
+    manifest_path = str(tmp_path / "manifest.json")
+    write_manifest(manifest, manifest_path)
+    assert read_manifest([str(package)], manifest_path) == manifest
+    module.write_text(module.read_text() + "\n# changed\n")
+    assert read_manifest([str(package)], manifest_path) is None
+
+
+def test_first_use_imports_the_agent_off_the_event_loop(tmp_path, monkeypatch):
+    package = tmp_path / "threaded_import_agents"
+    package.mkdir()
+    (package / "__init__.py").write_text("")
+    (package / "slow.py").write_text(textwrap.dedent("""
+        import threading
+        import time
+        from agent_registry import BaseA2AAgent, register_agent
+
+        IMPORTED_ON = threading.current_thread().name
+        time.sleep(0.2)
+
+        @register_agent("threaded-import-agent")
+        class Slow(BaseA2AAgent):
+            async def analyze(self, agent_id, skill_id, parameters, request_context, task_context):
+                return {}
+    """))
+    monkeypatch.syspath_prepend(str(tmp_path))
+    monkeypatch.setitem(agent_registry._agent_manifest, "threaded-import-agent",
+                        {"analyze": "threaded_import_agents.slow"})
+
+    async def scenario():
+        ticks = 0
+
+        async def ticker():
+            nonlocal ticks
+            while True:
+                await asyncio.sleep(0.01)
+                ticks += 1
+
+        ticking = asyncio.create_task(ticker())
+        await asyncio.gather(import_agent("threaded-import-agent"), import_agent("threaded-import-agent"))
+        ticking.cancel()
+        return ticks
+
+    # The event loop kept running while the module imported
+    assert asyncio.run(scenario()) >= 5
+    assert sys.modules["threaded_import_agents.slow"].IMPORTED_ON != "MainThread"
+    assert get_agent("threaded-import-agent").__name__ == "Slow"
@@ -0,0 +1,115 @@
+import asyncio
+import os
+import sys
+
+import pytest
+
+# Add the parent directory to the Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from agent_registry import AgentPool, BaseA2AAgent
+
+
+class LifecycleAgent(BaseA2AAgent):
+    """Records startup and shutdown calls; startup fails while fail_startups > 0."""
+    started = 0
+    stopped = 0
+    fail_startups = 0
+
+    async def startup(self):
+        await asyncio.sleep(0.01)
+        if LifecycleAgent.fail_startups:
+            LifecycleAgent.fail_startups -= 1
+            raise RuntimeError("startup failed")
+        LifecycleAgent.started += 1
+
+    async def shutdown(self):
+        LifecycleAgent.stopped += 1
+
+    async def analyze(self, agent_id, skill_id, parameters, request_context, task_context):
+        return {}
+
+
+def reset():
+    LifecycleAgent.started = LifecycleAgent.stopped = LifecycleAgent.fail_startups = 0
+
+
+async def use(pool, seconds=0.02):
+    async with pool.lease() as agent:
+        await asyncio.sleep(seconds)
+        return agent
+
+
+def test_singleton_is_started_once_and_shared():
+    reset()
+
+    async def scenario():
+        pool = AgentPool(LifecycleAgent, shared=True)
+        agents = await asyncio.gather(*[use(pool) for _ in range(5)])
+        assert len({id(agent) for agent in agents}) == 1
+        assert pool.metrics()["peak_in_use"] == 5
+        await pool.close()
+
+    asyncio.run(scenario())
+    assert (LifecycleAgent.started, LifecycleAgent.stopped) == (1, 1)
+
+
+def test_pool_leases_each_instance_to_one_caller_at_a_time():
+    reset()
+
+    async def scenario():
+        pool = AgentPool(LifecycleAgent, size=2)
+        agents = await asyncio.gather(*[use(pool) for _ in range(6)])
+        assert len({id(agent) for agent in agents}) == 2
+        metrics = pool.metrics()
+        assert metrics["peak_in_use"] == 2 and metrics["waits"] >= 4
+        assert metrics["in_use"] == 0 and metrics["waiting"] == 0 and metrics["instances"] == 2
+        await pool.close()
+
+    asyncio.run(scenario())
+    assert (LifecycleAgent.started, LifecycleAgent.stopped) == (2, 2)
+
+
+def test_per_request_instances_are_started_and_shut_down_around_each_lease():
+    reset()
+
+    async def scenario():
+        pool = AgentPool(LifecycleAgent)
+        await asyncio.gather(*[use(pool) for _ in range(3)])
+        assert pool.metrics()["mode"] == "per_request"
+
+    asyncio.run(scenario())
+    assert (LifecycleAgent.started, LifecycleAgent.stopped) == (3, 3)
+
+
+def test_failed_startup_is_retried_by_the_next_caller():
+    reset()
+    LifecycleAgent.fail_startups = 1
+
+    async def scenario():
+        pool = AgentPool(LifecycleAgent, shared=True)
+        results = await asyncio.gather(use(pool), use(pool), return_exceptions=True)
+        assert isinstance(results[0], RuntimeError)
+        assert isinstance(results[1], LifecycleAgent)
+        assert pool.metrics()["startup_failures"] == 1
+
+    asyncio.run(scenario())
+    assert LifecycleAgent.started == 1
+
+
+def test_cancelled_waiter_does_not_lose_the_returned_instance():
+    reset()
+
+    async def scenario():
+        pool = AgentPool(LifecycleAgent, size=1)
+        holder = asyncio.create_task(use(pool, 0.05))
+        await asyncio.sleep(0.02)
+        cancelled = asyncio.create_task(use(pool))
+        waiting = asyncio.create_task(use(pool))
+        await asyncio.sleep(0)
+        cancelled.cancel()
+        await holder
+        await asyncio.wait_for(waiting, timeout=1)
+        with pytest.raises(asyncio.CancelledError):
+            await cancelled
+
+    asyncio.run(scenario())
@@ -0,0 +1,190 @@
+import asyncio
+import json
+import os
+import sys
+from urllib.parse import quote
+
+import boto3
+
+# Add the parent directory to the Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from agents.aws_account_analysis import AWSAccountAnalysisAgent
+from aws_clients import CLIENT_FACTORY
+from aws_context import AWSTaskContext
+from tests.fake_aws import CALLER_ACCOUNT, FakeIAM, FakeSession
+
+VENDOR_ACCOUNT = "464622532012"
+UNKNOWN_ACCOUNT = "999988887777"
+
+
+def bucket_policy(account: str):
+    return {"Statement": [{"Effect": "Allow", "Principal": {"AWS": f"arn:aws:iam::{account}:root"},
+                           "Action": "s3:GetObject", "Resource": "*"}]}
+
+
+def test_bucket_policies_are_fetched_from_the_bucket_region():
+    buckets = {
+        f"bucket-{i:03d}": {
+            "region": ["us-east-1", "eu-west-1", "ap-southeast-2"][i % 3],
+            "policy": bucket_policy(VENDOR_ACCOUNT if i % 2 else UNKNOWN_ACCOUNT) if i % 5 else None,
+        }
+        for i in range(60)
+    }
+    session = FakeSession(buckets=buckets)
+    known = {VENDOR_ACCOUNT: {"name": "Datadog", "type": "third-party", "source": []}}
+
+    aws = AWSTaskContext(session)
+    res = AWSAccountAnalysisAgent().check_s3_buckets(aws, known, {}, {}, max_concurrency=8)
+
+    expected_vendor = [name for i, name in enumerate(buckets) if i % 5 and i % 2]
+    expected_unknown = [name for i, name in enumerate(buckets) if i % 5 and not i % 2]
+    assert res["known_vendors"] == {"Datadog": expected_vendor}
+    assert res["unknown_accounts"] == {f"{UNKNOWN_ACCOUNT} ({UNKNOWN_ACCOUNT})": expected_unknown}
+    assert sum(client.calls["get_bucket_policy"] for client in session.s3_clients.values()) == 60
+    assert sum(client.calls["redirects"] for client in session.s3_clients.values()) == 0
+    # One default client for list_buckets plus one per bucket region
+    assert aws.clients_created == 4
+
+
+def test_unreadable_bucket_policies_are_reported_as_check_errors():
+    buckets = {
+        "open": {"region": "us-east-1", "policy": bucket_policy(UNKNOWN_ACCOUNT)},
+        "no-policy": {"region": "us-east-1", "policy": None},
+        "denied": {"region": "us-east-1", "policy": bucket_policy(UNKNOWN_ACCOUNT), "error": "AccessDenied"},
+    }
+    res = AWSAccountAnalysisAgent().check_s3_buckets(
+        AWSTaskContext(FakeSession(buckets=buckets)), {}, {}, {}, max_concurrency=2)
+
+    assert res["unknown_accounts"] == {f"{UNKNOWN_ACCOUNT} ({UNKNOWN_ACCOUNT})": ["open"]}
+    # A missing policy is not a failure; a denied read is
+    assert list(res["errors"]) == ["denied"]
+    assert "AccessDenied" in res["errors"]["denied"]
+
+
+def trust_policy(account: str, external_id: bool = False):
+    statement = {"Effect": "Allow", "Principal": {"AWS": f"arn:aws:iam::{account}:root"},
+                 "Action": "sts:AssumeRole"}
+    if external_id:
+        statement["Condition"] = {"StringEquals": {"sts:ExternalId": "secret"}}
+    return {"Statement": [statement]}
+
+
+def test_iam_roles_are_checked_from_one_authorization_details_sweep():
+    admin_arn = f"arn:aws:iam::{CALLER_ACCOUNT}:policy/Admin"
+    pages = [
+        {"RoleDetailList": [
+            {"RoleName": "vendor-role", "AssumeRolePolicyDocument": trust_policy(VENDOR_ACCOUNT),
+             "AttachedManagedPolicies": [{"PolicyName": "Admin", "PolicyArn": admin_arn}],
+             "RolePolicyList": []},
+        ]},
+        {"RoleDetailList": [
+            # Raw URL-encoded documents are decoded as well
+            {"RoleName": "unknown-role",
+             "AssumeRolePolicyDocument": quote(json.dumps(trust_policy(UNKNOWN_ACCOUNT, external_id=True))),
+             "RolePolicyList": [{"PolicyName": "inline", "PolicyDocument": {"Statement": []}}]},
+         ],
+         "Policies": [{"PolicyName": "Admin", "Arn": admin_arn, "PolicyVersionList": [
+             {"VersionId": "v1", "IsDefaultVersion": False, "Document": {"Statement": ["old"]}},
+             {"VersionId": "v2", "IsDefaultVersion": True, "Document": {"Statement": ["current"]}},
+         ]}]},
+    ]
+    session = FakeSession(iam=FakeIAM(pages))
+    aws = AWSTaskContext(session)
+    agent = AWSAccountAnalysisAgent()
+    known = {VENDOR_ACCOUNT: {"name": "Datadog", "type": "third-party", "source": []}}
+
+    res = agent.check_iam_roles(aws, known, {}, {})
+    snapshot = agent.iam_snapshot(aws)
+
+    assert session.iam.calls == {"get_account_authorization_details": 1}
+    assert res["known_vendors"] == {"Datadog": ["vendor-role"]}
+    assert res["vulnerable_roles"] == {"Datadog": ["vendor-role"]}
+    assert res["unknown_accounts"] == {f"{UNKNOWN_ACCOUNT} ({UNKNOWN_ACCOUNT})": ["unknown-role"]}
+    assert snapshot.role_policies("vendor-role") == {admin_arn: {"Statement": ["current"]}}
+    assert snapshot.role_policies("unknown-role") == {"inline": {"Statement": []}}
+    assert snapshot.attachments[admin_arn] == [{"type": "role", "name": "vendor-role"}]
+
+
+def test_iam_roles_fall_back_to_list_roles_without_authorization_details_access():
+    pages = [{"RoleDetailList": [
+        {"RoleName": "vendor-role", "AssumeRolePolicyDocument": trust_policy(VENDOR_ACCOUNT),
+         "RolePolicyList": [{"PolicyName": "inline", "PolicyDocument": {"Statement": []}}]},
+        {"RoleName": "unknown-role",
+         "AssumeRolePolicyDocument": quote(json.dumps(trust_policy(UNKNOWN_ACCOUNT, external_id=True)))},
+    ]}]
+    session = FakeSession(iam=FakeIAM(pages, deny_authorization_details=True))
+    aws = AWSTaskContext(session)
+    agent = AWSAccountAnalysisAgent()
+    known = {VENDOR_ACCOUNT: {"name": "Datadog", "type": "third-party", "source": []}}
+
+    res = agent.check_iam_roles(aws, known, {}, {})
+
+    assert res["vulnerable_roles"] == {"Datadog": ["vendor-role"]}
+    assert res["unknown_accounts"] == {f"{UNKNOWN_ACCOUNT} ({UNKNOWN_ACCOUNT})": ["unknown-role"]}
+    assert agent.iam_snapshot(aws).role_policies("vendor-role") == {"inline": {"Statement": []}}
+    assert session.iam.calls["list_roles"] == 1
+    assert session.iam.calls["get_role_policy"] == 1
+
+
+def test_analysis_creates_each_client_once_and_memoizes_account_lookups(monkeypatch, tmp_path):
+    session = FakeSession(iam=FakeIAM([], aliases=["prod"]))
+    monkeypatch.setattr(boto3, "Session", session)
+    monkeypatch.setattr(AWSAccountAnalysisAgent, "fetch_reference_data", lambda self: {})
+    CLIENT_FACTORY.clear()
+    parameters = {"AWS Access Key": "AKIDEXAMPLE", "AWS Secret Key": "secret",
+                  "trusted_accounts_file": str(tmp_path / "none.yaml")}
+
+    def run():
+        return asyncio.run(AWSAccountAnalysisAgent().analyze(
+            "aws_account_analysis-a2a", "analyze", parameters, {}, None))
+
+    first = run()
+    assert session.clients_created == {("sts", None): 1, ("iam", None): 1, ("s3", None): 1}
+    assert first["metrics"]["aws_clients_created"] == 3
+    assert session.sts.calls["get_caller_identity"] == 1
+    assert session.iam.calls["list_account_aliases"] == 1
+
+    # A later task with the same credentials reuses the pooled clients
+    second = run()
+    assert sum(session.clients_created.values()) == 3
+    assert second["metrics"]["aws_clients_created"] == 0
+    assert second["metrics"]["aws_clients_reused"] == 3
+
+
+def test_trusted_accounts_cache_metric_describes_only_this_analysis(monkeypatch, tmp_path):
+    session = FakeSession(iam=FakeIAM([], aliases=["prod"]))
+    monkeypatch.setattr(boto3, "Session", session)
+    monkeypatch.setattr(AWSAccountAnalysisAgent, "fetch_reference_data", lambda self: {})
+    CLIENT_FACTORY.clear()
+    trusted_file = tmp_path / "trusted.yaml"
+    trusted_file.write_text("- name: Security\n  accounts: [123456789012]\n")
+    parameters = {"AWS Access Key": "AKIDEXAMPLE", "AWS Secret Key": "secret",
+                  "trusted_accounts_file": str(trusted_file)}
+
+    def run():
+        return asyncio.run(AWSAccountAnalysisAgent().analyze(
+            "aws_account_analysis-a2a", "analyze", parameters, {}, None))["metrics"]
+
+    first, second = run(), run()
+    assert first["trusted_accounts_cache_hit"] is False
+    assert second["trusted_accounts_cache_hit"] is True
+    assert "trusted_accounts_cache_hits" not in second
+
+
+def test_iam_findings_are_streamed_before_the_s3_checks(monkeypatch, tmp_path):
+    session = FakeSession(iam=FakeIAM([], aliases=["prod"]))
+    monkeypatch.setattr(boto3, "Session", session)
+    monkeypatch.setattr(AWSAccountAnalysisAgent, "fetch_reference_data", lambda self: {})
+    CLIENT_FACTORY.clear()
+    parameters = {"AWS Access Key": "AKIDEXAMPLE", "AWS Secret Key": "secret",
+                  "trusted_accounts_file": str(tmp_path / "none.yaml")}
+
+    async def collect():
+        names = []
+        async for artifact in AWSAccountAnalysisAgent().analyze_stream(
+                "aws_account_analysis-a2a", "analyze", parameters, {}, None):
+            # S3 has not been touched when the IAM findings arrive
+            names.append((artifact["name"], ("s3", None) in session.clients_created))
+        return names
+
+    assert asyncio.run(collect()) == [("iam", False), ("result", True)]
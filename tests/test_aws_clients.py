@@ -0,0 +1,56 @@
+import os
+import sys
+
+import boto3
+from botocore.config import Config
+
+# Add the parent directory to the Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from aws_clients import ClientFactory, credential_fingerprint
+from tests.fake_aws import FakeSession
+
+
+def test_clients_are_pooled_per_credentials_service_region_and_config(monkeypatch):
+    session = FakeSession()
+    monkeypatch.setattr(boto3, "Session", session)
+    factory = ClientFactory()
+
+    first, created = factory.get_client("AKID1", "secret", "ec2", "us-east-1")
+    assert created
+    assert factory.get_client("AKID1", "secret", "ec2", "us-east-1") == (first, False)
+
+    assert factory.get_client("AKID2", "secret", "ec2", "us-east-1")[1]
+    assert factory.get_client("AKID1", "secret", "ec2", "eu-west-1")[1]
+    assert factory.get_client("AKID1", "secret", "ec2", "us-east-1", Config(max_pool_connections=64))[1]
+    assert factory.stats["clients_created"] == 4
+    assert factory.stats["clients_reused"] == 1
+
+
+def test_least_recently_used_clients_are_evicted(monkeypatch):
+    monkeypatch.setattr(boto3, "Session", FakeSession())
+    factory = ClientFactory(max_clients=2)
+
+    factory.get_client("AKID", "secret", "ec2", "us-east-1")
+    factory.get_client("AKID", "secret", "ec2", "us-west-2")
+    factory.get_client("AKID", "secret", "ec2", "us-east-1")
+    factory.get_client("AKID", "secret", "ec2", "eu-west-1")
+
+    assert factory.stats["evictions"] == 1
+    assert factory.get_client("AKID", "secret", "ec2", "us-east-1")[1] is False
+    assert factory.get_client("AKID", "secret", "ec2", "us-west-2")[1] is True
+
+
+def test_idle_clients_expire(monkeypatch):
+    monkeypatch.setattr(boto3, "Session", FakeSession())
+    factory = ClientFactory(idle_ttl=0)
+
+    factory.get_client("AKID", "secret", "ec2", "us-east-1")
+    assert factory.get_client("AKID", "secret", "ec2", "us-east-1")[1] is True
+    assert factory.stats["evictions"] == 1
+
+
+def test_fingerprints_do_not_expose_secrets():
+    fingerprint = credential_fingerprint("AKIDEXAMPLE", "secret-key")
+    assert "secret-key" not in fingerprint
+    assert fingerprint == credential_fingerprint("AKIDEXAMPLE", "secret-key")
+    assert fingerprint != credential_fingerprint("AKIDEXAMPLE", "other-secret")
@@ -0,0 +1,242 @@
+import asyncio
+import os
+import time
+import sys
+
+import boto3
+from botocore.exceptions import ClientError
+
+# Add the parent directory to the Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from agents.aws_ec2_eye import AWSEc2EyeAgent, SnapshotPermissionResolver
+from aws_clients import CLIENT_FACTORY
+from tests.fake_aws import FakeEC2, FakeSession, make_instances
+
+PARAMETERS = {
+    "AWS Access Key": "AKIDEXAMPLE",
+    "AWS Secret Key": "secret",
+    "trusted_accounts": ["222222222222"],
+}
+
+
+def run_analysis(monkeypatch, session: FakeSession, **parameters):
+    monkeypatch.setattr(boto3, "Session", session)
+    CLIENT_FACTORY.clear()
+    agent = AWSEc2EyeAgent()
+    return asyncio.run(agent.analyze("aws_ec2_eye-a2a", "analyze", dict(PARAMETERS, **parameters), {}, None))
+
+
+def test_amis_are_classified_with_the_region_they_were_seen_in(monkeypatch):
+    """
+    An AMI first seen in a later region must be resolved with that region's
+    client and allowed-images settings, not the first region's.
+    """
+    east = FakeEC2(
+        "us-east-1",
+        instances=make_instances("us-east-1", 3, ["ami-east"]),
+        images={"ami-east": {"OwnerId": "333333333333", "Public": True}},
+        allowed_settings={"State": "disabled"},
+    )
+    west = FakeEC2(
+        "us-west-2",
+        instances=make_instances("us-west-2", 2, ["ami-west"]),
+        images={"ami-west": {"OwnerId": "444444444444", "Public": False}},
+        allowed_settings={"State": "enabled", "ImageCriteria": [{"ImageProviders": ["444444444444"]}]},
+    )
+    session = FakeSession({"us-east-1": east, "us-west-2": west})
+
+    result = run_analysis(monkeypatch, session, regions=["us-east-1", "us-west-2"])
+
+    assert result["ami_data"]["allowed"] == {
+        "ami-west": {"alias": "", "owner": "444444444444", "public": False,
+                     "vendor": "Unknown", "region": "us-west-2"}
+    }
+    assert result["ami_data"]["unknown_unverified"]["ami-east"]["region"] == "us-east-1"
+    assert east.described_images == ["ami-east"]
+    assert west.described_images == ["ami-west"]
+    assert result["total_instances"] == 5
+    assert result["total_amis"] == 2
+
+
+def test_each_ami_is_resolved_once_across_many_regions(monkeypatch):
+    regions = [f"region-{i}" for i in range(20)]
+    clients = {}
+    for reg in regions:
+        amis = [f"ami-{reg}-{n}" for n in range(10)]
+        clients[reg] = FakeEC2(
+            reg,
+            instances=make_instances(reg, 50, amis),
+            images={ami: {"OwnerId": "111111111111"} for ami in amis},
+        )
+    session = FakeSession(clients)
+
+    result = run_analysis(monkeypatch, session, regions=regions)
+
+    assert result["metrics"]["selfhosted_AMIs_count"] == 200
+    assert result["total_instances"] == 1000
+    for reg in regions:
+        assert len(clients[reg].described_images) == 10
+        assert clients[reg].calls["describe_images"] == 1
+
+
+def test_missing_amis_only_drop_their_own_metadata(monkeypatch):
+    amis = [f"ami-{n}" for n in range(10)]
+    ec2 = FakeEC2(
+        "us-east-1",
+        instances=make_instances("us-east-1", 10, amis),
+        images={ami: {"ImageOwnerAlias": "amazon", "Public": True} for ami in amis[1:]},
+    )
+    session = FakeSession({"us-east-1": ec2})
+
+    result = run_analysis(monkeypatch, session, regions=["us-east-1"])
+
+    assert set(result["ami_data"]["verified"]) == set(amis[1:])
+    assert result["ami_data"]["private_shared"]["ami-0"]["owner"] == ""
+
+
+class DeniedImagesEC2(FakeEC2):
+    def describe_images(self, ImageIds):
+        self.calls["describe_images"] += 1
+        raise ClientError({"Error": {"Code": "UnauthorizedOperation"}}, "DescribeImages")
+
+
+def test_unresolvable_image_batches_fail_the_region_instead_of_misclassifying(monkeypatch):
+    amis = [f"ami-{n}" for n in range(10)]
+    denied = DeniedImagesEC2("us-east-1", instances=make_instances("us-east-1", 10, amis))
+    ok = FakeEC2("us-west-2", instances=make_instances("us-west-2", 2, ["ami-west"]),
+                 images={"ami-west": {"ImageOwnerAlias": "amazon"}})
+    session = FakeSession({"us-east-1": denied, "us-west-2": ok})
+
+    result = run_analysis(monkeypatch, session, regions=["us-east-1", "us-west-2"])
+
+    assert "UnauthorizedOperation" in result["region_errors"]["us-east-1"]
+    assert result["ami_data"]["private_shared"] == {}
+    assert list(result["ami_data"]["verified"]) == ["ami-west"]
+    # Not split: the error is not about missing IDs
+    assert denied.calls["describe_images"] == 1
+
+
+class FailingEC2(FakeEC2):
+    def get_paginator(self, operation_name):
+        raise RuntimeError("endpoint unreachable")
+
+
+class SlowEC2(FakeEC2):
+    def get_paginator(self, operation_name):
+        time.sleep(0.5)
+        return super().get_paginator(operation_name)
+
+
+def test_failed_and_slow_regions_are_reported_without_failing_the_scan(monkeypatch):
+    healthy = FakeEC2(
+        "us-east-1",
+        instances=make_instances("us-east-1", 2, ["ami-ok"]),
+        images={"ami-ok": {"ImageOwnerAlias": "amazon"}},
+    )
+    session = FakeSession({
+        "us-east-1": healthy,
+        "eu-west-1": FailingEC2("eu-west-1"),
+        "ap-south-1": SlowEC2("ap-south-1"),
+    })
+
+    result = run_analysis(monkeypatch, session, regions=["us-east-1", "eu-west-1", "ap-south-1"],
+                          max_region_concurrency=3, region_timeout=0.1)
+
+    assert list(result["ami_data"]["verified"]) == ["ami-ok"]
+    assert result["region_errors"]["eu-west-1"] == "endpoint unreachable"
+    assert "timed out" in result["region_errors"]["ap-south-1"]
+    assert result["metrics"]["regions_scanned"] == 1
+    assert result["metrics"]["regions_failed"] == 2
+
+
+class HungEC2(FakeEC2):
+    def get_paginator(self, operation_name):
+        time.sleep(1.0)
+        return super().get_paginator(operation_name)
+
+
+def test_a_hung_region_does_not_use_up_the_timeout_of_queued_regions(monkeypatch):
+    healthy = FakeEC2(
+        "us-east-1",
+        instances=make_instances("us-east-1", 1, ["ami-ok"]),
+        images={"ami-ok": {"ImageOwnerAlias": "amazon"}},
+    )
+    session = FakeSession({"eu-west-1": HungEC2("eu-west-1"), "us-east-1": healthy})
+
+    result = run_analysis(monkeypatch, session, regions=["eu-west-1", "us-east-1"],
+                          max_region_concurrency=1, region_timeout=0.3)
+
+    assert "timed out" in result["region_errors"]["eu-west-1"]
+    assert "us-east-1" not in result["region_errors"]
+    assert list(result["ami_data"]["verified"]) == ["ami-ok"]
+
+
+class ThrottlingEC2(FakeEC2):
+    def __init__(self, *args, throttle_first: int = 0, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.throttle_remaining = throttle_first
+
+    def describe_snapshot_attribute(self, SnapshotId, Attribute):
+        if self.throttle_remaining > 0:
+            self.throttle_remaining -= 1
+            self.calls["throttled"] += 1
+            raise ClientError({"Error": {"Code": "RequestLimitExceeded"}}, "DescribeSnapshotAttribute")
+        return super().describe_snapshot_attribute(SnapshotId, Attribute)
+
+
+def test_shared_snapshots_are_checked_once_and_throttling_is_retried(monkeypatch):
+    monkeypatch.setattr(SnapshotPermissionResolver, "BASE_BACKOFF", 0.001)
+    amis = [f"ami-{n}" for n in range(4)]
+    shared_device = {"DeviceName": "/dev/sda1", "Ebs": {"SnapshotId": "snap-shared"}}
+    images = {ami: {"OwnerId": "555555555555", "Public": False,
+                    "BlockDeviceMappings": [shared_device,
+                                            {"DeviceName": "/dev/sdb", "Ebs": {"SnapshotId": f"snap-{ami}"}}]}
+              for ami in amis}
+    ec2 = ThrottlingEC2(
+        "us-east-1",
+        instances=make_instances("us-east-1", 8, amis),
+        images=images,
+        snapshot_permissions={"snap-shared": [{"Group": "all"}, {"UserId": "666666666666"}]},
+        throttle_first=2,
+    )
+    session = FakeSession({"us-east-1": ec2})
+
+    result = run_analysis(monkeypatch, session, regions=["us-east-1"])
+
+    lineage = result["snapshot_lineage"]["ami-0"]
+    assert lineage[0] == {"snapshot_id": "snap-shared", "public": True, "shared_with": ["666666666666"]}
+    assert lineage[1] == {"snapshot_id": "snap-ami-0", "public": False, "shared_with": []}
+    assert ec2.calls["describe_snapshot_attribute"] == 5
+    assert result["metrics"]["snapshot_permission_calls_saved"] == 3
+    assert result["metrics"]["snapshot_permission_throttles"] == 2
+
+
+def test_region_artifacts_are_streamed_as_regions_finish(monkeypatch):
+    fast = FakeEC2(
+        "us-east-1",
+        instances=make_instances("us-east-1", 2, ["ami-ok"]),
+        images={"ami-ok": {"ImageOwnerAlias": "amazon"}},
+    )
+    session = FakeSession({"us-east-1": fast, "ap-south-1": SlowEC2("ap-south-1")})
+    monkeypatch.setattr(boto3, "Session", session)
+    CLIENT_FACTORY.clear()
+    parameters = dict(PARAMETERS, regions=["ap-south-1", "us-east-1"])
+
+    async def collect():
+        start = time.perf_counter()
+        artifacts = []
+        async for artifact in AWSEc2EyeAgent().analyze_stream("aws_ec2_eye-a2a", "analyze", parameters, {}, None):
+            artifacts.append((artifact, time.perf_counter() - start))
+        return artifacts
+
+    artifacts = asyncio.run(collect())
+
+    assert [a["name"] for a, _ in artifacts] == ["region:us-east-1", "region:ap-south-1", "result"]
+    first, first_at = artifacts[0]
+    assert first["json"] == {"region": "us-east-1", "instance_count": 2,
+                             "ami_data": {**{c: {} for c in AWSEc2EyeAgent.AMI_CATEGORIES},
+                                          "verified": first["json"]["ami_data"]["verified"]}}
+    assert "ami-ok" in first["json"]["ami_data"]["verified"]
+    # The fast region is delivered without waiting for the slow one
+    assert first_at < 0.4 <= artifacts[1][1]
+    assert artifacts[-1][0]["json"]["total_instances"] == 2
@@ -0,0 +1,61 @@
+import json
+import os
+import sys
+
+# Add the parent directory to the Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from card_index import load_card_index
+
+
+def write_card(directory, name, agent_ids, skill="analyze", mtime_ns=None):
+    path = directory / name
+    path.write_text(json.dumps({"name": f"{name} Agent", "agent_ids": agent_ids,
+                                "skills": [{"id": skill, "name": skill}]}))
+    if mtime_ns is not None:
+        os.utime(path, ns=(mtime_ns, mtime_ns))
+    return path
+
+
+def test_only_changed_cards_are_reparsed(tmp_path):
+    write_card(tmp_path, "a.json", ["agent-a"], mtime_ns=1_000_000_000)
+    write_card(tmp_path, "b.json", ["agent-b"], mtime_ns=1_000_000_000)
+    first = load_card_index(str(tmp_path))
+    assert first.agent_to_card == {"agent-a": "a.json", "agent-b": "b.json"}
+    assert load_card_index(str(tmp_path), first) is first
+
+    write_card(tmp_path, "b.json", ["agent-b", "agent-c"], skill="scan", mtime_ns=2_000_000_000)
+    second = load_card_index(str(tmp_path), first)
+    assert second is not first
+    assert second.cards["a.json"] is first.cards["a.json"]
+    assert second.agent_to_card["agent-c"] == "b.json"
+    assert second.aggregated.etag != first.aggregated.etag
+    assert second.documents["a.json"].etag == first.documents["a.json"].etag
+    # The previous index is untouched
+    assert "agent-c" not in first.agent_to_card
+
+
+def test_unparseable_card_keeps_its_previous_version(tmp_path):
+    write_card(tmp_path, "a.json", ["agent-a"], mtime_ns=1_000_000_000)
+    first = load_card_index(str(tmp_path))
+
+    (tmp_path / "a.json").write_text('{"name": "half written')
+    (tmp_path / "new.json").write_text("{")
+    second = load_card_index(str(tmp_path), first)
+    assert dict(second.cards) == dict(first.cards)
+
+    write_card(tmp_path, "a.json", ["agent-a2"])
+    (tmp_path / "new.json").unlink()
+    assert load_card_index(str(tmp_path), second).agent_to_card == {"agent-a2": "a.json"}
+
+
+def test_removed_cards_disappear(tmp_path):
+    write_card(tmp_path, "a.json", ["agent-a"])
+    path = write_card(tmp_path, "b.json", ["agent-b"])
+    first = load_card_index(str(tmp_path))
+    path.unlink()
+    second = load_card_index(str(tmp_path), first)
+    assert list(second.cards) == ["a.json"]
+    assert "b.json" not in second.documents
+
+    (tmp_path / "a.json").unlink()
+    assert load_card_index(str(tmp_path), second).aggregated is None
@@ -0,0 +1,141 @@
+import asyncio
+import json
+import os
+import sys
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+# Add the parent directory to the Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from push_notifications import PushNotifier, accept_push_config, validate_push_config
+from task_manager import TaskManager
+
+
+class ReceiverHandler(BaseHTTPRequestHandler):
+    """Local stand-in for an orchestrator webhook; fails the first `failures` posts."""
+    failures = 0
+    failure_status = 503
+    received = []
+
+    def do_POST(self):
+        body = self.rfile.read(int(self.headers["Content-Length"]))
+        if ReceiverHandler.failures > 0:
+            ReceiverHandler.failures -= 1
+            self.send_response(self.failure_status)
+            self.end_headers()
+            return
+        self.received.append({"authorization": self.headers.get("Authorization"), "body": json.loads(body)})
+        self.send_response(200)
+        self.end_headers()
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture
+def receiver():
+    ReceiverHandler.received = []
+    ReceiverHandler.failures = 0
+    ReceiverHandler.failure_status = 503
+    server = ThreadingHTTPServer(("127.0.0.1", 0), ReceiverHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_port}/hooks/a2a"
+    server.shutdown()
+
+
+def test_finished_tasks_are_pushed_with_retries(receiver):
+    ReceiverHandler.failures = 2
+
+    async def scenario():
+        notifier = PushNotifier(base_backoff=0.01, allowed_hosts={"127.0.0.1"})
+        manager = TaskManager()
+        manager.on_finished.append(lambda record: notifier.notify(
+            record.push_notifications["task-1"], {"task_id": record.task_id, "status": record.status()}))
+
+        async def run(record):
+            return {"total_instances": 3}
+
+        record = manager.submit("task-1", "agent-a", [], None, run)
+        record.push_notifications["task-1"] = validate_push_config({"url": receiver, "token": "secret"}, {"127.0.0.1"})
+        await manager.wait(record, timeout=1)
+        await asyncio.wait_for(notifier.join(), timeout=5)
+        metrics = notifier.metrics()
+        await notifier.close()
+        return metrics
+
+    metrics = asyncio.run(scenario())
+
+    assert len(ReceiverHandler.received) == 1
+    delivered = ReceiverHandler.received[0]
+    assert delivered["authorization"] == "Bearer secret"
+    assert delivered["body"]["task_id"] == "task-1"
+    assert delivered["body"]["status"]["state"] == "completed"
+    assert metrics["delivered"] == 1
+    assert metrics["retried"] == 2
+    assert metrics["last_error"].endswith("HTTP 503")
+
+
+def test_permanent_errors_and_overflow_are_not_retried(receiver):
+    ReceiverHandler.failures = 10
+    ReceiverHandler.failure_status = 404
+
+    async def scenario():
+        notifier = PushNotifier(max_queue=1, workers=1, base_backoff=0.01, allowed_hosts={"127.0.0.1"})
+        config = {"url": receiver}
+        assert notifier.notify(config, {"n": 1})
+        notifier.notify(config, {"n": 2})
+        await asyncio.wait_for(notifier.join(), timeout=5)
+        metrics = notifier.metrics()
+        await notifier.close()
+        return metrics
+
+    metrics = asyncio.run(scenario())
+
+    assert metrics["retried"] == 0
+    assert metrics["failed"] + metrics["dropped"] == 2
+    assert ReceiverHandler.received == []
+
+
+def test_only_http_urls_are_accepted():
+    assert validate_push_config({"url": "https://hooks.example.com/a2a", "token": 42}) == \
+        {"url": "https://hooks.example.com/a2a", "token": "42"}
+    for config in ({"url": "file:///etc/passwd"}, {"url": "http://"}, {"token": "t"}, "http://x"):
+        with pytest.raises(ValueError):
+            validate_push_config(config)
+
+
+@pytest.mark.parametrize("url", ["http://127.0.0.1:8080/hook", "http://169.254.169.254/latest/meta-data/",
+                                 "http://10.0.0.5/hook", "http://[::1]/hook", "http://localhost/hook"])
+def test_non_public_targets_are_rejected(url):
+    with pytest.raises(ValueError):
+        validate_push_config({"url": url}, allowed_hosts=set())
+    assert validate_push_config({"url": url}, allowed_hosts={"127.0.0.1", "169.254.169.254", "10.0.0.5",
+                                                             "::1", "localhost"}) == {"url": url}
+
+
+def test_host_names_are_checked_after_resolving(receiver):
+    # A host name passes the syntax check and is rejected once it resolves to loopback
+    url = receiver.replace("127.0.0.1", "localtest.internal")
+
+    async def fake_getaddrinfo(host, port, **kwargs):
+        return [(None, None, None, "", ("127.0.0.1", port))]
+
+    async def scenario():
+        asyncio.get_running_loop().getaddrinfo = fake_getaddrinfo
+        with pytest.raises(ValueError):
+            await accept_push_config({"url": url}, allowed_hosts=set())
+
+        notifier = PushNotifier(workers=1, allowed_hosts=set())
+        notifier.notify({"url": receiver}, {"task_id": "t"})
+        await asyncio.wait_for(notifier.join(), timeout=5)
+        metrics = notifier.metrics()
+        await notifier.close()
+        return metrics
+
+    metrics = asyncio.run(scenario())
+
+    assert metrics["blocked"] == 1 and metrics["retried"] == 0
+    assert ReceiverHandler.received == []
@@ -0,0 +1,149 @@
+import json
+import os
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+# Add the parent directory to the Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from agents.aws_account_analysis import parse_known_accounts
+from reference_data import FileConfigCache, ReferenceDataCache, parse_trusted_accounts
+
+ACCOUNTS_YAML = """
+- name: Datadog
+  type: third-party
+  accounts: ["464622532012"]
+- name: Wiz
+  accounts: [197171649850]
+"""
+
+
+class AccountsHandler(BaseHTTPRequestHandler):
+    """Local stand-in for the upstream accounts.yaml host with ETag support."""
+    etag = '"v1"'
+    body = ACCOUNTS_YAML
+    status = 200
+    requests_seen = []
+
+    def do_GET(self):
+        self.requests_seen.append(dict(self.headers))
+        if self.status != 200:
+            self.send_response(self.status)
+            self.end_headers()
+            return
+        if self.headers.get("If-None-Match") == self.etag:
+            self.send_response(304)
+            self.end_headers()
+            return
+        payload = self.body.encode()
+        self.send_response(200)
+        self.send_header("ETag", self.etag)
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture
+def upstream():
+    AccountsHandler.requests_seen = []
+    AccountsHandler.status = 200
+    server = ThreadingHTTPServer(("127.0.0.1", 0), AccountsHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_port}/accounts.yaml"
+    server.shutdown()
+
+
+def make_cache(url, tmp_path, **kwargs):
+    return ReferenceDataCache(url, parse_known_accounts, str(tmp_path / "accounts.json"), **kwargs)
+
+
+def test_cold_start_reuses_the_on_disk_copy(upstream, tmp_path):
+    first = make_cache(upstream, tmp_path)
+    assert first.get()["197171649850"]["name"] == "Wiz"
+    assert first.get()["464622532012"]["type"] == "third-party"
+    assert len(AccountsHandler.requests_seen) == 1
+
+    # A new process starts from the JSON copy without contacting upstream
+    second = make_cache(upstream, tmp_path)
+    assert second.get() == first.get()
+    assert second.stats["disk_loads"] == 1
+    assert len(AccountsHandler.requests_seen) == 1
+
+
+def plant_cache_file(url, tmp_path, fetched_at):
+    path = tmp_path / "accounts.json"
+    path.write_text(json.dumps({"url": url, "etag": '"v1"', "last_modified": None, "fetched_at": fetched_at,
+                                "data": {"111111111111": {"name": "Planted", "type": "", "source": []}}}))
+    return path
+
+
+def test_cache_files_writable_by_others_are_ignored(upstream, tmp_path):
+    os.chmod(plant_cache_file(upstream, tmp_path, time.time()), 0o666)
+    cache = make_cache(upstream, tmp_path)
+
+    assert "111111111111" not in cache.get()
+    assert cache.stats["disk_loads"] == 0
+    assert len(AccountsHandler.requests_seen) == 1
+
+
+def test_cached_fetch_time_is_never_in_the_future(upstream, tmp_path):
+    plant_cache_file(upstream, tmp_path, time.time() + 10 ** 9)
+    cache = make_cache(upstream, tmp_path, ttl=0.2)
+
+    assert cache.get()["111111111111"]["name"] == "Planted"
+    assert cache.status()["age_seconds"] >= 0
+    # Counted from load time, the copy still goes stale after ttl
+    time.sleep(0.3)
+    assert cache.status()["stale"]
+
+
+def test_stale_data_is_served_while_revalidating(upstream, tmp_path):
+    cache = make_cache(upstream, tmp_path, ttl=0, retry_interval=0)
+    data = cache.get()
+
+    assert cache.get() is data
+    cache._refresh_thread.join(timeout=5)
+    assert AccountsHandler.requests_seen[-1]["If-None-Match"] == '"v1"'
+    assert cache.stats["revalidations"] >= 1
+    assert "If-Modified-Since" not in AccountsHandler.requests_seen[-1]
+    assert cache.get() is data
+    # That get started another revalidation; finish it before the next test's server counts requests
+    cache._refresh_thread.join(timeout=5)
+
+
+def test_failures_are_reported_and_not_retried_per_request(upstream, tmp_path):
+    AccountsHandler.status = 500
+    cache = make_cache(upstream, tmp_path, retry_interval=60)
+
+    assert cache.get() == {}
+    assert cache.get() == {}
+    assert len(AccountsHandler.requests_seen) == 1
+    status = cache.status()
+    assert status["entries"] == 0
+    assert "500" in status["last_error"]
+
+
+def test_trusted_accounts_file_is_parsed_once_per_version(tmp_path):
+    path = tmp_path / "trusted_accounts.yaml"
+    path.write_text("- name: Security\n  accounts: [123456789012]\n")
+    cache = FileConfigCache(parse_trusted_accounts)
+
+    first = cache.get(str(path))
+    assert cache.get(str(path)) is first
+    assert first["123456789012"] == {"name": "Security", "type": "trusted", "description": ""}
+    assert cache.stats == {"hits": 1, "misses": 1}
+
+    path.write_text("- name: Logging\n  accounts: [210987654321, 123456789012]\n")
+    os.utime(path, ns=(0, path.stat().st_mtime_ns + 1_000_000_000))
+    assert set(cache.get(str(path))) == {"210987654321", "123456789012"}
+    assert cache.stats == {"hits": 1, "misses": 2}
+
+    assert cache.get(str(tmp_path / "missing.yaml")) == {}
+    assert cache.lookup(str(path))[1] is True
@@ -0,0 +1,34 @@
+import os
+import sys
+
+# Add the parent directory to the Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from request_keys import REDACTED, mask_secrets, request_fingerprint, split_parameters
+
+
+def test_fingerprints_ignore_key_order_but_not_credentials():
+    base = {"AWS Access Key": "AKIDONE", "AWS Secret Key": "s1", "regions": ["us-east-1"]}
+    reordered = {"regions": ["us-east-1"], "AWS Secret Key": "s1", "AWS Access Key": "AKIDONE"}
+    other_account = dict(base, **{"AWS Secret Key": "s2"})
+
+    key = request_fingerprint("aws_ec2_eye-a2a", "analyze", base)
+    assert request_fingerprint("aws_ec2_eye-a2a", "analyze", reordered) == key
+    assert request_fingerprint("aws_ec2_eye-a2a", "analyze", other_account) != key
+    assert request_fingerprint("aws_account_analysis-a2a", "analyze", base) != key
+    assert "s1" not in key and "AKIDONE" not in key
+
+
+def test_secret_parameters_are_split_out():
+    public, secret = split_parameters({"AWS Secret Key": "s", "api_token": "t", "regions": []})
+    assert public == {"regions": []}
+    assert set(secret) == {"AWS Secret Key", "api_token"}
+
+
+def test_secrets_are_masked_at_any_depth():
+    messages = [{"role": "user", "parts": [{"json": {"parameters": {"AWS Secret Key": "s", "regions": ["x"]},
+                                                      "context": {"session_token": "t"}}}]}]
+    masked = mask_secrets(messages)
+    json_part = masked[0]["parts"][0]["json"]
+    assert json_part["parameters"] == {"AWS Secret Key": REDACTED, "regions": ["x"]}
+    assert json_part["context"] == {"session_token": REDACTED}
+    assert messages[0]["parts"][0]["json"]["parameters"]["AWS Secret Key"] == "s"
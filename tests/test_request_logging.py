@@ -0,0 +1,37 @@
+import logging
+import os
+import sys
+
+# Add the parent directory to the Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from request_logging import MAX_ITEMS, REDACTED, LogPayload, log_rpc, redact
+
+
+def test_aws_credentials_are_redacted_at_any_depth():
+    payload = {"params": {"task": {"messages": [{"parts": [{"json": {"parameters": {
+        "AWS Access Key": "AKIAEXAMPLE", "AWS Secret Key": "example-secret", "region": "us-east-1"
+    }}}]}]}}}
+    text = str(LogPayload(payload))
+    assert "AKIAEXAMPLE" not in text and "example-secret" not in text
+    parameters = redact(payload)["params"]["task"]["messages"][0]["parts"][0]["json"]["parameters"]
+    assert parameters == {"AWS Access Key": REDACTED, "AWS Secret Key": REDACTED, "region": "us-east-1"}
+
+
+def test_large_payloads_are_cut_short():
+    payload = {"instances": [{"id": n, "name": "x" * 1000} for n in range(10000)]}
+    pruned = redact(payload)
+    assert len(pruned["instances"]) == MAX_ITEMS + 1
+    assert len(pruned["instances"][0]["name"]) < 1000
+    text = str(LogPayload(payload, max_chars=100))
+    assert text.startswith('{"instances":[') and text.endswith("chars)")
+    assert len(text) < 150
+
+
+def test_payloads_are_not_formatted_below_the_log_level():
+    class Exploding(dict):
+        def items(self):
+            raise AssertionError("payload was formatted")
+
+    logger = logging.getLogger("test.request_logging")
+    logger.setLevel(logging.INFO)
+    log_rpc(logger, "request", "agent", "tasks/send", "1", Exploding())
@@ -0,0 +1,38 @@
+import os
+import sys
+import time
+
+# Add the parent directory to the Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from result_cache import ResultCache
+
+
+def test_least_recently_used_results_are_evicted_by_size():
+    cache = ResultCache(max_bytes=60)
+    cache.put("a", {"data": "x" * 10}, ttl=60)
+    cache.put("b", {"data": "y" * 10}, ttl=60)
+    assert cache.get("a") == {"data": "x" * 10}
+    cache.put("c", {"data": "z" * 10}, ttl=60)
+
+    assert cache.get("b") is None
+    assert cache.get("a") is not None and cache.get("c") is not None
+    metrics = cache.metrics()
+    assert metrics["evictions"] == 1
+    assert metrics["entries"] == 2 and metrics["bytes"] <= 60
+
+
+def test_results_expire_after_their_ttl():
+    cache = ResultCache()
+    cache.put("a", {"status": "success"}, ttl=0.05)
+    assert cache.get("a") == {"status": "success"}
+    time.sleep(0.06)
+    assert cache.get("a") is None
+    assert cache.stats["expirations"] == 1
+    assert cache.metrics()["bytes"] == 0
+
+
+def test_results_larger_than_the_cache_are_not_stored():
+    cache = ResultCache(max_bytes=10)
+    assert cache.put("a", {"data": "x" * 100}, ttl=60) is False
+    assert cache.get("a") is None
+    assert cache.stats["too_large"] == 1
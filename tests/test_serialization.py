@@ -0,0 +1,54 @@
+import json
+import os
+import sys
+from datetime import date, datetime, timezone
+from decimal import Decimal
+
+import pytest
+
+# Add the parent directory to the Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from serialization import OrjsonSerializer, StdlibSerializer, get_serializer, orjson
+
+RESULT = {
+    "status": "success",
+    "launch_time": datetime(2024, 1, 2, 3, 4, 5, 123456, tzinfo=timezone.utc),
+    "creation_date": date(2024, 1, 2),
+    "regions": {"us-east-1": {"instance_count": 2, "ami_ids": {"ami-1"}}},
+    "cost": Decimal("1.5"),
+    "name": "Zürich"
+}
+
+SERIALIZERS = [StdlibSerializer()] + ([OrjsonSerializer()] if orjson is not None else [])
+
+
+@pytest.mark.parametrize("serializer", SERIALIZERS, ids=lambda s: s.name)
+def test_agent_result_types_round_trip(serializer):
+    decoded = serializer.loads(serializer.dumps(RESULT))
+    assert decoded == {
+        "status": "success",
+        "launch_time": "2024-01-02T03:04:05.123456+00:00",
+        "creation_date": "2024-01-02",
+        "regions": {"us-east-1": {"instance_count": 2, "ami_ids": ["ami-1"]}},
+        "cost": 1.5,
+        "name": "Zürich"
+    }
+
+
+@pytest.mark.parametrize("serializer", SERIALIZERS, ids=lambda s: s.name)
+def test_invalid_json_raises_json_decode_error(serializer):
+    with pytest.raises(json.JSONDecodeError):
+        serializer.loads(b'{"jsonrpc": ')
+
+
+def test_values_orjson_rejects_fall_back_to_stdlib():
+    if orjson is None:
+        pytest.skip("orjson is not installed")
+    assert json.loads(OrjsonSerializer().dumps({"big": 2 ** 70})) == {"big": 2 ** 70}
+
+
+def test_backend_selection():
+    assert get_serializer("stdlib").name == "stdlib"
+    assert get_serializer("auto").name == ("orjson" if orjson is not None else "stdlib")
+    with pytest.raises(ValueError):
+        get_serializer("ujson")
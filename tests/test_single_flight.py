@@ -0,0 +1,89 @@
+import asyncio
+import os
+import sys
+
+import pytest
+
+# Add the parent directory to the Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from single_flight import SingleFlight
+
+
+def test_concurrent_identical_work_runs_once():
+    async def scenario():
+        flight = SingleFlight()
+        calls = []
+
+        async def scan(account):
+            calls.append(account)
+            await asyncio.sleep(0.02)
+            return {"account": account}
+
+        results = await asyncio.gather(
+            flight.run("key-a", lambda: scan("a")),
+            flight.run("key-a", lambda: scan("a")),
+            flight.run("key-b", lambda: scan("b")),
+        )
+        assert results == [{"account": "a"}, {"account": "a"}, {"account": "b"}]
+        assert results[0] is results[1]
+        assert calls == ["a", "b"]
+        assert flight.stats == {"executions": 2, "coalesced": 1, "fresh_reuses": 0}
+
+        # Without a freshness window, finished work is not reused
+        await flight.run("key-a", lambda: scan("a"))
+        assert calls == ["a", "b", "a"]
+
+    asyncio.run(scenario())
+
+
+def test_cancelled_waiters_do_not_cancel_shared_work():
+    async def scenario():
+        flight = SingleFlight()
+        finished = asyncio.Event()
+
+        async def scan():
+            await asyncio.sleep(0.05)
+            finished.set()
+            return {}
+
+        first = asyncio.create_task(flight.run("key", scan))
+        second = asyncio.create_task(flight.run("key", scan))
+        await asyncio.sleep(0.01)
+        first.cancel()
+        assert await second == {}
+        assert finished.is_set()
+
+        # Once the last waiter gives up, the work is cancelled too
+        finished.clear()
+        only = asyncio.create_task(flight.run("key", scan))
+        await asyncio.sleep(0.01)
+        only.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await only
+        await asyncio.sleep(0.06)
+        assert not finished.is_set()
+
+    asyncio.run(scenario())
+
+
+def test_fresh_results_are_reused_within_the_window():
+    async def scenario():
+        flight = SingleFlight(freshness=0.05)
+        calls = []
+
+        async def scan(status):
+            calls.append(status)
+            return {"status": status}
+
+        reusable = lambda result: result["status"] != "error"
+        await flight.run("ok", lambda: scan("success"), reusable)
+        await flight.run("ok", lambda: scan("success"), reusable)
+        await flight.run("bad", lambda: scan("error"), reusable)
+        await flight.run("bad", lambda: scan("error"), reusable)
+        await asyncio.sleep(0.06)
+        await flight.run("ok", lambda: scan("success"), reusable)
+
+        assert calls == ["success", "error", "error", "success"]
+        assert flight.stats["fresh_reuses"] == 1
+
+    asyncio.run(scenario())
@@ -0,0 +1,216 @@
+import asyncio
+import os
+import sys
+
+import pytest
+
+# Add the parent directory to the Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from task_manager import CANCELED, COMPLETED, FAILED, WORKING, TaskManager
+
+MESSAGES = [{"role": "user", "parts": [{"text": "scan"}]}]
+
+
+def test_task_runs_in_the_background_and_completes():
+    async def scenario():
+        manager = TaskManager()
+        release = asyncio.Event()
+
+        async def run(record):
+            await release.wait()
+            return {"status": "success"}
+
+        record = manager.submit("task-1", "agent-a", MESSAGES, None, run)
+        await asyncio.sleep(0)
+        assert manager.get("task-1").state == WORKING
+        assert manager.get("task-1").to_task()["messages"] == MESSAGES
+
+        release.set()
+        await manager.wait(record, timeout=1)
+        task = manager.get("task-1").to_task()
+        assert task["status"]["state"] == COMPLETED
+        assert task["messages"][-1]["parts"][0]["json"] == {"status": "success"}
+
+    asyncio.run(scenario())
+
+
+def test_failed_and_canceled_tasks_report_their_state():
+    async def scenario():
+        manager = TaskManager()
+
+        async def fail(record):
+            raise RuntimeError("boom")
+
+        async def hang(record):
+            await asyncio.sleep(3600)
+
+        failed = manager.submit("task-fail", "agent-a", MESSAGES, None, fail)
+        await manager.wait(failed, timeout=1)
+        assert failed.state == FAILED
+        assert failed.to_task()["status"]["error"] == {"message": "boom"}
+
+        hanging = manager.submit("task-hang", "agent-a", MESSAGES, None, hang)
+        assert manager.submit("task-hang", "agent-a", MESSAGES, None, hang) is hanging
+        await asyncio.sleep(0)
+        assert (await manager.cancel("task-hang")).state == CANCELED
+        assert hanging.done.is_set()
+        assert await manager.cancel("missing") is None
+
+    asyncio.run(scenario())
+
+
+def test_a_dropped_waiter_does_not_cancel_the_task():
+    async def scenario():
+        manager = TaskManager()
+
+        async def run(record):
+            await asyncio.sleep(0.05)
+            return {}
+
+        record = manager.submit("task-1", "agent-a", MESSAGES, None, run)
+        with pytest.raises(asyncio.TimeoutError):
+            await manager.wait(record, timeout=0.01)
+        await manager.wait(record, timeout=1)
+        assert record.state == COMPLETED
+
+    asyncio.run(scenario())
+
+
+def test_finished_tasks_are_retained_within_bounds():
+    async def scenario():
+        manager = TaskManager(max_finished=2)
+
+        async def run(record):
+            return {}
+
+        for i in range(4):
+            await manager.wait(manager.submit(f"task-{i}", "agent-a", MESSAGES, None, run), timeout=1)
+
+        assert manager.get("task-0") is None
+        assert manager.get("task-1") is None
+        assert manager.get("task-3").state == COMPLETED
+        assert manager.stats()["running"] == 0
+        assert manager.stats()["retained_finished"] == 2
+
+        manager.finished_ttl = 0
+        assert manager.get("task-3") is None
+
+    asyncio.run(scenario())
+
+
+def test_subscribers_receive_status_and_artifact_events():
+    async def scenario():
+        manager = TaskManager()
+
+        async def run(record):
+            record.add_artifact("region:us-east-1", {"instance_count": 2})
+            return {"total_instances": 2}
+
+        record = manager.submit("task-1", "agent-a", MESSAGES, None, run)
+        events = record.subscribe()
+        await manager.wait(record, timeout=1)
+
+        received = [events.get_nowait() for _ in range(events.qsize())]
+        assert [e["status"]["state"] if "status" in e else e["artifact"]["name"] for e in received] == \
+            [WORKING, "region:us-east-1", COMPLETED]
+        assert received[1]["artifact"] == {"name": "region:us-east-1", "parts": [{"json": {"instance_count": 2}}],
+                                           "index": 0}
+        assert [e.get("final") for e in received] == [False, None, True]
+        assert record.to_task()["artifacts"] == [received[1]["artifact"]]
+
+    asyncio.run(scenario())
+
+
+def test_repeated_submissions_attach_to_the_existing_execution():
+    async def scenario():
+        manager = TaskManager()
+        runs = []
+
+        async def run(record):
+            runs.append(record.task_id)
+            await asyncio.sleep(0.01)
+            return {"run": len(runs)}
+
+        first = manager.submit("task-1", "agent-a", MESSAGES, None, run, fingerprint="fp-1")
+        # A retry of the same task while it runs, and after it completed
+        assert manager.submit("task-1", "agent-a", MESSAGES, None, run, fingerprint="fp-1") is first
+        await manager.wait(first, timeout=1)
+        assert manager.submit("task-1", "agent-a", MESSAGES, None, run, fingerprint="fp-1") is first
+        with pytest.raises(ValueError):
+            manager.submit("task-1", "agent-a", MESSAGES, None, run, fingerprint="fp-other")
+
+        # Same request under a new task_id is only coalesced when asked for
+        assert manager.submit("task-2", "agent-a", MESSAGES, None, run, fingerprint="fp-1",
+                              dedupe_by_fingerprint=True) is first
+        # ...and the new task_id then refers to the shared execution
+        assert manager.get("task-2") is first and first.aliases == ["task-2"]
+        assert first.to_task("task-2")["task_id"] == "task-2"
+        independent = manager.submit("task-3", "agent-a", MESSAGES, None, run, fingerprint="fp-1")
+        await manager.wait(independent, timeout=1)
+
+        assert runs == ["task-1", "task-3"]
+        stats = manager.stats()
+        assert stats["coalesced_by_task_id"] == 2
+        assert stats["coalesced_by_fingerprint"] == 1
+
+    asyncio.run(scenario())
+
+
+def test_aliases_are_forgotten_with_their_task():
+    async def scenario():
+        manager = TaskManager(max_finished=1)
+
+        async def run(record):
+            return {}
+
+        first = manager.submit("task-1", "agent-a", MESSAGES, None, run, fingerprint="fp-1")
+        manager.submit("task-2", "agent-a", MESSAGES, None, run, fingerprint="fp-1", dedupe_by_fingerprint=True)
+        await manager.wait(first, timeout=1)
+        await manager.wait(manager.submit("task-3", "agent-a", MESSAGES, None, run), timeout=1)
+        assert manager.get("task-1") is None and manager.get("task-2") is None
+
+    asyncio.run(scenario())
+
+
+def test_failed_tasks_run_again_when_resubmitted():
+    async def scenario():
+        manager = TaskManager()
+        attempts = []
+
+        async def flaky(record):
+            attempts.append(record)
+            if len(attempts) == 1:
+                raise RuntimeError("throttled")
+            return {}
+
+        first = manager.submit("task-1", "agent-a", MESSAGES, None, flaky)
+        await manager.wait(first, timeout=1)
+        second = manager.submit("task-1", "agent-a", MESSAGES, None, flaky)
+        await manager.wait(second, timeout=1)
+        assert (first.state, second.state) == (FAILED, COMPLETED)
+        assert manager.get("task-1") is second
+
+    asyncio.run(scenario())
+
+
+def test_a_rejected_retry_keeps_the_failed_task_prunable():
+    async def scenario():
+        manager = TaskManager(max_finished=1)
+
+        async def fail(record):
+            raise RuntimeError("throttled")
+
+        def reject():
+            raise RuntimeError("busy")
+
+        failed = manager.submit("task-1", "agent-a", MESSAGES, None, fail)
+        await manager.wait(failed, timeout=1)
+        with pytest.raises(RuntimeError, match="busy"):
+            manager.submit("task-1", "agent-a", MESSAGES, None, fail, admit=reject)
+        assert manager.get("task-1") is failed
+        assert manager.stats()["retained_finished"] == 1
+
+        manager.finished_ttl = 0
+        assert manager.get("task-1") is None
+
+    asyncio.run(scenario())
@@ -0,0 +1,138 @@
+import asyncio
+import os
+import sys
+
+import pytest
+
+# Add the parent directory to the Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from task_scheduler import SchedulerBusy, TaskScheduler
+
+
+def test_agent_limit_queues_excess_tasks_in_order():
+    async def scenario():
+        scheduler = TaskScheduler(max_running=10, max_queued=10)
+        tickets = [scheduler.reserve("scan", limit=2) for _ in range(4)]
+        assert [t.state for t in tickets] == ["running", "running", "queued", "queued"]
+        assert scheduler.metrics()["agents"] == {"scan": {"running": 2, "queued": 2}}
+
+        tickets[0].release()
+        assert [t.state for t in tickets[1:]] == ["running", "running", "queued"]
+        await asyncio.wait_for(tickets[2].wait(), timeout=1)
+
+    asyncio.run(scenario())
+
+
+def test_agent_at_its_limit_does_not_block_other_agents():
+    async def scenario():
+        scheduler = TaskScheduler(max_running=10, max_queued=10)
+        scheduler.reserve("scan", limit=1)
+        blocked = scheduler.reserve("scan", limit=1)
+        other = scheduler.reserve("hello")
+        assert blocked.state == "queued" and other.state == "running"
+
+    asyncio.run(scenario())
+
+
+def test_global_limit_and_full_queue_reject_with_busy():
+    async def scenario():
+        scheduler = TaskScheduler(max_running=1, max_queued=1)
+        running = scheduler.reserve("a")
+        queued = scheduler.reserve("b")
+        with pytest.raises(SchedulerBusy):
+            scheduler.reserve("c")
+        assert scheduler.metrics()["rejected"] == 1
+
+        # A cancelled wait leaves the queue when its ticket is released
+        waiter = asyncio.create_task(queued.wait())
+        await asyncio.sleep(0)
+        waiter.cancel()
+        queued.release()
+        assert scheduler.metrics()["queue_depth"] == 0
+        running.release()
+        running.release()
+        metrics = scheduler.metrics()
+        assert metrics["running"] == 0 and metrics["completed"] == 1
+        assert metrics["wait_seconds"]["p50"] is not None
+
+    asyncio.run(scenario())
+
+
+def test_higher_priority_tasks_start_first():
+    async def scenario():
+        scheduler = TaskScheduler(max_running=1, max_queued=10)
+        running = scheduler.reserve("scan")
+        batch = scheduler.reserve("scan", priority="batch")
+        normal = scheduler.reserve("scan")
+        interactive = scheduler.reserve("scan", priority="interactive")
+        assert scheduler.metrics()["queued_by_priority"] == {"interactive": 1, "normal": 1, "batch": 1}
+
+        started = []
+        for _ in range(3):
+            running.release()
+            running = next(t for t in (batch, normal, interactive) if t.state == "running")
+            started.append(running)
+        assert started == [interactive, normal, batch]
+        with pytest.raises(ValueError):
+            scheduler.reserve("scan", priority="urgent")
+
+    asyncio.run(scenario())
+
+
+def test_tenants_share_slots_by_weight():
+    async def scenario():
+        scheduler = TaskScheduler(max_running=1, max_queued=100, weights={"big": 2})
+        running = scheduler.reserve("scan", tenant="warmup")
+        # One tenant floods the queue before the others submit anything
+        queued = [scheduler.reserve("scan", tenant="flood") for _ in range(20)]
+        queued += [scheduler.reserve("scan", tenant=tenant) for tenant in ("small", "big") for _ in range(4)]
+
+        order = []
+        for _ in range(9):
+            running.release()
+            running = next(t for t in queued if t.state == "running")
+            queued.remove(running)
+            order.append(running.tenant)
+        # The flood does not delay later tenants; "big" gets twice the share of "small"
+        assert order.count("big") == 4 and order.count("small") >= 2
+        assert order.index("small") <= 2 and order.index("big") <= 2
+
+        tenants = scheduler.metrics()["tenants"]
+        assert tenants["flood"]["queued"] + tenants["flood"]["started"] == 20
+        assert tenants["warmup"]["run_seconds"]["p50"] is not None
+
+    asyncio.run(scenario())
+
+
+def test_one_tenant_cannot_fill_the_whole_queue():
+    async def scenario():
+        scheduler = TaskScheduler(max_running=1, max_queued=10, max_queued_per_tenant=2)
+        scheduler.reserve("scan", tenant="a")
+        scheduler.reserve("scan", tenant="a")
+        scheduler.reserve("scan", tenant="a")
+        with pytest.raises(SchedulerBusy):
+            scheduler.reserve("scan", tenant="a")
+        assert scheduler.reserve("scan", tenant="b").state == "queued"
+        assert scheduler.metrics()["tenants"]["a"]["rejected"] == 1
+
+    asyncio.run(scenario())
+
+
+def test_tasks_with_the_same_share_key_hold_one_slot():
+    async def scenario():
+        scheduler = TaskScheduler(max_running=1, max_queued=10)
+        first = scheduler.reserve("scan", share_key="fp")
+        shared = scheduler.reserve("scan", share_key="fp")
+        other = scheduler.reserve("scan", share_key="other")
+        assert shared.state == "running" and other.state == "queued"
+        assert scheduler.metrics()["shared"] == 1
+
+        # The slot is freed only once both holders released it
+        first.release()
+        first.release()
+        assert other.state == "queued"
+        shared.release()
+        assert other.state == "running"
+        assert scheduler.reserve("scan", share_key="fp").state == "queued"
+
+    asyncio.run(scenario())